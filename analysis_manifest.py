@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Per-repository analysis manifest for incremental re-analysis.
+
+analysis_manifest.json is stored next to a repository's results and records
+the repository state (HEAD SHA, tree SHA, refs), the versions of the external
+tools and, for every artifact, the fingerprint of the inputs it was computed
+from. On the next run an artifact whose input fingerprint is unchanged is
+reused instead of recomputed, and a repository whose artifacts are all
+current is skipped entirely.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+
+MANIFEST_FILENAME = 'analysis_manifest.json'
+
+# Bump when the format of any artifact changes, to invalidate old manifests
+MANIFEST_VERSION = 1
+
+
+def fingerprint(*parts):
+    """Stable SHA-256 fingerprint of JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _git_output(repo_path, *args):
+    try:
+        result = subprocess.run(
+            ["git", "-C", repo_path] + list(args),
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+        if result.returncode == 0:
+            return result.stdout.strip()
+    except Exception:
+        pass
+    return None
+
+
+def get_repository_state(repo_path):
+    """
+    Return the parts of the repository state artifacts depend on:
+    - head_sha: commit checked out (what scc/lizard/trivy see)
+    - tree_sha: tree of HEAD (identical trees give identical snapshot analyses)
+    - refs_sha: fingerprint of every ref tip (what `git log --all` sees)
+    """
+    head_sha = _git_output(repo_path, "rev-parse", "HEAD")
+    if not head_sha:
+        return None
+
+    refs = _git_output(repo_path, "for-each-ref", "--format=%(objectname) %(refname)") or ""
+    return {
+        'head_sha': head_sha,
+        'tree_sha': _git_output(repo_path, "rev-parse", "HEAD^{tree}"),
+        'refs_sha': fingerprint(head_sha, refs)
+    }
+
+
+def _command_version(cmd):
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        output = (result.stdout or result.stderr).strip()
+        return output.splitlines()[0] if output else None
+    except Exception:
+        return None
+
+
+def file_signature(path):
+    """Size and mtime of a file, or None when it does not exist"""
+    try:
+        stat = os.stat(path)
+        return f"{stat.st_size}:{int(stat.st_mtime)}"
+    except OSError:
+        return None
+
+
+def collect_tool_versions(scc_path, trivy_path=None, trivy_cache_dir=None, codeanalysis_jar_path=None):
+    """Collect versions of the external tools once per run"""
+    python_cmd = sys.executable if sys.executable else "python"
+    versions = {
+        'scc': _command_version([scc_path, '--version']),
+        'lizard': _command_version([python_cmd, '-m', 'lizard', '--version']),
+    }
+    if trivy_path:
+        versions['trivy'] = _command_version([trivy_path, '--version'])
+    if trivy_cache_dir:
+        # The vulnerability DB changes independently of the trivy binary
+        versions['trivy_db'] = file_signature(os.path.join(trivy_cache_dir, 'db', 'metadata.json'))
+    if codeanalysis_jar_path:
+        versions['codeanalysis_jar'] = file_signature(codeanalysis_jar_path)
+    return versions
+
+
+def load_manifest(repo_results_dir):
+    """Load the manifest of a previous run (empty dict when missing or outdated)"""
+    manifest_file = os.path.join(repo_results_dir, MANIFEST_FILENAME)
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('manifest_version') != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def save_manifest(repo_results_dir, manifest):
+    """Write the manifest next to the results"""
+    manifest = dict(manifest, manifest_version=MANIFEST_VERSION)
+    manifest_file = os.path.join(repo_results_dir, MANIFEST_FILENAME)
+    try:
+        with open(manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return True
+    except Exception as e:
+        print(f"  Warning: Failed to save analysis manifest: {e}")
+        return False
+
+
+def artifact_is_current(manifest, name, input_fingerprint, repo_results_dir):
+    """True when the artifact was produced from the same inputs and its files still exist"""
+    entry = manifest.get('artifacts', {}).get(name)
+    if not entry or entry.get('fingerprint') != input_fingerprint:
+        return False
+    return all(
+        os.path.exists(os.path.join(repo_results_dir, filename))
+        for filename in entry.get('files', [])
+    )
@@ -2,14 +2,37 @@
 """
 Analyze geographic distribution of commits based on timezone information.
 Reads commits.json files and generates geographic_distribution.json with location data.
+
+analyze_repos.py calls analyze_geographic_distribution() and
+save_geographic_distribution() directly on the commit records it has just
+collected, without re-reading commits.json.
+
+Commits are counted in 15-minute offset buckets held in fixed-size arrays.
+The UTC offset comes from the integer tz_offset_minutes field the git
+extraction adds to every record; older commits.json files without it fall
+back to parsing the date string.
+
+Each repository can also emit a mergeable partial aggregate
+(geo_partial.json: commits per bucket, HyperLogLog sketches of the authors
+and each author's commits per bucket), which geo_rollup.py combines into
+an organization-wide geographic_distribution.json.
 """
 
 import json
 import os
 import sys
-from collections import defaultdict
 from datetime import datetime
 import re
+import zipfile
+
+from commit_store import CommitStore
+from git_history import utc_offset_minutes
+from hyperloglog import HyperLogLog
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: commits are then counted in a plain loop
+    np = None
 
 
 # Mapping of UTC offsets to geographic regions/cities
@@ -55,6 +78,20 @@ TIMEZONE_TO_LOCATION = {
 }
 
 
+# 15-minute offset buckets; git offsets are at most +/-99:59, i.e. bucket -400..400
+BUCKET_MINUTES = 15
+MAX_BUCKET = 400
+BUCKET_COUNT = 2 * MAX_BUCKET + 1
+
+# Largest timezone x author count matrix built with numpy (larger ones use the plain loop)
+DENSE_COUNT_LIMIT = 2 ** 25
+
+TOP_AUTHORS = 5
+
+PARTIAL_FILE = 'geo_partial.json'
+PARTIAL_VERSION = 1
+
+
 def parse_timezone_offset(date_string):
     """
     Extract timezone offset from ISO 8601 date string.
@@ -102,104 +139,301 @@ def get_location_info(offset):
     }
 
 
-def analyze_geographic_distribution(commits_data):
+def offset_hours(minutes):
+    """UTC offset in minutes as hours, exactly as parse_timezone_offset computes it"""
+    sign = -1 if minutes < 0 else 1
+    return sign * (abs(minutes) // 60 + abs(minutes) % 60 / 60.0)
+
+
+def _top_authors(author_counts, first_seen):
+    """The TOP_AUTHORS (email, commits) with most commits; ties in order of their first commit"""
+    return sorted(author_counts, key=lambda item: (-item[1], first_seen[item[0]]))[:TOP_AUTHORS]
+
+
+def _count_timezones(commits, author_hours, author_counts=False):
     """
-    Analyze geographic distribution from commits data.
-    Returns statistics grouped by timezone/region.
+    Count commits per 15-minute offset bucket in one pass over the records.
+    
+    Returns (commits with timezone, {bucket: (commits, exact offset of the
+    bucket's last commit, unique authors, top authors, {email: commits} of
+    every author with author_counts, else None)}, unique authors, author
+    hour histogram or None).
     """
-    timezone_stats = defaultdict(lambda: {
-        'commit_count': 0,
-        'authors': set(),
-        'author_commits': defaultdict(int),
-        'offset': None
-    })
-    
-    total_commits = 0
+    commit_counts = [0] * BUCKET_COUNT
+    last_offset = [0] * BUCKET_COUNT
+    author_commits = {}  # (bucket, email) -> commits, in order of first commit
+    hour_histogram = {} if author_hours else None
     commits_with_timezone = 0
     
-    for commit in commits_data.get('commits', []):
-        total_commits += 1
-        date_string = commit.get('date', '')
-        author_name = commit.get('author_name', 'Unknown')
-        author_email = commit.get('author_email', '')
+    for commit in commits:
+        minutes = commit.get('tz_offset_minutes')
+        if minutes is None:
+            minutes = utc_offset_minutes(commit.get('date', ''))
+            if minutes is None:
+                continue
         
-        offset = parse_timezone_offset(date_string)
+        commits_with_timezone += 1
+        # Nearest 15 minutes (no ties: a whole number of minutes is never 7.5 past a bucket)
+        bucket = round(minutes / BUCKET_MINUTES) + MAX_BUCKET
+        commit_counts[bucket] += 1
+        last_offset[bucket] = minutes
+        author_email = commit.get('author_email', '')
+        key = (bucket, author_email)
+        author_commits[key] = author_commits.get(key, 0) + 1
         
-        if offset is not None:
-            commits_with_timezone += 1
-            key = offset_to_key(offset)
-            
-            timezone_stats[key]['commit_count'] += 1
-            timezone_stats[key]['authors'].add(author_email)
-            timezone_stats[key]['author_commits'][author_email] += 1
-            timezone_stats[key]['offset'] = offset
+        if author_hours:
+            # The ISO date is in the author's local time: YYYY-MM-DDTHH:...
+            hours = hour_histogram.get(author_email)
+            if hours is None:
+                hours = hour_histogram[author_email] = [0] * 24
+            hours[int(commit['date'][11:13])] += 1
+    
+    bucket_authors = {}
+    for (bucket, email), count in author_commits.items():
+        bucket_authors.setdefault(bucket, []).append((email, count))
+    buckets = {}
+    for bucket, authors in bucket_authors.items():
+        first_seen = {email: order for order, (email, _) in enumerate(authors)}
+        buckets[bucket] = (commit_counts[bucket], last_offset[bucket], len(authors),
+                           _top_authors(authors, first_seen), dict(authors) if author_counts else None)
+    unique_authors = len({email for _, email in author_commits})
+    return commits_with_timezone, buckets, unique_authors, hour_histogram
+
+
+def _count_timezones_numpy(commits, author_hours, author_counts=False):
+    """_count_timezones with bincounts over integer columns (None when the count matrix would be too large)"""
+    offsets = [commit.get('tz_offset_minutes') for commit in commits]
+    if None in offsets:
+        # Records of older commits.json files: parse the date strings
+        offsets = [utc_offset_minutes(commit.get('date', '')) if minutes is None else minutes
+                   for minutes, commit in zip(offsets, commits)]
+        keep = [i for i, minutes in enumerate(offsets) if minutes is not None]
+        if len(keep) < len(offsets):
+            commits = [commits[i] for i in keep]
+            offsets = [offsets[i] for i in keep]
+    if not commits:
+        return 0, {}, 0, {} if author_hours else None
+    
+    emails = [commit.get('author_email', '') for commit in commits]
+    authors = list(dict.fromkeys(emails))
+    author_index = {email: i for i, email in enumerate(authors)}
+    author_ids = np.fromiter(map(author_index.__getitem__, emails), dtype=np.int64, count=len(emails))
+    minutes = np.array(offsets, dtype=np.int64)
+    # Nearest 15 minutes (rint rounds half to even, but there are no ties)
+    buckets = np.rint(minutes / BUCKET_MINUTES).astype(np.int64) + MAX_BUCKET
+    
+    bucket_counts = np.bincount(buckets, minlength=BUCKET_COUNT)
+    used = np.flatnonzero(bucket_counts)
+    if len(used) * len(authors) > DENSE_COUNT_LIMIT:
+        return None
+    row_of_bucket = np.zeros(BUCKET_COUNT, dtype=np.int64)
+    row_of_bucket[used] = np.arange(len(used))
+    keys = row_of_bucket[buckets] * len(authors) + author_ids
+    counts = np.bincount(keys, minlength=len(used) * len(authors)).reshape(len(used), len(authors))
+    
+    # Only authors that can make a top list need the position of their first commit (for ties)
+    k = min(TOP_AUTHORS, len(authors))
+    threshold = np.maximum(-np.partition(-counts, k - 1, axis=1)[:, k - 1], 1)
+    candidates = np.flatnonzero((counts >= threshold[:, None]).ravel())
+    positions = np.flatnonzero(np.isin(keys, candidates))
+    candidate_keys, first_index = np.unique(keys[positions], return_index=True)
+    first_seen = dict(zip(candidate_keys.tolist(), positions[first_index].tolist()))
+    
+    # Exact offset of each bucket's last commit; buckets rarely hold more than one exact offset
+    exact_counts = np.bincount(minutes - minutes.min())
+    exact_offsets = np.flatnonzero(exact_counts) + minutes.min()
+    offsets_per_bucket = {}
+    for offset in exact_offsets.tolist():
+        offsets_per_bucket.setdefault(round(offset / BUCKET_MINUTES) + MAX_BUCKET, []).append(offset)
+    
+    result = {}
+    unique_per_bucket = np.count_nonzero(counts, axis=1).tolist()
+    for row, bucket in enumerate(used.tolist()):
+        bucket_offsets = offsets_per_bucket[bucket]
+        if len(bucket_offsets) == 1:
+            last_offset = bucket_offsets[0]
+        else:
+            last_offset = offsets[int(np.flatnonzero(buckets == bucket)[-1])]
+        base = row * len(authors)
+        top_ids = np.flatnonzero(counts[row] >= threshold[row]).tolist()
+        top_authors = _top_authors(
+            [(author_id, int(counts[row, author_id])) for author_id in top_ids],
+            {author_id: first_seen[base + author_id] for author_id in top_ids}
+        )
+        bucket_author_counts = None
+        if author_counts:
+            author_ids_of_bucket = np.flatnonzero(counts[row])
+            bucket_author_counts = dict(zip([authors[author_id] for author_id in author_ids_of_bucket.tolist()],
+                                            counts[row, author_ids_of_bucket].tolist()))
+        result[bucket] = (int(bucket_counts[bucket]), last_offset, unique_per_bucket[row],
+                          [(authors[author_id], count) for author_id, count in top_authors], bucket_author_counts)
+    
+    hour_histogram = None
+    if author_hours:
+        hours = np.fromiter((int(commit['date'][11:13]) for commit in commits), dtype=np.int64, count=len(commits))
+        histogram = np.bincount(author_ids * 24 + hours, minlength=len(authors) * 24).reshape(len(authors), 24)
+        hour_histogram = dict(zip(authors, histogram.tolist()))
+    return len(commits), result, len(authors), hour_histogram
+
+
+def _count(commits, author_hours, author_counts=False):
+    counted = _count_timezones_numpy(commits, author_hours, author_counts) if np is not None else None
+    if counted is None:
+        counted = _count_timezones(commits, author_hours, author_counts)
+    return counted
+
+
+def _distribution(commits_data, counted, author_hours):
+    """The geographic_distribution.json result of counted timezones"""
+    commits = commits_data.get('commits', [])
+    commits_with_timezone, buckets, unique_authors, hour_histogram = counted
     
     # Convert to final format
     geographic_distribution = []
     
-    for tz_key, stats in sorted(timezone_stats.items(), key=lambda x: float(x[0]) if x[0] else 0):
-        location_info = get_location_info(stats['offset'])
-        
-        # Get top authors for this timezone
-        top_authors = sorted(
-            stats['author_commits'].items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
+    for bucket in sorted(buckets):
+        commit_count, last_offset, bucket_unique_authors, top_authors, _ = buckets[bucket]
+        offset = offset_hours(last_offset)
+        location_info = get_location_info(offset)
         
         geographic_distribution.append({
-            'timezone_offset': tz_key,
-            'offset_hours': stats['offset'],
+            'timezone_offset': offset_to_key((bucket - MAX_BUCKET) / 4),
+            'offset_hours': offset,
             'region': location_info['region'],
             'likely_cities': location_info['cities'],
             'likely_countries': location_info['countries'],
-            'commit_count': stats['commit_count'],
-            'commit_percentage': round(stats['commit_count'] / commits_with_timezone * 100, 2),
-            'unique_authors': len(stats['authors']),
+            'commit_count': commit_count,
+            'commit_percentage': round(commit_count / commits_with_timezone * 100, 2),
+            'unique_authors': bucket_unique_authors,
             'top_authors': [
                 {'email': email, 'commits': count}
                 for email, count in top_authors
             ]
         })
     
-    return {
+    result = {
         'repository_url': commits_data.get('repository_url', ''),
         'repository_name': commits_data.get('repository_name', ''),
         'analysis_timestamp': datetime.now().isoformat(),
         'summary': {
-            'total_commits_analyzed': total_commits,
+            'total_commits_analyzed': len(commits),
             'commits_with_timezone': commits_with_timezone,
-            'commits_without_timezone': total_commits - commits_with_timezone,
-            'unique_timezones': len(timezone_stats),
-            'total_unique_authors': len(set(
-                email for stats in timezone_stats.values() 
-                for email in stats['authors']
-            ))
+            'commits_without_timezone': len(commits) - commits_with_timezone,
+            'unique_timezones': len(geographic_distribution),
+            'total_unique_authors': unique_authors
         },
         'geographic_distribution': geographic_distribution
     }
+    if author_hours:
+        result['author_hour_histogram'] = hour_histogram
+    return result
 
 
-def process_commits_file(commits_file_path, output_file_path=None):
+def analyze_geographic_distribution(commits_data, author_hours=False):
     """
-    Process a commits.json file and generate geographic distribution analysis.
+    Analyze geographic distribution from commits data.
+    Returns statistics grouped by timezone/region.
+    
+    With author_hours, the result also holds each author's commits per local
+    hour of the day (author_hour_histogram: email -> 24 counts), collected in
+    the same pass.
+    """
+    return _distribution(commits_data, _count(commits_data.get('commits', []), author_hours), author_hours)
+
+
+def analyze_with_partial(commits_data, author_hours=False):
+    """
+    analyze_geographic_distribution plus the mergeable partial aggregate
+    (see geo_rollup.py) of the same pass, as (result, partial).
+    """
+    commits = commits_data.get('commits', [])
+    counted = _count(commits, author_hours, author_counts=True)
+    commits_with_timezone, buckets, _, _ = counted
+    
+    all_authors = HyperLogLog()
+    timezones = []
+    for bucket in sorted(buckets):
+        commit_count, last_offset, _, _, author_counts = buckets[bucket]
+        all_authors.update(author_counts)
+        timezones.append({
+            'bucket': bucket - MAX_BUCKET,
+            'offset_minutes': last_offset,
+            'commit_count': commit_count,
+            'authors_hll': HyperLogLog().update(author_counts).to_string(),
+            'author_commits': sorted(author_counts.items(), key=lambda x: (-x[1], x[0]))
+        })
+    
+    partial = {
+        'version': PARTIAL_VERSION,
+        'repository_url': commits_data.get('repository_url', ''),
+        'repository_name': commits_data.get('repository_name', ''),
+        'hll_precision': all_authors.precision,
+        'total_commits_analyzed': len(commits),
+        'commits_with_timezone': commits_with_timezone,
+        'authors_hll': all_authors.to_string(),
+        'timezones': timezones
+    }
+    return _distribution(commits_data, counted, author_hours), partial
+
+
+def save_geographic_distribution(result, output_file_path):
+    """Write an analyze_geographic_distribution() result as JSON"""
+    with open(output_file_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+def save_geo_partial(partial, output_file_path):
+    """Write an analyze_with_partial() partial as compact JSON"""
+    with open(output_file_path, 'w', encoding='utf-8') as f:
+        json.dump(partial, f, separators=(',', ':'), ensure_ascii=False)
+
+
+def load_commits_data(commits_file_path, author_hours=False):
+    """
+    The commits.json document of a commits.json file or commit store.
+    Of a store only the columns the analysis reads are decompressed; dates
+    are only derived for the author hour histogram, as every offset is stored.
+    """
+    if not zipfile.is_zipfile(commits_file_path):
+        with open(commits_file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    store = CommitStore(commits_file_path)
+    return {
+        'repository_url': store.repository_url,
+        'repository_name': store.repository_name,
+        'total_commits': len(store),
+        'commits': list(store.iter_records(
+            ['author_email', 'tz_offset_minutes'] + (['date'] if author_hours else [])
+        ))
+    }
+
+
+def process_commits_file(commits_file_path, output_file_path=None, author_hours=False, partial=False):
+    """
+    Process a commits.json file (or commit store) and generate geographic distribution analysis.
+    With partial, geo_partial.json is written next to the output as well.
     """
     print(f"Reading commits from: {commits_file_path}")
     
     try:
-        with open(commits_file_path, 'r', encoding='utf-8') as f:
-            commits_data = json.load(f)
+        commits_data = load_commits_data(commits_file_path, author_hours)
     except FileNotFoundError:
         print(f"Error: File not found: {commits_file_path}")
         return False
     except json.JSONDecodeError as e:
         print(f"Error: Invalid JSON in file: {e}")
         return False
+    except (KeyError, ValueError) as e:
+        print(f"Error: Invalid commit store: {e}")
+        return False
     
     print(f"Analyzing {commits_data.get('total_commits', 0)} commits...")
     
     # Analyze geographic distribution
-    result = analyze_geographic_distribution(commits_data)
+    if partial:
+        result, geo_partial = analyze_with_partial(commits_data, author_hours)
+    else:
+        result = analyze_geographic_distribution(commits_data, author_hours)
     
     # Determine output path
     if output_file_path is None:
@@ -208,8 +442,9 @@ def process_commits_file(commits_file_path, output_file_path=None):
         output_file_path = os.path.join(base_dir, 'geographic_distribution.json')
     
     # Save results
-    with open(output_file_path, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    save_geographic_distribution(result, output_file_path)
+    if partial:
+        save_geo_partial(geo_partial, os.path.join(os.path.dirname(output_file_path), PARTIAL_FILE))
     
     print(f"\nGeographic Distribution Analysis:")
     print(f"  Total commits: {result['summary']['total_commits_analyzed']}")
@@ -229,17 +464,26 @@ def process_commits_file(commits_file_path, output_file_path=None):
 
 def main():
     """Main entry point"""
-    if len(sys.argv) < 2:
-        print("Usage: python3 analyze_geo_distribution.py <commits.json> [output.json]")
+    options = {'--author-hours', '--partial'}
+    args = [arg for arg in sys.argv[1:] if arg not in options]
+    author_hours = '--author-hours' in sys.argv[1:]
+    partial = '--partial' in sys.argv[1:]
+    if not args:
+        print("Usage: python3 analyze_geo_distribution.py <commits.json> [output.json] [--author-hours] [--partial]")
         print("\nExample:")
         print("  python3 analyze_geo_distribution.py results/my-repo/commits.json")
         print("  python3 analyze_geo_distribution.py results/my-repo/commits.json results/my-repo/geo.json")
+        print("  python3 analyze_geo_distribution.py results/my-repo/commits_columns.zip")
+        print("  python3 analyze_geo_distribution.py results/my-repo/commits.json --author-hours  "
+              "# plus commits per local hour of each author")
+        print("  python3 analyze_geo_distribution.py results/my-repo/commits.json --partial  "
+              "# plus geo_partial.json for geo_rollup.py")
         sys.exit(1)
     
-    commits_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
+    commits_file = args[0]
+    output_file = args[1] if len(args) > 1 else None
     
-    success = process_commits_file(commits_file, output_file)
+    success = process_commits_file(commits_file, output_file, author_hours, partial)
     sys.exit(0 if success else 1)
 
 
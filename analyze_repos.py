@@ -22,10 +22,35 @@ import shutil
 import tempfile
 import argparse
 import time
+import threading
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
+from functools import partial
 from io import StringIO
 from pathlib import Path
 
+from analyze_geo_distribution import (
+    PARTIAL_FILE as GEO_PARTIAL_FILE, PARTIAL_VERSION as GEO_PARTIAL_VERSION,
+    analyze_with_partial, load_commits_data, save_geo_partial, save_geographic_distribution
+)
+from analysis_manifest import (
+    artifact_is_current, collect_tool_versions, fingerprint,
+    get_repository_state, load_manifest, save_manifest
+)
+import complexity_analysis
+import complexity_store
+from commit_store import COMMIT_STORE_FILE, STORE_VERSION as COMMIT_STORE_VERSION, export_legacy_json, write_commit_store
+from complexity_cache import ComplexityCache
+from codemaat_batch import run_codemaat_batch
+from calculate_developer_ranking import DeveloperRankingCalculator
+from codemaat_engine import ChangeLog, CodeMaatEngine, ENGINE_VERSION
+from git_history import GitHistoryError, STORE_VERSION as HISTORY_STORE_VERSION, since_cutoff, update_history
+from path_index import AMBIGUOUS, PathIndex
+from stage_scheduler import ResourceBudget, Reused, Stage, StageScheduler, SUCCESS_STATUSES
+
 # ============================================================================
 # CONFIGURATION
 # ============================================================================
@@ -40,8 +65,112 @@ TRIVY_CACHE_DIR = './tools/trivy-cache'  # Default: use local cache in tools dir
 
 CODEMAAT_JAR_PATH = './tools/cm.jar'  # Default: use cm.jar in tools directory
 #CODEMAAT_JAR_PATH = 'C:\\devhome\\projects\\tools\\cm.jar'
+
+DEFAULT_JOBS = 1  # Number of repositories processed concurrently (1 = sequential)
+DEFAULT_CPU_BUDGET = os.cpu_count() or 4  # CPU slots shared by all running analysis stages
+DEFAULT_MEMORY_BUDGET_MB = None  # Memory shared by all running analysis stages (None = unlimited)
+LIZARD_WORKERS = min(4, os.cpu_count() or 1)  # Processes analyzing source files per Complexity run
+COMPLEXITY_FUNCTIONS_FILE = complexity_store.FUNCTIONS_FILE  # Every function found by Complexity, columnar (complexity.json keeps the top 500)
+COMPLEXITY_FILES_TABLE = complexity_store.FILE_TABLE  # Per-file complexity aggregates used by hotspots and ranking
+COMPLEXITY_CACHE_FILE = 'complexity_cache.sqlite'  # Per-blob Complexity results shared by all repositories (in the results directory)
+
+HISTORY_SINCE = '2.years'  # History window for commit and CodeAnalysis extraction
+HISTORY_STALL_TIMEOUT = 300  # Seconds git log may produce no output before it is stopped
+COMMIT_HISTORY_FILE = 'commit_history.jsonl'  # Extracted history, one commit per line
+EXPORT_COMMITS_JSON = False  # Also export the commit store as commits.json (read by AnalysisDashboard)
+
+# CodeAnalysis engine (can be overridden by command line argument --codeanalysis-engine)
+# 'jar' runs java -jar cm.jar once per analysis type; 'jar-batch' runs every analysis type in a
+# single JVM (tools/CodeMaatBatch.java, needs a JDK 11+); 'native' computes the analyses in-process
+# (opt-in until its CSVs are verified against cm.jar with benchmarks/compare_codemaat_modes.py)
+CODEANALYSIS_ENGINE = 'jar'
+
+# Clone strategy (can be overridden by command line argument --clone-strategy)
+# History analyses only need the 2-year window and snapshot analyses only need HEAD:
+#   full     - every blob of every revision
+#   blobless - all commits and trees, blobs fetched on demand (--filter=blob:none)
+#   treeless - all commits, trees and blobs fetched on demand (--filter=tree:0)
+# Every run walks the history window with git log --numstat, which needs the blobs of every
+# commit in the window; a blobless/treeless clone fetches them lazily, typically one round trip
+# per commit, so the history pass is far slower than on a full or shallow clone. They only pay
+# off when the full clone itself is the bottleneck (e.g. large binary files deep in history).
+#   shallow  - only the commits of the analysis window (--shallow-since), deepened when needed
+CLONE_STRATEGY = 'full'
+CLONE_STRATEGY_ARGS = {
+    'full': [],
+    'blobless': ['--filter=blob:none'],
+    'treeless': ['--filter=tree:0'],
+    'shallow': [f'--shallow-since={HISTORY_SINCE}'],
+}
 # ============================================================================
 
+# Estimated (cpu slots, memory MB) held by each analysis stage while it runs
+STAGE_RESOURCES = {
+    'history': (1, 512),
+    'commits': (1, 128),
+    'geo': (1, 128),
+    'techstack': (2, 256),
+    'complexity': (1, 512),
+    'vulnerabilities': (1, 1024),
+    'codeanalysis': (1, 1024),
+    'hotspots': (1, 256),
+    'developer_ranking': (1, 256),
+}
+
+# Serializes appends to access_error.txt when repositories run concurrently
+_ACCESS_ERROR_LOCK = threading.Lock()
+
+
+class RepoLogRouter:
+    """
+    Stand-in for sys.stdout that routes print() output to a per-thread buffer.
+
+    When repositories are processed concurrently each worker thread captures
+    its own output, so the console shows one contiguous block per repository
+    instead of interleaved lines. Threads without a capture buffer write
+    straight through to the real stream.
+    """
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+        self._lock = threading.Lock()
+    
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is not None:
+            return buffer.write(text)
+        with self._lock:
+            return self.stream.write(text)
+    
+    def flush(self):
+        if getattr(self._local, 'buffer', None) is None:
+            self.stream.flush()
+    
+    def __getattr__(self, name):
+        # Delegate encoding, isatty(), etc. to the real stream
+        return getattr(self.stream, name)
+    
+    def current_buffer(self):
+        """Return the capture buffer of the calling thread (or None)"""
+        return getattr(self._local, 'buffer', None)
+    
+    @contextmanager
+    def capture(self, buffer):
+        """Capture everything the calling thread prints into buffer"""
+        previous = getattr(self._local, 'buffer', None)
+        self._local.buffer = buffer
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = previous
+    
+    def emit(self, text):
+        """Write a complete block to the real stream without interleaving"""
+        with self._lock:
+            self.stream.write(text)
+            self.stream.flush()
+
 
 def extract_repo_name(repo_url):
     """Extract repository name from GitLab URL"""
@@ -88,13 +217,25 @@ def check_scc_installed(scc_path):
         return False
 
 
-def clone_or_update_repository(repo_url, clone_dir):
+def clone_or_update_repository(repo_url, clone_dir, clone_strategy=CLONE_STRATEGY):
     """Clone a repository or update it if it already exists"""
     
     # Check if repository already exists
     if os.path.exists(clone_dir) and os.path.exists(os.path.join(clone_dir, '.git')):
         print(f"  Repository already exists, checking for updates...")
         try:
+            # A clone made shallow by an earlier run gets its full history back
+            if clone_strategy == 'full' and is_shallow_repository(clone_dir):
+                print(f"  Converting shallow clone to full history...")
+                unshallow_result = subprocess.run(
+                    ["git", "-C", clone_dir, "fetch", "--unshallow"],
+                    capture_output=True,
+                    text=True,
+                    timeout=600
+                )
+                if unshallow_result.returncode != 0:
+                    print(f"  Warning: Failed to unshallow repository: {unshallow_result.stderr}")
+            
             # Fetch latest changes
             fetch_cmd = ["git", "-C", clone_dir, "fetch", "--all"]
             fetch_result = subprocess.run(
@@ -171,6 +312,7 @@ def clone_or_update_repository(repo_url, clone_dir):
         cmd = ["git"] + git_config + [
             "clone",
             "--single-branch",                     # Only main/default branch
+        ] + CLONE_STRATEGY_ARGS[clone_strategy] + [
             repo_url,
             clone_dir
         ]
@@ -182,7 +324,7 @@ def clone_or_update_repository(repo_url, clone_dir):
             check=True,
             timeout=600  # 10 minute timeout for full clone
         )
-        print(f"  Repository cloned successfully")
+        print(f"  Repository cloned successfully ({clone_strategy} clone)")
         return True, None
     except subprocess.CalledProcessError as e:
         error_msg = e.stderr if e.stderr else str(e)
@@ -196,66 +338,107 @@ def clone_or_update_repository(repo_url, clone_dir):
         return False, str(e)
 
 
-def collect_commit_data(repo_path):
-    """Collect git commit history data (last 2 years only)"""
-    print(f"  Collecting commit history (last 2 years)...")
+def is_shallow_repository(repo_path):
+    """True when the clone has a shallow (truncated) history"""
+    result = subprocess.run(
+        ["git", "-C", repo_path, "rev-parse", "--is-shallow-repository"],
+        capture_output=True,
+        text=True,
+        timeout=10
+    )
+    return result.returncode == 0 and result.stdout.strip() == "true"
+
+
+def ensure_history_depth(repo_path, since=HISTORY_SINCE):
+    """
+    Deepen a shallow clone until it covers the analysis window.
+    
+    A shallow boundary commit has no parents locally, so git log would report
+    its whole tree as added. The clone is therefore fetched back to the window
+    start (--shallow-since) and one commit further (--deepen=1): every commit
+    in the window then has its real parent and correct numstat.
+    """
     try:
-        # Git log command to extract commit data (last 2 years only)
-        # Use pipe delimiter to avoid JSON escaping issues with commit messages
-        cmd = [
-            "git", "-C", repo_path,
-            "log", "--all",
-            "--since=2.years",  # Only commits from last 2 years
-            "--date=iso-strict",
-            "--pretty=format:%H|%an|%ae|%ad|%s"  # Use pipe delimiter
-        ]
+        if not is_shallow_repository(repo_path):
+            return True
         
-        result = subprocess.run(
-            cmd,
+        shallow_file = subprocess.run(
+            ["git", "-C", repo_path, "rev-parse", "--git-path", "shallow"],
             capture_output=True,
             text=True,
-            timeout=120  # 2 minute timeout
-        )
-        
-        if result.returncode != 0:
-            print(f"  Warning: Failed to collect commit data: {result.stderr}")
-            return None
-        
-        if not result.stdout.strip():
-            print(f"  Warning: No commits found")
-            return []
-        
-        # Parse each line and create JSON objects
-        commits = []
-        for line in result.stdout.strip().split('\n'):
-            if line.strip():
-                try:
-                    # Split by pipe delimiter (max 5 parts to handle pipes in messages)
-                    parts = line.split('|', 4)
-                    if len(parts) >= 5:
-                        commit = {
-                            "hash": parts[0],
-                            "author_name": parts[1],
-                            "author_email": parts[2],
-                            "date": parts[3],
-                            "message": parts[4]  # Keep original message
-                        }
-                        commits.append(commit)
-                except Exception:
-                    # Silently skip malformed lines
-                    continue
-        
-        print(f"  Collected {len(commits)} commits")
-        return commits
-        
-    except subprocess.TimeoutExpired:
-        print(f"  Warning: Commit collection timed out")
-        return None
+            timeout=10
+        ).stdout.strip()
+        if not os.path.isabs(shallow_file):
+            shallow_file = os.path.join(repo_path, shallow_file)
+        with open(shallow_file, 'r', encoding='utf-8') as f:
+            boundary = f.read().split()
+        
+        cutoff = since_cutoff(repo_path, since)
+        if boundary and cutoff is not None:
+            times_result = subprocess.run(
+                ["git", "-C", repo_path, "log", "--no-walk", "--format=%ct"] + boundary,
+                capture_output=True,
+                text=True,
+                timeout=60
+            )
+            times = [int(t) for t in times_result.stdout.split() if t.isdigit()]
+            if times_result.returncode == 0 and times and max(times) < cutoff:
+                return True  # Every boundary commit is older than the window
+        
+        print(f"  Deepening shallow clone to cover the analysis window ({since})...")
+        for fetch_args in ([f"--shallow-since={since}"], ["--deepen=1"]):
+            result = subprocess.run(
+                ["git", "-C", repo_path, "fetch"] + fetch_args,
+                capture_output=True,
+                text=True,
+                timeout=600
+            )
+            if result.returncode != 0:
+                print(f"  Warning: Failed to deepen shallow clone: {result.stderr}")
+                return False
+        return True
     except Exception as e:
-        print(f"  Error collecting commit data: {e}")
+        print(f"  Warning: Failed to deepen shallow clone: {e}")
+        return False
+
+
+def extract_commit_history(repo_path, repo_results_dir, force=False):
+    """
+    Bring the repository's commit store (commit_history.jsonl, last 2 years)
+    up to date; commits.json and the CodeAnalysis log are derived from it.
+    
+    Only commits added since the previous run are extracted and records that
+    left the 2-year window are dropped; a rewritten history (force-push,
+    rebase) or force triggers a full extraction. The history is streamed to
+    disk, so memory use does not depend on the size of the repository.
+    """
+    print(f"  Extracting git history (last 2 years)...")
+    try:
+        history, stats = update_history(repo_path, os.path.join(repo_results_dir, COMMIT_HISTORY_FILE),
+                                        since=HISTORY_SINCE, stall_timeout=HISTORY_STALL_TIMEOUT, force=force)
+        if stats['mode'] == 'full':
+            print(f"  Extracted {stats['total']} commits (full extraction: {stats['reason']})")
+        else:
+            print(f"  Extracted {stats['new']} new commits, aged out {stats['aged_out']} "
+                  f"({stats['total']} commits in window)")
+        return history
+    except GitHistoryError as e:
+        print(f"  Warning: Failed to extract git history: {e}")
         return None
 
 
+def collect_commit_data(history):
+    """Collect git commit history data (last 2 years only) from the extracted history"""
+    print(f"  Collecting commit history (last 2 years)...")
+    if not len(history):
+        print(f"  Warning: No commits found")
+        return []
+    
+    commits = history.commit_records()
+    print(f"  Collected {len(commits)} commits")
+    return commits
+
+
 def analyze_with_scc(repo_path, scc_path):
     """Run scc on the repository and return JSON output"""
     print(f"  Running TechStack analysis...")
@@ -272,106 +455,49 @@ def analyze_with_scc(repo_path, scc_path):
     return None
 
 
-def analyze_with_lizard(repo_path):
-    """Run Complexity code complexity analysis using subprocess"""
-    print(f"  Running Complexity complexity analysis...")
+def analyze_with_lizard(repo_path, workers=LIZARD_WORKERS, cache=None, functions_file=None, files_table=None):
+    """Run Complexity code complexity analysis in-process (lizard API, process pool for workers > 1)
+
+    With a ComplexityCache only files whose git blob has not been analyzed before are parsed.
+    With functions_file every function (not only the top 500) is saved there as a columnar store;
+    with files_table the per-file aggregates are saved there as CSV (repository-relative paths).
+    """
+    print(f"  Running Complexity complexity analysis ({workers} worker{'s' if workers != 1 else ''})...")
+    if complexity_analysis.lizard is None:
+        print(f"  Warning: Complexity not found. Skipping complexity analysis.")
+        print(f"  Install with: pip install lizard")
+        return None
+    
     try:
-        # Determine Python command (python3 on Unix/Mac, python on Windows)
-        python_cmd = sys.executable if sys.executable else "python"
-        
-        # Run lizard via subprocess with CSV output for easier parsing
-        cmd = [
-            python_cmd, "-m", "lizard",
-            "--csv",
-            # Exclude common infrastructure directories
-            "-x", "*/node_modules/*",
-            "-x", "*/venv/*",
-            "-x", "*/env/*",
-            "-x", "*/__pycache__/*",
-            "-x", "*/.git/*",
-            repo_path
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=600  # 10 minute timeout for large repos
-        )
-        
-        if result.returncode != 0 and result.returncode != 120:  # 120 is lizard's "files too complex" code
-            print(f"  Warning: Complexity analysis returned error: {result.stderr}")
-            return None
-        
-        if not result.stdout.strip():
-            print(f"  Warning: No Complexity output")
-            return None
-        
-        # Parse CSV output (Complexity CSV has no header row)
-        # Format: NLOC,CCN,token,PARAM,length,location,file,function,long_name,start_line,end_line
-        functions_list = []
-        csv_reader = csv.reader(StringIO(result.stdout))
-        
-        for row in csv_reader:
-            try:
-                if len(row) >= 11:  # Ensure we have all expected columns
-                    functions_list.append({
-                        'nloc': int(row[0]),
-                        'cyclomatic_complexity': int(row[1]),
-                        'token_count': int(row[2]),
-                        'parameter_count': int(row[3]),
-                        'length': int(row[4]),
-                        'file': row[6],
-                        'name': row[7],
-                        'long_name': row[8],
-                        'start_line': int(row[9]),
-                        'end_line': int(row[10]),
-                    })
-            except (ValueError, IndexError) as e:
-                # Skip malformed rows
-                continue
-        
-        # Calculate summary statistics
-        if functions_list:
-            complexities = [f['cyclomatic_complexity'] for f in functions_list]
-            summary = {
-                'total_functions': len(functions_list),
-                'average_complexity': round(sum(complexities) / len(complexities), 2),
-                'max_complexity': max(complexities),
-                'min_complexity': min(complexities),
-                'complexity_distribution': {
-                    'low': len([f for f in functions_list if f['cyclomatic_complexity'] <= 5]),
-                    'medium': len([f for f in functions_list if 5 < f['cyclomatic_complexity'] <= 10]),
-                    'high': len([f for f in functions_list if 10 < f['cyclomatic_complexity'] <= 20]),
-                    'very_high': len([f for f in functions_list if f['cyclomatic_complexity'] > 20])
-                },
-                'total_nloc': sum(f['nloc'] for f in functions_list)
-            }
-            
-            # Sort by complexity (highest first) to capture most important functions
-            functions_list.sort(key=lambda x: x['cyclomatic_complexity'], reverse=True)
-        else:
-            summary = {
-                'total_functions': 0,
-                'average_complexity': 0,
-                'max_complexity': 0,
-                'min_complexity': 0
-            }
+        # Functions are aggregated as files complete; only the most complex ones are kept
+        # Every function is streamed to functions_file in chunks; only per-file aggregates stay in memory
+        columns = complexity_store.FunctionColumns(repo_path, functions_file) if functions_file or files_table else None
+        try:
+            aggregator = complexity_analysis.analyze_paths([repo_path], workers=workers, cache=cache,
+                                                           columns=columns)
+        except BaseException:
+            if columns is not None:
+                columns.discard()
+            raise
+        summary = aggregator.summary()
         
         print(f"  Found {summary['total_functions']} functions")
+        if cache is not None:
+            print(f"  Complexity cache: {aggregator.cached_files} of {aggregator.file_count} files unchanged")
         
-        return {
+        lizard_data = {
             'summary': summary,
-            'functions': functions_list[:500]  # Limit to top 500 most complex functions
+            'functions': aggregator.top_functions()  # Top 500 most complex functions
         }
+        if functions_file:
+            columns.close()
+            print(f"  All {len(columns)} functions of {len(columns.files)} files saved to: {functions_file}")
+            lizard_data['functions_file'] = os.path.basename(functions_file)
+        if files_table:
+            columns.save_file_table(files_table)
+            lizard_data['files_table'] = os.path.basename(files_table)
+        return lizard_data
         
-    except FileNotFoundError:
-        print(f"  Warning: Complexity not found. Skipping complexity analysis.")
-        print(f"  Install with: pip install lizard")
-        return None
-    except subprocess.TimeoutExpired:
-        print(f"  Warning: Complexity analysis timed out.")
-        return None
     except Exception as e:
         print(f"  Error running Complexity analysis: {e}")
         return None
@@ -502,64 +628,49 @@ def analyze_with_trivy(repo_path, trivy_path='trivy', cache_dir=None):
         return None
 
 
-def analyze_with_codeanalysis(repo_path, repo_name, repo_results_dir, jar_path='./tools/cm.jar'):
+def analyze_with_codeanalysis(history, repo_name, repo_results_dir, jar_path='./tools/cm.jar', engine=CODEANALYSIS_ENGINE):
     """Run CodeAnalysis evolution analysis (last 2 years) - All 15 analysis types
     
     Saves each analysis as a separate CSV file:
     - {repo}_cm_revisions.csv
     - {repo}_cm_authors.csv
     - etc.
+    
+    engine 'native' computes every analysis in-process from the extracted
+    history (codemaat_engine); 'jar' runs java -jar cm.jar per analysis;
+    'jar-batch' runs all analyses in one JVM (codemaat_batch).
     """
-    print(f"  Running CodeAnalysis evolution analysis (15 types, last 2 years)...")
+    print(f"  Running CodeAnalysis evolution analysis (15 types, last 2 years, {engine} engine)...")
     
     try:
-        # Check if CodeAnalysis exists
-        if not os.path.isfile(jar_path):
-            print(f"  Warning: CodeAnalysis JAR not found at: {jar_path}")
-            print(f"  Skipping CodeAnalysis analysis.")
-            return None
-        
-        # Check if Java is available
-        try:
-            subprocess.run(["java", "-version"], capture_output=True, timeout=5)
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            print(f"  Warning: Java not found. CodeAnalysis requires Java.")
-            return None
-        
-        # Extract git log in CodeAnalysis format (last 2 years)
-        print(f"  Extracting git log for CodeAnalysis...")
-        log_cmd = [
-            "git", "-C", repo_path,
-            "log", "--all",
-            "--since=2.years",  # Last 2 years only
-            "--numstat",
-            "--date=short",
-            "--pretty=format:--%h--%ad--%aN",
-            "--no-renames"
-        ]
-        
-        log_result = subprocess.run(
-            log_cmd,
-            capture_output=True,
-            text=True,
-            timeout=120
-        )
+        if engine in ('jar', 'jar-batch'):
+            # Check if CodeAnalysis exists
+            if not os.path.isfile(jar_path):
+                print(f"  Warning: CodeAnalysis JAR not found at: {jar_path}")
+                print(f"  Skipping CodeAnalysis analysis.")
+                return None
+            
+            # Check if Java is available
+            try:
+                subprocess.run(["java", "-version"], capture_output=True, timeout=5)
+            except (FileNotFoundError, subprocess.TimeoutExpired):
+                print(f"  Warning: Java not found. CodeAnalysis requires Java.")
+                return None
         
-        if log_result.returncode != 0 or not log_result.stdout.strip():
+        # Derive the git log in CodeAnalysis format from the extracted history (last 2 years)
+        if not len(history):
             print(f"  Warning: Failed to extract git log for CodeAnalysis")
             return None
         
-        git_log = log_result.stdout
-        
         # Save git log to file for future use
         log_filename = f"{repo_name}_code-analysis.log"
         log_path = os.path.join(repo_results_dir, log_filename)
         try:
-            with open(log_path, 'w', encoding='utf-8') as f:
-                f.write(git_log)
+            history.write_codemaat_log(log_path)
             print(f"  Git log saved: {log_filename}")
         except Exception as e:
             print(f"  Warning: Failed to save git log: {e}")
+            return None
         
         # Run all available CodeAnalysis analyses
         analyses_to_run = [
@@ -583,42 +694,70 @@ def analyze_with_codeanalysis(repo_path, repo_name, repo_results_dir, jar_path='
         successful_analyses = 0
         failed_analyses = 0
         
-        for analysis_type in analyses_to_run:
-            try:
-                # Run CodeAnalysis analysis using the saved log file
-                cmd = [
-                    "java", "-jar", jar_path,
-                    "-l", log_path,
-                    "-c", "git2",
-                    "-a", analysis_type
-                ]
-                
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=300
+        if engine == 'native':
+            # The history is parsed once; every analysis shares its aggregates
+            codemaat = CodeMaatEngine(ChangeLog.from_history(history))
+            for analysis_type in analyses_to_run:
+                csv_filename = f"{repo_name}_code-analysis_{analysis_type.replace('-', '_')}.csv"
+                try:
+                    entries_count = codemaat.write_csv(analysis_type, os.path.join(repo_results_dir, csv_filename))
+                    print(f"  {analysis_type}: {entries_count} entries -> {csv_filename}")
+                    successful_analyses += 1
+                except Exception as e:
+                    print(f"  Warning: {analysis_type}: {str(e)}")
+                    failed_analyses += 1
+        else:
+            batch_outputs = {}
+            if engine == 'jar-batch':
+                # All analyses in one JVM; anything it could not produce runs one JVM per analysis below
+                batch_outputs, batch_error = run_codemaat_batch(
+                    jar_path, log_path, repo_results_dir, f"{repo_name}_code-analysis_", analyses_to_run
                 )
-                
-                if result.returncode == 0 and result.stdout.strip():
-                    # Save CSV output directly to file
+                if batch_error:
+                    print(f"  Warning: single-JVM batch completed {len(batch_outputs)}/{len(analyses_to_run)} analyses ({batch_error})")
+            
+            for analysis_type in analyses_to_run:
+                try:
                     csv_filename = f"{repo_name}_code-analysis_{analysis_type.replace('-', '_')}.csv"
                     csv_path = os.path.join(repo_results_dir, csv_filename)
                     
-                    with open(csv_path, 'w', encoding='utf-8') as f:
-                        f.write(result.stdout)
+                    if analysis_type in batch_outputs:
+                        with open(csv_path, 'r', encoding='utf-8') as f:
+                            output = f.read()
+                    else:
+                        # Run CodeAnalysis analysis using the saved log file
+                        cmd = [
+                            "java", "-jar", jar_path,
+                            "-l", log_path,
+                            "-c", "git2",
+                            "-a", analysis_type
+                        ]
+                        
+                        result = subprocess.run(
+                            cmd,
+                            capture_output=True,
+                            text=True,
+                            timeout=300
+                        )
+                        
+                        output = result.stdout if result.returncode == 0 else ''
+                        if output.strip():
+                            # Save CSV output directly to file
+                            with open(csv_path, 'w', encoding='utf-8') as f:
+                                f.write(output)
                     
-                    # Count entries (lines - 1 for header)
-                    entries_count = len(result.stdout.strip().split('\n')) - 1
-                    print(f"  {analysis_type}: {entries_count} entries -> {csv_filename}")
-                    successful_analyses += 1
-                else:
-                    print(f"  Warning: {analysis_type}: No data or analysis failed")
-                    failed_analyses += 1
+                    if output.strip():
+                        # Count entries (lines - 1 for header)
+                        entries_count = len(output.strip().split('\n')) - 1
+                        print(f"  {analysis_type}: {entries_count} entries -> {csv_filename}")
+                        successful_analyses += 1
+                    else:
+                        print(f"  Warning: {analysis_type}: No data or analysis failed")
+                        failed_analyses += 1
                     
-            except Exception as e:
-                print(f"  Warning: {analysis_type}: {str(e)}")
-                failed_analyses += 1
+                except Exception as e:
+                    print(f"  Warning: {analysis_type}: {str(e)}")
+                    failed_analyses += 1
         
         # Return summary
         return {
@@ -680,67 +819,28 @@ def analyze_hotspots(repo_name, repo_results_dir, complexity_data, codeanalysis_
             print(f"  Warning: No complexity data available")
             return None
         
-        file_complexity = {}
-        for func in complexity_data['functions']:
-            file_path = func['file']
-            complexity = func['cyclomatic_complexity']
-            nloc = func['nloc']
-            
-            if file_path not in file_complexity:
-                file_complexity[file_path] = {
-                    'max_complexity': 0,
-                    'total_complexity': 0,
-                    'function_count': 0,
-                    'total_nloc': 0
-                }
-            
-            file_complexity[file_path]['function_count'] += 1
-            file_complexity[file_path]['total_complexity'] += complexity
-            file_complexity[file_path]['total_nloc'] += nloc
-            file_complexity[file_path]['max_complexity'] = max(
-                file_complexity[file_path]['max_complexity'], 
-                complexity
-            )
-        
-        # Calculate averages and normalize paths for efficient matching
-        normalized_complexity = {}
-        for file_path in file_complexity:
-            file_complexity[file_path]['avg_complexity'] = round(
-                file_complexity[file_path]['total_complexity'] / 
-                file_complexity[file_path]['function_count'], 
-                2
-            )
-            # Normalize path for matching (use forward slashes, lowercase for case-insensitive)
-            normalized_key = os.path.normpath(file_path).replace('\\', '/').lower()
-            normalized_complexity[normalized_key] = (file_path, file_complexity[file_path])
+        files_table = complexity_data.get('files_table')
+        if files_table and os.path.exists(os.path.join(repo_results_dir, files_table)):
+            # Per-file aggregates of all functions, written by the Complexity stage
+            file_complexity = complexity_store.load_file_table(os.path.join(repo_results_dir, files_table))
+        else:
+            # Older results: only the top 500 functions are available
+            file_complexity = complexity_store.aggregate_functions(complexity_data['functions'])
+        complexity_index = PathIndex(file_complexity)
         
         # 3. Combine revisions + complexity to find hotspots
         print(f"  Matching {len(revisions)} files with {len(file_complexity)} complexity entries...")
         hotspots = []
         unmatched_count = 0
+        ambiguous = []
         
         try:
-            for idx, (file_path, revs) in enumerate(revisions.items()):
-                # Progress indicator for large datasets (every 1000 files)
-                if idx > 0 and idx % 1000 == 0:
-                    print(f"  Progress: {idx}/{len(revisions)} files processed...")
-                
-                # Try to match file paths (CodeAnalysis may have different path format)
-                matched_complexity = None
-                
-                # Normalize revision file path
-                norm_rev_path = os.path.normpath(file_path).replace('\\', '/').lower()
-                
-                # Try direct match first (fastest - O(1) lookup)
-                if norm_rev_path in normalized_complexity:
-                    _, matched_complexity = normalized_complexity[norm_rev_path]
-                else:
-                    # Try suffix matching only if needed (slower - O(n) worst case)
-                    # This handles cases where paths differ (e.g., relative vs absolute)
-                    for norm_complex_path, (original_path, complexity_data) in normalized_complexity.items():
-                        if norm_complex_path.endswith(norm_rev_path) or norm_rev_path.endswith(norm_complex_path):
-                            matched_complexity = complexity_data
-                            break
+            for file_path, revs in revisions.items():
+                # Both repository-relative; older Complexity results include the clone directory
+                match = complexity_index.lookup(file_path)
+                matched_complexity = match.value
+                if match.status == AMBIGUOUS:
+                    ambiguous.append((file_path, match.candidates))
                 
                 if matched_complexity:
                     avg_complexity = matched_complexity['avg_complexity']
@@ -775,7 +875,7 @@ def analyze_hotspots(repo_name, repo_results_dir, complexity_data, codeanalysis_
                         'hotspot_score': hotspot_score,
                         'risk_level': risk_level
                     })
-                else:
+                elif match.status != AMBIGUOUS:
                     unmatched_count += 1
         
         except Exception as e:
@@ -789,6 +889,10 @@ def analyze_hotspots(repo_name, repo_results_dir, complexity_data, codeanalysis_
         print(f"  Matched {len(hotspots)}/{len(revisions)} files ({match_rate}%)")
         if unmatched_count > 0:
             print(f"  Note: {unmatched_count} files have no complexity data (non-code files or excluded)")
+        if ambiguous:
+            print(f"  Note: {len(ambiguous)} files left unmatched because several complexity entries end with their path")
+            for file_path, candidates in ambiguous[:5]:
+                print(f"     {file_path} -> {', '.join(candidates)}")
         
         if not hotspots:
             print(f"  Warning: No hotspots identified (no files matched complexity data)")
@@ -832,44 +936,25 @@ def analyze_hotspots(repo_name, repo_results_dir, complexity_data, codeanalysis_
         return None
 
 
-def run_geographic_analysis(commits_file, output_dir):
+def run_geographic_analysis(commits, output_dir):
     """
-    Run geographic distribution analysis on commits.json file.
-    Calls analyze_geo_distribution.py as a subprocess.
+    Run geographic distribution analysis in-process.
+    
+    commits is the commit results dict the commits stage just saved, or the
+    path of a commit store or commits.json reused from an earlier run. The
+    mergeable partial for the org-wide rollup (geo_rollup.py) is written as well.
     """
     try:
-        # Get the path to analyze_geo_distribution.py script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        geo_script = os.path.join(script_dir, 'analyze_geo_distribution.py')
-        
-        # Check if script exists
-        if not os.path.exists(geo_script):
-            print(f"  Warning: Geographic analysis script not found: {geo_script}")
-            return False
+        if not isinstance(commits, dict):
+            commits = load_commits_data(commits)
         
-        # Determine Python command (python3 on Unix/Mac, python on Windows)
-        python_cmd = sys.executable if sys.executable else "python"
-        
-        # Run the geographic analysis script
         output_file = os.path.join(output_dir, 'geographic_distribution.json')
-        
-        result = subprocess.run(
-            [python_cmd, geo_script, commits_file, output_file],
-            capture_output=True,
-            text=True,
-            timeout=60  # 1 minute timeout
-        )
-        
-        if result.returncode == 0:
-            print(f"  Geographic distribution analysis completed")
-            return True
-        else:
-            print(f"  Warning: Geographic analysis failed: {result.stderr}")
-            return False
+        result, partial = analyze_with_partial(commits)
+        save_geographic_distribution(result, output_file)
+        save_geo_partial(partial, os.path.join(output_dir, GEO_PARTIAL_FILE))
+        print(f"  Geographic distribution analysis completed")
+        return True
             
-    except subprocess.TimeoutExpired:
-        print(f"  Warning: Geographic analysis timed out")
-        return False
     except Exception as e:
         print(f"  Warning: Could not run geographic analysis: {e}")
         return False
@@ -877,73 +962,49 @@ def run_geographic_analysis(commits_file, output_dir):
 
 def run_developer_ranking(repo_results_dir, repo_name):
     """
-    Run developer ranking analysis on the repository results.
-    Calls calculate_developer_ranking.py as a subprocess.
+    Run developer ranking analysis on the repository results, in-process.
     
     Requires:
-    - commits.json
+    - commits_columns.zip or commits.json
     - *_hotspots.csv
     - CodeAnalysis analysis files
     """
     try:
-        # Get the path to calculate_developer_ranking.py script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        ranking_script = os.path.join(script_dir, 'calculate_developer_ranking.py')
-        
-        # Check if script exists
-        if not os.path.exists(ranking_script):
-            print(f"  Warning: Developer ranking script not found: {ranking_script}")
-            return False
-        
         # Check if required files exist
+        commit_files = [
+            os.path.join(repo_results_dir, COMMIT_STORE_FILE),
+            os.path.join(repo_results_dir, 'commits.json')
+        ]
         required_files = [
-            os.path.join(repo_results_dir, 'commits.json'),
             os.path.join(repo_results_dir, f'{repo_name}_hotspots.csv'),
             os.path.join(repo_results_dir, f'{repo_name}_code-analysis_entity_ownership.csv'),
             os.path.join(repo_results_dir, f'{repo_name}_code-analysis_main_dev.csv')
         ]
         
         missing_files = [f for f in required_files if not os.path.exists(f)]
-        if missing_files:
+        if missing_files or not any(os.path.exists(f) for f in commit_files):
             print(f"  Skipping developer ranking: Missing required files")
             return False
         
-        # Determine Python command
-        python_cmd = sys.executable if sys.executable else "python"
-        
         # Prepare output paths
         json_output = os.path.join(repo_results_dir, 'developer_rankings.json')
         csv_output = os.path.join(repo_results_dir, 'developer_rankings.csv')
         
-        # Run the developer ranking script
-        result = subprocess.run(
-            [
-                python_cmd, ranking_script,
-                repo_results_dir,
-                '--output-json', json_output,
-                '--output-csv', csv_output,
-                '--top', '50'  # Show top 50 in console
-            ],
-            capture_output=True,
-            text=True,
-            timeout=120  # 2 minute timeout
-        )
-        
-        if result.returncode == 0:
-            print(f"  Developer ranking analysis completed")
-            print(f"     Rankings saved to:")
-            print(f"       - {os.path.basename(json_output)}")
-            print(f"       - {os.path.basename(csv_output)}")
-            return True
-        else:
-            print(f"  Warning: Developer ranking failed: {result.stderr}")
-            return False
+        # The calculator's console report stays out of the repository log, as it did from the subprocess
+        with active_log_router() as log_router, log_router.capture(StringIO()):
+            calculator = DeveloperRankingCalculator(Path(repo_results_dir))
+            calculator.run_analysis()
+            calculator.save_detailed_report(Path(json_output))
+            calculator.save_csv_report(Path(csv_output))
+        
+        print(f"  Developer ranking analysis completed")
+        print(f"     Rankings saved to:")
+        print(f"       - {os.path.basename(json_output)}")
+        print(f"       - {os.path.basename(csv_output)}")
+        return True
             
-    except subprocess.TimeoutExpired:
-        print(f"  Warning: Developer ranking timed out")
-        return False
     except Exception as e:
-        print(f"  Warning: Could not run developer ranking: {e}")
+        print(f"  Warning: Developer ranking failed: {e}")
         return False
 
 
@@ -973,13 +1034,19 @@ def log_access_error(repo_url, error_message, results_dir):
         
         error_file = os.path.join(results_dir, 'access_error.txt')
         
+        # Build the whole entry first so concurrent workers append it atomically
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        entry = (
+            f"{repo_url}\n"
+            f"  Error: {error_message}\n"
+            f"  Timestamp: {timestamp}\n"
+            + "-" * 80 + "\n"
+        )
+        
         # Append error to file
-        with open(error_file, 'a', encoding='utf-8') as f:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"{repo_url}\n")
-            f.write(f"  Error: {error_message}\n")
-            f.write(f"  Timestamp: {timestamp}\n")
-            f.write("-" * 80 + "\n")
+        with _ACCESS_ERROR_LOCK:
+            with open(error_file, 'a', encoding='utf-8') as f:
+                f.write(entry)
         
         print(f"  Access error logged to: {error_file}")
         return True
@@ -988,8 +1055,142 @@ def log_access_error(repo_url, error_message, results_dir):
         return False
 
 
-def process_repository(repo_url, results_dir, repos_base_dir, scc_path, trivy_path='trivy', trivy_cache_dir=None, codeanalysis_jar_path=None, run_lizard=True, run_trivy=False, run_codeanalysis=False):
-    """Process a single repository: clone/update, analyze, and save results"""
+@contextmanager
+def active_log_router():
+    """Yield the RepoLogRouter installed on sys.stdout, installing one for the duration if needed"""
+    if isinstance(sys.stdout, RepoLogRouter):
+        yield sys.stdout
+        return
+    
+    router = RepoLogRouter(sys.stdout)
+    original_stdout = sys.stdout
+    sys.stdout = router
+    try:
+        yield router
+    finally:
+        sys.stdout = original_stdout
+
+
+def save_stage_timings(scheduler, repo_results_dir):
+    """Save per-stage wall times and the critical path to stage_timings.json"""
+    report = scheduler.timing_report()
+    try:
+        with open(os.path.join(repo_results_dir, 'stage_timings.json'), 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    except Exception as e:
+        print(f"  Warning: Failed to save stage timings: {e}")
+    return report
+
+
+# Result files of each stage, relative to the repository results directory
+STAGE_ARTIFACT_FILES = {
+    'commits': ['commits.json', COMMIT_STORE_FILE],
+    'geo': ['geographic_distribution.json', GEO_PARTIAL_FILE],
+    'techstack': ['techStack.json'],
+    'complexity': ['complexity.json', COMPLEXITY_FUNCTIONS_FILE, COMPLEXITY_FILES_TABLE],
+    'vulnerabilities': ['vulnerabilities.json'],
+    'hotspots': ['{repo_name}_hotspots.csv'],
+    'developer_ranking': ['developer_rankings.json', 'developer_rankings.csv'],
+}
+
+
+def stage_artifact_files(name, repo_name, repo_results_dir):
+    """Files produced by a stage that exist on disk"""
+    if name == 'codeanalysis':
+        prefix = f"{repo_name}_code-analysis"
+        candidates = [f for f in os.listdir(repo_results_dir) if f.startswith(prefix)]
+    else:
+        candidates = [f.format(repo_name=repo_name) for f in STAGE_ARTIFACT_FILES.get(name, [])]
+    return sorted(f for f in candidates if os.path.exists(os.path.join(repo_results_dir, f)))
+
+
+def update_manifest(repo_results_dir, repo_name, previous_manifest, repo_state, tool_versions,
+                    stage_fingerprints, scheduler, reused_results, loaders):
+    """Record the fingerprint and files of every artifact produced or reused by this run"""
+    artifacts = dict(previous_manifest.get('artifacts', {}))
+    
+    for name in scheduler.order:
+        status = scheduler.timings.get(name, {}).get('status')
+        if status == 'reused' and name in reused_results:
+            artifacts[name] = reused_results[name]
+        elif status == 'ok' and name in stage_fingerprints:
+            entry = {
+                'fingerprint': stage_fingerprints[name],
+                'files': stage_artifact_files(name, repo_name, repo_results_dir),
+                'generated_at': datetime.now().isoformat()
+            }
+            # Small results are kept so dependents can reuse them without re-reading files
+            if name not in loaders:
+                entry['result'] = scheduler.results[name]
+            artifacts[name] = entry
+        elif status in ('failed', 'skipped'):
+            artifacts.pop(name, None)
+    
+    save_manifest(repo_results_dir, {
+        'repository_name': repo_name,
+        'head_sha': repo_state['head_sha'],
+        'tree_sha': repo_state['tree_sha'],
+        'refs_sha': repo_state['refs_sha'],
+        'tool_versions': tool_versions,
+        'options_fingerprint': fingerprint(HISTORY_SINCE, sorted(stage_fingerprints)),
+        'updated_at': datetime.now().isoformat(),
+        'artifacts': artifacts
+    })
+
+
+def compute_stage_fingerprints(repo_state, tool_versions, export_commits_json=EXPORT_COMMITS_JSON):
+    """
+    Fingerprint the inputs of every stage.
+    
+    Snapshot analyses (TechStack, Complexity, Trivy) depend only on the HEAD
+    tree and the tool version, so they are reused when only history moved.
+    History analyses depend on every ref tip (git log --all). The commits
+    stage also depends on whether commits.json is exported.
+    """
+    tree_sha = repo_state['tree_sha']
+    refs_sha = repo_state['refs_sha']
+    fingerprints = {
+        'commits': fingerprint('commits', refs_sha, HISTORY_SINCE, HISTORY_STORE_VERSION, COMMIT_STORE_VERSION,
+                               export_commits_json),
+        'techstack': fingerprint('techstack', tree_sha, tool_versions.get('scc')),
+        'complexity': fingerprint('complexity', tree_sha, tool_versions.get('lizard'),
+                                  complexity_store.STORE_VERSION),
+        'vulnerabilities': fingerprint('vulnerabilities', tree_sha, tool_versions.get('trivy'),
+                                       tool_versions.get('trivy_db')),
+        'codeanalysis': fingerprint('codeanalysis', refs_sha, HISTORY_SINCE, HISTORY_STORE_VERSION,
+                                    tool_versions.get('codeanalysis_engine'),
+                                    tool_versions.get('codeanalysis_jar')),
+    }
+    fingerprints['geo'] = fingerprint('geo', fingerprints['commits'], GEO_PARTIAL_VERSION)
+    fingerprints['hotspots'] = fingerprint('hotspots', fingerprints['complexity'], fingerprints['codeanalysis'])
+    fingerprints['developer_ranking'] = fingerprint('developer_ranking', fingerprints['hotspots'],
+                                                    fingerprints['commits'])
+    return fingerprints
+
+
+def process_repository(repo_url, results_dir, repos_base_dir, scc_path, trivy_path='trivy', trivy_cache_dir=None, codeanalysis_jar_path=None, run_lizard=True, run_trivy=False, run_codeanalysis=False, resource_budget=None, tool_versions=None, force=False, clone_strategy=CLONE_STRATEGY, codeanalysis_engine=CODEANALYSIS_ENGINE, lizard_workers=LIZARD_WORKERS, complexity_cache=None, export_commits_json=EXPORT_COMMITS_JSON):
+    """
+    Process a single repository: clone/update, analyze, and save results.
+    
+    The analyses are expressed as a dependency graph and run by a
+    StageScheduler, so independent stages overlap:
+    
+      history -> commits -> geo
+      history -> codeanalysis
+      techstack, vulnerabilities (independent)
+      complexity + codeanalysis -> hotspots -> developer_ranking (+ commits)
+    
+    The history stage walks the git log once; commits.json and the
+    CodeAnalysis log are both derived from that single pass.
+    
+    resource_budget is a ResourceBudget shared with every other repository
+    in the run. Per-stage wall times are saved to stage_timings.json.
+    
+    Unless force is set, artifacts whose inputs (repository state, tool
+    versions from tool_versions) are unchanged since the run recorded in
+    analysis_manifest.json are reused, and a repository with nothing to
+    recompute is skipped entirely.
+    """
     repo_name = extract_repo_name(repo_url)
     print(f"\nProcessing: {repo_name}")
     print(f"="*60)
@@ -1003,7 +1204,7 @@ def process_repository(repo_url, results_dir, repos_base_dir, scc_path, trivy_pa
     
     try:
         # Clone or update the repository
-        clone_success, clone_error = clone_or_update_repository(repo_url, clone_path)
+        clone_success, clone_error = clone_or_update_repository(repo_url, clone_path, clone_strategy)
         if not clone_success:
             print(f"  Failed to clone repository: {repo_url}")
             print(f"  Error: {clone_error}")
@@ -1011,11 +1212,60 @@ def process_repository(repo_url, results_dir, repos_base_dir, scc_path, trivy_pa
             log_access_error(repo_url, clone_error, results_dir)
             return False
         
-        analysis_results = {}
+        # History analyses need the whole window even in a shallow clone
+        ensure_history_depth(clone_path)
+        
+        # Work out which artifacts can be reused from the previous run
+        repo_state = get_repository_state(clone_path)
+        previous_manifest = {} if force or not repo_state else load_manifest(repo_results_dir)
+        stage_fingerprints = compute_stage_fingerprints(repo_state, tool_versions or {}, export_commits_json) if repo_state else {}
+        reused_results = {}
+        
+        def reusable(name):
+            return (name in stage_fingerprints and
+                    artifact_is_current(previous_manifest, name, stage_fingerprints[name], repo_results_dir))
+        
+        def incremental(name, func, load=None):
+            """Wrap a stage so an artifact with unchanged inputs is reused"""
+            def run(inputs):
+                if reusable(name):
+                    entry = previous_manifest['artifacts'][name]
+                    result = load() if load else entry.get('result', True)
+                    if result not in (None, False):
+                        print(f"  {name}: inputs unchanged, reusing {', '.join(entry.get('files', []))}")
+                        reused_results[name] = entry
+                        return Reused(result)
+                return func(inputs)
+            return run
+        
+        # Walk the git history once for every history consumer
+        history_consumers = ['commits'] + (['codeanalysis'] if run_codeanalysis else [])
+        
+        def history_stage(_):
+            if all(reusable(name) for name in history_consumers):
+                return Reused(None)
+            return extract_commit_history(clone_path, repo_results_dir, force)
+        
+        fallback_history = []
+        fallback_lock = threading.Lock()
+        
+        def history_for(inputs):
+            if inputs['history'] is not None:
+                return inputs['history']
+            # The history stage expected a reuse that did not happen: update the store once
+            with fallback_lock:
+                if not fallback_history:
+                    fallback_history.append(extract_commit_history(clone_path, repo_results_dir, force))
+                return fallback_history[0]
         
         # Collect commit history data
-        commit_data = collect_commit_data(clone_path)
-        if commit_data is not None:
+        def commits_stage(inputs):
+            history = history_for(inputs)
+            if history is None:
+                return None
+            commit_data = collect_commit_data(history)
+            if commit_data is None:
+                return None
             commit_results = {
                 "repository_url": repo_url,
                 "repository_name": repo_name,
@@ -1023,17 +1273,45 @@ def process_repository(repo_url, results_dir, repos_base_dir, scc_path, trivy_pa
                 "commits": commit_data
             }
             output_file = os.path.join(repo_results_dir, "commits.json")
-            if save_results(commit_results, output_file):
-                analysis_results['commits'] = True
-                
-                # Run geographic distribution analysis on commits
-                run_geographic_analysis(output_file, repo_results_dir)
-        else:
-            analysis_results['commits'] = False
+            store_file = os.path.join(repo_results_dir, COMMIT_STORE_FILE)
+            try:
+                write_commit_store(store_file, commit_data, repo_url, repo_name)
+            except Exception as e:
+                print(f"  Warning: Could not save commit store, writing commits.json instead: {e}")
+                # Readers prefer the store over commits.json: never leave one from an earlier run
+                try:
+                    os.remove(store_file)
+                except FileNotFoundError:
+                    pass
+                if not save_results(commit_results, output_file):
+                    return None
+                return commit_results
+            print(f"  Results saved to: {store_file}")
+            if export_commits_json:
+                try:
+                    export_legacy_json(store_file, output_file)
+                    print(f"  Results saved to: {output_file}")
+                except Exception as e:
+                    print(f"  Warning: Could not export commits.json: {e}")
+            else:
+                # A commits.json from an earlier run would describe older history
+                try:
+                    os.remove(output_file)
+                except FileNotFoundError:
+                    pass
+            # geo works on the records in memory instead of re-reading the file
+            return commit_results
+        
+        # Run geographic distribution analysis on commits
+        def geo_stage(inputs):
+            return run_geographic_analysis(inputs['commits'], repo_results_dir)
         
         # Run TechStack analysis (tech stack)
-        scc_data = analyze_with_scc(clone_path, scc_path)
-        if scc_data:
+        def techstack_stage(_):
+            scc_data = analyze_with_scc(clone_path, scc_path)
+            if not scc_data:
+                print(f"  Warning: TechStack analysis failed")
+                return None
             scc_results = {
                 "repository_url": repo_url,
                 "repository_name": repo_name,
@@ -1042,75 +1320,116 @@ def process_repository(repo_url, results_dir, repos_base_dir, scc_path, trivy_pa
                 "analysis": scc_data
             }
             output_file = os.path.join(repo_results_dir, "techStack.json")
-            if save_results(scc_results, output_file):
-                analysis_results['techstack'] = True
-        else:
-            print(f"  Warning: TechStack analysis failed")
-            analysis_results['techstack'] = False
+            return save_results(scc_results, output_file)
         
         # Run Complexity analysis (code complexity)
-        lizard_data = None
-        if run_lizard:
-            lizard_data = analyze_with_lizard(clone_path)
-            if lizard_data:
-                lizard_results = {
-                    "repository_url": repo_url,
-                    "repository_name": repo_name,
-                    "analysis_type": "complexity",
-                    "tool": "lizard",
-                    "analysis": lizard_data
-                }
-                output_file = os.path.join(repo_results_dir, "complexity.json")
-                if save_results(lizard_results, output_file):
-                    analysis_results['complexity'] = True
-            else:
-                analysis_results['complexity'] = False
+        def complexity_stage(_):
+            lizard_data = analyze_with_lizard(clone_path, lizard_workers, complexity_cache,
+                                              os.path.join(repo_results_dir, COMPLEXITY_FUNCTIONS_FILE),
+                                              os.path.join(repo_results_dir, COMPLEXITY_FILES_TABLE))
+            if not lizard_data:
+                return None
+            lizard_results = {
+                "repository_url": repo_url,
+                "repository_name": repo_name,
+                "analysis_type": "complexity",
+                "tool": "lizard",
+                "analysis": lizard_data
+            }
+            output_file = os.path.join(repo_results_dir, "complexity.json")
+            save_results(lizard_results, output_file)
+            return lizard_data
         
         # Run Trivy analysis (vulnerabilities)
-        if run_trivy:
+        def vulnerabilities_stage(_):
             trivy_data = analyze_with_trivy(clone_path, trivy_path, trivy_cache_dir)
-            if trivy_data:
-                trivy_results = {
-                    "repository_url": repo_url,
-                    "repository_name": repo_name,
-                    "analysis_type": "vulnerabilities",
-                    "tool": "trivy",
-                    "analysis": trivy_data
-                }
-                output_file = os.path.join(repo_results_dir, "vulnerabilities.json")
-                if save_results(trivy_results, output_file):
-                    analysis_results['vulnerabilities'] = True
-            else:
-                analysis_results['vulnerabilities'] = False
+            if not trivy_data:
+                return None
+            trivy_results = {
+                "repository_url": repo_url,
+                "repository_name": repo_name,
+                "analysis_type": "vulnerabilities",
+                "tool": "trivy",
+                "analysis": trivy_data
+            }
+            output_file = os.path.join(repo_results_dir, "vulnerabilities.json")
+            return save_results(trivy_results, output_file)
         
         # Run CodeAnalysis analysis (code evolution)
-        codeanalysis_successful = False
-        if run_codeanalysis:
-            codeanalysis_summary = analyze_with_codeanalysis(clone_path, repo_name, repo_results_dir, codeanalysis_jar_path)
-            if codeanalysis_summary and codeanalysis_summary['successful'] > 0:
-                print(f"  CodeAnalysis: {codeanalysis_summary['successful']}/{codeanalysis_summary['total']} analyses completed")
-                analysis_results['codeanalysis'] = True
-                codeanalysis_successful = True
-            else:
-                analysis_results['codeanalysis'] = False
+        def codeanalysis_stage(inputs):
+            history = history_for(inputs)
+            if history is None:
+                return None
+            codeanalysis_summary = analyze_with_codeanalysis(history, repo_name, repo_results_dir, codeanalysis_jar_path,
+                                                              codeanalysis_engine)
+            if not codeanalysis_summary or codeanalysis_summary['successful'] == 0:
+                return None
+            print(f"  CodeAnalysis: {codeanalysis_summary['successful']}/{codeanalysis_summary['total']} analyses completed")
+            return codeanalysis_summary
         
         # Run Hotspot analysis (combines Complexity + CodeAnalysis)
-        # Automatically runs if both Complexity and CodeAnalysis data are available
-        hotspot_successful = False
-        if run_lizard and codeanalysis_successful and lizard_data:
-            hotspot_summary = analyze_hotspots(repo_name, repo_results_dir, lizard_data, True)
-            if hotspot_summary:
-                analysis_results['hotspots'] = True
-                hotspot_successful = True
-            else:
-                analysis_results['hotspots'] = False
+        def hotspots_stage(inputs):
+            return analyze_hotspots(repo_name, repo_results_dir, inputs['complexity'], True)
+        
+        # Run Developer Ranking analysis (needs CodeAnalysis + hotspots + commit history)
+        def ranking_stage(_):
+            return run_developer_ranking(repo_results_dir, repo_name)
+        
+        def load_commits():
+            store_file = os.path.join(repo_results_dir, COMMIT_STORE_FILE)
+            return store_file if os.path.exists(store_file) else os.path.join(repo_results_dir, "commits.json")
+        
+        def load_complexity():
+            with open(os.path.join(repo_results_dir, "complexity.json"), 'r', encoding='utf-8') as f:
+                return json.load(f).get('analysis')
+        
+        loaders = {'commits': load_commits, 'complexity': load_complexity}
+        
+        def stage(name, func, depends_on=()):
+            cpu, memory_mb = STAGE_RESOURCES.get(name, (1, 0))
+            if name == 'complexity':
+                # One CPU slot per Complexity worker process
+                cpu = max(cpu, lizard_workers)
+            return Stage(name, incremental(name, func, loaders.get(name)), depends_on,
+                         cpu=cpu, memory_mb=memory_mb)
+        
+        stages = [
+            stage('history', history_stage),
+            stage('commits', commits_stage, ['history']),
+            stage('geo', geo_stage, ['commits']),
+            stage('techstack', techstack_stage),
+        ]
+        if run_lizard:
+            stages.append(stage('complexity', complexity_stage))
+        if run_trivy:
+            stages.append(stage('vulnerabilities', vulnerabilities_stage))
+        if run_codeanalysis:
+            stages.append(stage('codeanalysis', codeanalysis_stage, ['history']))
+        # Hotspots and ranking run automatically when both Complexity and CodeAnalysis are enabled
+        if run_lizard and run_codeanalysis:
+            stages.append(stage('hotspots', hotspots_stage, ['complexity', 'codeanalysis']))
+            stages.append(stage('developer_ranking', ranking_stage, ['hotspots', 'commits']))
+        
+        if repo_state and previous_manifest and all(reusable(s.name) for s in stages if s.name != 'history'):
+            print(f"  Repository unchanged since last analysis (HEAD {repo_state['head_sha'][:12]}), skipping")
+            return True
         
-        # Run Developer Ranking analysis (automatic if CodeAnalysis + hotspots are available)
-        if codeanalysis_successful and hotspot_successful:
-            if run_developer_ranking(repo_results_dir, repo_name):
-                analysis_results['developer_ranking'] = True
-            else:
-                analysis_results['developer_ranking'] = False
+        with active_log_router() as log_router:
+            scheduler = StageScheduler(stages, budget=resource_budget, capture=log_router.capture)
+            scheduler.run()
+        
+        # Stages that ran report success/failure; skipped stages are left out, as before
+        analysis_results = {}
+        for name in scheduler.order:
+            status = scheduler.timings.get(name, {}).get('status')
+            if name not in ('history', 'geo') and status in SUCCESS_STATUSES + ('failed',):
+                analysis_results[name] = status in SUCCESS_STATUSES
+        
+        timing_report = save_stage_timings(scheduler, repo_results_dir)
+        
+        if repo_state:
+            update_manifest(repo_results_dir, repo_name, previous_manifest, repo_state, tool_versions or {},
+                            stage_fingerprints, scheduler, reused_results, loaders)
         
         # Print summary
         print(f"\n  Analysis Summary:")
@@ -1118,6 +1437,12 @@ def process_repository(repo_url, results_dir, repos_base_dir, scc_path, trivy_pa
             status = "[OK]" if success else "[FAIL]"
             print(f"     {status} {analysis_type.capitalize()}")
         
+        print(f"\n  Stage Timings (wall clock: {timing_report['total_wall_seconds']}s):")
+        for name, timing in timing_report['stages'].items():
+            print(f"     {name:<18} {timing['status']:<8} {timing.get('wall_seconds', 0.0):>8.1f}s")
+        print(f"     Critical path: {' -> '.join(timing_report['critical_path'])} "
+              f"({timing_report['critical_path_seconds']:.1f}s)")
+        
         # Return True if at least one analysis succeeded
         return any(analysis_results.values())
         
@@ -1145,6 +1470,126 @@ def read_repository_list(file_path):
         return None
 
 
+def process_repository_captured(repo_url, process_fn, log_router, results_dir, repo_locks):
+    """
+    Run process_fn for one repository with its console output captured.
+
+    The captured output is saved to {results}/{repo_name}/analysis.log and
+    returned so the caller can print it as one block.
+    """
+    repo_name = extract_repo_name(repo_url)
+    buffer = StringIO()
+    start_time = time.time()
+    success = False
+
+    # Two URLs with the same name share a clone/results directory, so they never run together
+    with repo_locks[repo_name]:
+        with log_router.capture(buffer):
+            try:
+                success = bool(process_fn(repo_url))
+            except Exception as e:
+                print(f"  Error processing repository {repo_name}: {e}")
+
+    elapsed = time.time() - start_time
+    log_text = buffer.getvalue()
+
+    repo_results_dir = os.path.join(results_dir, repo_name)
+    if os.path.isdir(repo_results_dir):
+        try:
+            with open(os.path.join(repo_results_dir, 'analysis.log'), 'w', encoding='utf-8') as f:
+                f.write(log_text)
+        except Exception:
+            pass
+
+    return {
+        'repository_url': repo_url,
+        'repository_name': repo_name,
+        'success': success,
+        'elapsed_seconds': round(elapsed, 1),
+        'log': log_text
+    }
+
+
+def run_repositories(repositories, process_fn, results_dir, jobs=1):
+    """
+    Process all repositories, sequentially or with a bounded worker pool.
+
+    Analyses are dominated by git/scc/trivy subprocesses, so a thread pool
+    overlaps them well. With jobs > 1 each repository's output is captured
+    and printed as one block when that repository finishes.
+
+    Returns a list of per-repository outcome dicts (in input order).
+    """
+    outcomes = []
+
+    if jobs <= 1:
+        for repo_url in repositories:
+            start_time = time.time()
+            success = process_fn(repo_url)
+            outcomes.append({
+                'repository_url': repo_url,
+                'repository_name': extract_repo_name(repo_url),
+                'success': bool(success),
+                'elapsed_seconds': round(time.time() - start_time, 1)
+            })
+        return outcomes
+
+    log_router = RepoLogRouter(sys.stdout)
+    repo_locks = defaultdict(threading.Lock)
+    original_stdout = sys.stdout
+    sys.stdout = log_router
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                executor.submit(
+                    process_repository_captured, repo_url, process_fn,
+                    log_router, results_dir, repo_locks
+                ): index
+                for index, repo_url in enumerate(repositories)
+            }
+
+            by_index = {}
+            for completed, future in enumerate(as_completed(futures), 1):
+                outcome = future.result()
+                by_index[futures[future]] = outcome
+                status = "[OK]" if outcome['success'] else "[FAIL]"
+                log_router.emit(
+                    outcome.pop('log') +
+                    f"\n[{completed}/{len(repositories)}] {status} {outcome['repository_name']} "
+                    f"({outcome['elapsed_seconds']}s)\n"
+                )
+
+            outcomes = [by_index[i] for i in range(len(repositories))]
+    finally:
+        sys.stdout = original_stdout
+
+    return outcomes
+
+
+def save_run_summary(outcomes, results_dir, jobs, elapsed):
+    """Save a consolidated summary of the whole run to run_summary.json"""
+    summary = {
+        'run_timestamp': datetime.now().isoformat(),
+        'jobs': jobs,
+        'elapsed_seconds': round(elapsed, 1),
+        'total_repositories': len(outcomes),
+        'successful': sum(1 for o in outcomes if o['success']),
+        'failed': sum(1 for o in outcomes if not o['success']),
+        'repositories': outcomes
+    }
+
+    try:
+        os.makedirs(results_dir, exist_ok=True)
+        summary_file = os.path.join(results_dir, 'run_summary.json')
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        return summary_file
+    except Exception as e:
+        print(f"Warning: Failed to save run summary: {e}")
+        return None
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Analyze GitLab repositories using multiple analysis tools',
@@ -1167,6 +1612,9 @@ Examples:
   python3 analyze_repos.py repos.txt --scc-path /usr/local/bin/scc
   python3 analyze_repos.py repos.txt --trivy --trivy-path ./tools/trivy
   python3 analyze_repos.py repos.txt --codeanalysis --codeanalysis-jar-path ./tools/cm.jar
+  python3 analyze_repos.py repos.txt --codeanalysis --codeanalysis-engine native
+  python3 analyze_repos.py repos.txt --codeanalysis --jobs 8
+  python3 analyze_repos.py repos.txt --codeanalysis --clone-strategy shallow
   
 Input file format (one repository URL per line):
   https://gitlab.com/user/repo1.git
@@ -1179,10 +1627,16 @@ Output structure:
     {repo_name}/ (Cloned repository - persisted and reused on subsequent runs)
   results/
     {repo_name}/
-      commits.json (Git commit history - last 2 years)
+      commit_history.jsonl (Extracted git history, one commit per line - last 2 years)
+      commit_history_state.json (Ref tips the commit history was extracted up to)
+      commits_columns.zip (Git commit history as compressed columns, read by geo and developer ranking)
+      commits.json (Git commit history - last 2 years, only with --commits-json)
       geographic_distribution.json (Geographic distribution analysis from commit timezones)
+      geo_partial.json (Mergeable geographic aggregate, combined across repositories by geo_rollup.py)
       techStack.json (TechStack results)
-      complexity.json (Complexity results, if enabled)
+      complexity.json (Complexity summary and top 500 functions, if enabled)
+      complexity_functions.jsonl.gz (Complexity results of every function, columnar chunks - if enabled)
+      complexity_files.csv (Complexity aggregates per file, repository-relative paths - if enabled)
       vulnerabilities.json (Trivy results, if enabled)
       {repo_name}_code-analysis.log (Git log in CodeAnalysis format - if CodeAnalysis enabled)
       {repo_name}_code-analysis_revisions.csv (CodeAnalysis - if enabled)
@@ -1203,10 +1657,16 @@ Output structure:
       {repo_name}_hotspots.csv (Code hotspots - if Complexity + CodeAnalysis enabled)
       developer_rankings.json (Developer rankings - automatic if CodeAnalysis + hotspots enabled)
       developer_rankings.csv (Developer rankings CSV - automatic if CodeAnalysis + hotspots enabled)
+      stage_timings.json (Per-stage wall times and critical path)
+      analysis_manifest.json (HEAD SHA, tool versions and input fingerprints for incremental runs)
+      analysis.log (Console output for this repository - when --jobs > 1)
     access_error.txt (Failed repositories)
+    run_summary.json (Per-repository status and timing for the whole run)
 
 Note: Repositories are cloned to ./repositories and kept for future runs.
       On subsequent runs, the script will update existing repositories instead of re-cloning.
+      Artifacts whose inputs did not change since the previous run are reused, and
+      unchanged repositories are skipped (use --force to recompute everything).
         """
     )
     
@@ -1263,13 +1723,90 @@ Note: Repositories are cloned to ./repositories and kept for future runs.
         help=f'Path to CodeAnalysis JAR file (default: {CODEMAAT_JAR_PATH})'
     )
     
+    parser.add_argument(
+        '--codeanalysis-engine',
+        choices=['native', 'jar', 'jar-batch'],
+        default=CODEANALYSIS_ENGINE,
+        help=f'CodeAnalysis implementation (default: {CODEANALYSIS_ENGINE}). jar runs java -jar on the '
+             'CodeAnalysis JAR per analysis; jar-batch runs all analyses of the JAR in a single JVM '
+             '(requires a JDK 11+); native computes all analyses in-process from one parse of the history '
+             '(no Java needed; rows that tie on the sort key may be ordered differently than by the JAR)'
+    )
+    
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=DEFAULT_JOBS,
+        help=f'Number of repositories to process concurrently (default: {DEFAULT_JOBS}). '
+             'With more than one job, each repository\'s output is printed as one block '
+             'and saved to {repo_name}/analysis.log'
+    )
+    
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Recompute every artifact even when analysis_manifest.json shows its inputs are unchanged'
+    )
+    
+    parser.add_argument(
+        '--clone-strategy',
+        choices=sorted(CLONE_STRATEGY_ARGS),
+        default=CLONE_STRATEGY,
+        help=f'How new repositories are cloned (default: {CLONE_STRATEGY}). '
+             'blobless fetches file contents on demand and treeless also fetches trees on demand; '
+             'both clone faster, but the history pass every run makes (git log --numstat, used for commits '
+             'and --codeanalysis) then fetches the blobs of every commit in the window lazily, typically '
+             'one round trip per commit, which is far slower than on a full clone; use them only when '
+             'downloading the full clone is the bottleneck. '
+             'shallow clones only the analysis window and is deepened automatically when the window grows'
+    )
+    
+    parser.add_argument(
+        '--lizard-workers',
+        type=int,
+        default=LIZARD_WORKERS,
+        help=f'Processes analyzing source files in each Complexity run (default: {LIZARD_WORKERS})'
+    )
+    parser.add_argument(
+        '--no-complexity-cache',
+        action='store_true',
+        help=f'Parse every source file instead of reusing per-blob Complexity results from <output-dir>/{COMPLEXITY_CACHE_FILE}'
+    )
+    
+    parser.add_argument(
+        '--commits-json',
+        action='store_true',
+        default=EXPORT_COMMITS_JSON,
+        help='Also export the commit history as commits.json, which AnalysisDashboard reads '
+             f'(analyses read {COMMIT_STORE_FILE}; python3 commit_store.py export converts later)'
+    )
+    
+    parser.add_argument(
+        '--cpu-budget',
+        type=int,
+        default=DEFAULT_CPU_BUDGET,
+        help=f'CPU slots shared by all concurrently running analysis stages across repositories (default: {DEFAULT_CPU_BUDGET})'
+    )
+    
+    parser.add_argument(
+        '--memory-budget-mb',
+        type=int,
+        default=DEFAULT_MEMORY_BUDGET_MB,
+        help='Estimated memory (MB) shared by all concurrently running analysis stages (default: unlimited)'
+    )
+    
     args = parser.parse_args()
     
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    jobs = args.jobs
+    
     # Use the tool paths from arguments or configuration
     scc_path = args.scc_path
     trivy_path = args.trivy_path
     trivy_cache_dir = args.trivy_cache_dir if args.trivy_cache_dir else None
     codeanalysis_jar_path = args.codeanalysis_jar_path
+    codeanalysis_engine = args.codeanalysis_engine
     
     # Check if scc is installed
     print(f"Using TechStack from: {scc_path}")
@@ -1314,25 +1851,62 @@ Note: Repositories are cloned to ./repositories and kept for future runs.
     print(f"  Git Commits: Always enabled (last 2 years)")
     print(f"  Geographic Distribution: Always enabled")
     print(f"  TechStack (TechStack): Always enabled")
-    print(f"  Complexity (Complexity): {'Enabled' if run_lizard else 'Disabled'}")
+    print(f"  Complexity (Complexity): {f'Enabled ({args.lizard_workers} workers)' if run_lizard else 'Disabled'}")
+    if run_lizard and not args.no_complexity_cache:
+        print(f"  Complexity cache: {os.path.join(results_dir, COMPLEXITY_CACHE_FILE)}")
     print(f"  Trivy (Vulnerabilities): {'Enabled' if run_trivy else 'Disabled'}")
-    print(f"  CodeAnalysis (Evolution): {'Enabled (last 2 years)' if run_codeanalysis else 'Disabled'}")
+    print(f"  CodeAnalysis (Evolution): {f'Enabled (last 2 years, {codeanalysis_engine} engine)' if run_codeanalysis else 'Disabled'}")
+    print(f"  Clone strategy: {args.clone_strategy}")
+    print(f"  Parallel jobs: {jobs}")
+    print(f"  Stage budget: {args.cpu_budget} CPU slots, "
+          f"{str(args.memory_budget_mb) + ' MB' if args.memory_budget_mb else 'unlimited'} memory")
     if run_codeanalysis and run_lizard:
         print(f"  Developer Ranking: Will run automatically (CodeAnalysis + Complexity enabled)")
     else:
         print(f"  Developer Ranking: Disabled (requires CodeAnalysis + Complexity)")
     print()
     
+    tool_versions = collect_tool_versions(scc_path, trivy_path if run_trivy else None,
+                                          trivy_cache_dir if run_trivy else None,
+                                          codeanalysis_jar_path if run_codeanalysis and codeanalysis_engine != 'native' else None)
+    if run_codeanalysis:
+        tool_versions['codeanalysis_engine'] = (f"native-{ENGINE_VERSION}" if codeanalysis_engine == 'native'
+                                                else 'jar')
+    
+    complexity_cache = None
+    if run_lizard and not args.no_complexity_cache:
+        os.makedirs(results_dir, exist_ok=True)
+        complexity_cache = ComplexityCache(os.path.join(results_dir, COMPLEXITY_CACHE_FILE))
+    
     # Process each repository
-    successful = 0
-    failed = 0
+    process_fn = partial(
+        process_repository,
+        results_dir=results_dir,
+        repos_base_dir=repos_base_dir,
+        scc_path=scc_path,
+        trivy_path=trivy_path,
+        trivy_cache_dir=trivy_cache_dir,
+        codeanalysis_jar_path=codeanalysis_jar_path,
+        run_lizard=run_lizard,
+        run_trivy=run_trivy,
+        run_codeanalysis=run_codeanalysis,
+        resource_budget=ResourceBudget(args.cpu_budget, args.memory_budget_mb),
+        tool_versions=tool_versions,
+        force=args.force,
+        clone_strategy=args.clone_strategy,
+        codeanalysis_engine=codeanalysis_engine,
+        lizard_workers=max(1, args.lizard_workers),
+        complexity_cache=complexity_cache,
+        export_commits_json=args.commits_json
+    )
     
-    for repo_url in repositories:
-        if process_repository(repo_url, results_dir, repos_base_dir, scc_path, trivy_path, trivy_cache_dir, codeanalysis_jar_path,
-                            run_lizard=run_lizard, run_trivy=run_trivy, run_codeanalysis=run_codeanalysis):
-            successful += 1
-        else:
-            failed += 1
+    run_start = time.time()
+    outcomes = run_repositories(repositories, process_fn, results_dir, jobs=jobs)
+    run_elapsed = time.time() - run_start
+    
+    successful = sum(1 for o in outcomes if o['success'])
+    failed = len(outcomes) - successful
+    summary_file = save_run_summary(outcomes, results_dir, jobs, run_elapsed)
     
     # Summary
     print("\n" + "="*60)
@@ -1342,14 +1916,27 @@ Note: Repositories are cloned to ./repositories and kept for future runs.
     print(f"Successfully processed: {successful}")
     print(f"Failed: {failed}")
     if failed > 0:
+        for outcome in outcomes:
+            if not outcome['success']:
+                print(f"  [FAIL] {outcome['repository_name']} ({outcome['elapsed_seconds']}s)")
         error_file = os.path.join(results_dir, 'access_error.txt')
         if os.path.exists(error_file):
             print(f"Access errors logged in: {error_file}")
+    slowest = sorted(outcomes, key=lambda o: o['elapsed_seconds'], reverse=True)[:5]
+    if len(outcomes) > 1:
+        print(f"Slowest repositories:")
+        for outcome in slowest:
+            print(f"  {outcome['repository_name']}: {outcome['elapsed_seconds']}s")
+    print(f"Total time: {run_elapsed:.1f}s (jobs: {jobs})")
+    if summary_file:
+        print(f"Run summary: {summary_file}")
     print(f"Repositories directory: {repos_base_dir}")
     print(f"Results directory: {results_dir}")
     print("="*60)
 
 
 if __name__ == "__main__":
+    # Lets the Complexity worker processes start from a frozen (PyInstaller) executable
+    multiprocessing.freeze_support()
     main()
 
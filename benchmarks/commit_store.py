@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Size and read time of the columnar commit store against commits.json.
+
+Writes a synthetic history as commits.json (indent=2, as save_results
+does) and as a commit store in every compression, then times reading the
+whole commits.json against reading only the columns developer ranking
+(author_name, author_email, datetime) and geo (author_email,
+tz_offset_minutes) use, plus a 90-day time-range read. The legacy export
+of every store is checked against the original records.
+
+Usage:
+    python benchmarks/commit_store.py
+    python benchmarks/commit_store.py --commits 1000000 --authors 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from commit_store import COMPRESSION, CommitStore, write_commit_store  # noqa: E402
+from geo_distribution import generate_commits  # noqa: E402
+from git_history import utc_offset_minutes  # noqa: E402
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the commit store with commits.json")
+    parser.add_argument("--commits", type=int, default=500000)
+    parser.add_argument("--authors", type=int, default=3000)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(2)
+    commits = generate_commits(args.commits, args.authors)
+    for commit in commits:
+        commit['hash'] = f"{rng.getrandbits(160):040x}"
+        commit['author_name'] = commit['author_email'].split('@')[0].title()
+        commit['tz_offset_minutes'] = utc_offset_minutes(commit['date'])
+        commit['message'] = f"Change {rng.randrange(100000)}"
+    data = {'repository_url': '', 'repository_name': 'bench', 'total_commits': len(commits), 'commits': commits}
+    print(f"{args.commits:,} commits, {args.authors:,} authors")
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, 'commits.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+        def load_json():
+            with open(json_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        json_seconds, _ = timed(load_json)
+        print(f"commits.json          {os.path.getsize(json_path) / 1e6:8.1f} MB  full read {json_seconds:6.2f}s")
+
+        for compression in COMPRESSION:
+            store_path = os.path.join(directory, f'{compression}.zip')
+            write_seconds, _ = timed(lambda: write_commit_store(store_path, commits, '', 'bench', compression))
+            store = CommitStore(store_path)
+            ranking_seconds, _ = timed(lambda: store.read(['author_name', 'author_email', 'datetime']))
+            geo_seconds, _ = timed(lambda: store.read(['author_email', 'tz_offset_minutes']))
+            until = max(store.read(['timestamp'])['timestamp'])
+            range_seconds, recent = timed(lambda: store.read(['author_email'], until - timedelta(days=90).total_seconds()))
+            print(f"store ({compression:7}) {os.path.getsize(store_path) / 1e6:8.1f} MB  write {write_seconds:6.2f}s  "
+                  f"ranking columns {ranking_seconds:6.2f}s  geo columns {geo_seconds:6.2f}s  "
+                  f"last 90 days {range_seconds:6.2f}s ({len(recent['author_email']):,} commits)")
+            if store.legacy_data()['commits'] != commits:
+                print(f"Legacy export of the {compression} store differs")
+                return 1
+
+    print("Legacy export identical for every compression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
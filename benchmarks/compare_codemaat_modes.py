@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Side-by-side timing of the code-maat execution modes on one git2 log:
+
+  per-analysis  java -jar cm.jar once per analysis type (one JVM each)
+  batch         tools/CodeMaatBatch.java, all analyses in one JVM
+  native        codemaat_engine, in-process
+
+The jar modes are skipped when cm.jar or java is unavailable. Besides the
+wall time, the CSVs of every mode are compared with the per-analysis
+output, per analysis: identical bytes, the same rows in another order
+(native rows that tie on the sort key), or different rows. --record
+appends the timing table and the per-analysis comparison to a Markdown
+file, the record the native engine has to pass before it becomes the
+default.
+
+Usage:
+    python benchmarks/compare_codemaat_modes.py --log results/myrepo/myrepo_code-analysis.log
+    python benchmarks/compare_codemaat_modes.py --log git.log --jar tools/cm.jar --repeat 3 \\
+        --record benchmarks/codemaat_modes.md
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from codemaat_batch import run_codemaat_batch  # noqa: E402
+from codemaat_engine import ANALYSES, ChangeLog, CodeMaatEngine  # noqa: E402
+
+
+def run_per_analysis(log_path, jar_path, java_path, output_dir):
+    outputs = {}
+    for analysis in ANALYSES:
+        result = subprocess.run(
+            [java_path, "-jar", str(jar_path), "-l", str(log_path), "-c", "git2", "-a", analysis],
+            capture_output=True, text=True, timeout=600
+        )
+        if result.returncode == 0 and result.stdout.strip():
+            outputs[analysis] = result.stdout
+    return outputs
+
+
+def run_batch(log_path, jar_path, java_path, output_dir):
+    paths, error = run_codemaat_batch(jar_path, log_path, output_dir, "", ANALYSES, java_path=java_path)
+    if error:
+        print(f"  batch: {error}", file=sys.stderr)
+    return {analysis: Path(path).read_text(encoding="utf-8") for analysis, path in paths.items()}
+
+
+def run_native(log_path, jar_path, java_path, output_dir):
+    engine = CodeMaatEngine(ChangeLog.from_git2_log(log_path))
+    return {analysis: engine.to_csv(analysis) for analysis in ANALYSES}
+
+
+MODES = (
+    ("per-analysis", run_per_analysis, True),
+    ("batch", run_batch, True),
+    ("native", run_native, False),
+)
+
+
+def compare(output, reference):
+    """'identical', 'reordered' (same rows, other order) or 'different'"""
+    if output == reference:
+        return "identical"
+    lines = output.splitlines()
+    reference_lines = reference.splitlines()
+    if lines[:1] == reference_lines[:1] and sorted(lines[1:]) == sorted(reference_lines[1:]):
+        return "reordered"
+    return "different"
+
+
+def java_version(java_path):
+    try:
+        result = subprocess.run([java_path, "-version"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return (result.stderr or result.stdout).splitlines()[0] if result.returncode == 0 else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare code-maat execution modes")
+    parser.add_argument("--log", required=True, type=Path, help="git2 log (e.g. <repo>_code-analysis.log)")
+    parser.add_argument("--jar", type=Path, default=Path("tools/cm.jar"), help="Path to cm.jar")
+    parser.add_argument("--java", default="java", help="Java executable")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per mode; the best time is reported")
+    parser.add_argument("--record", type=Path, help="Append the results to this Markdown file")
+    args = parser.parse_args(argv)
+
+    jar_ok = args.jar.is_file() and java_version(args.java) is not None
+    if not jar_ok:
+        print(f"cm.jar or java not available ({args.jar}); timing the native engine only")
+
+    print(f"Log: {args.log} ({os.path.getsize(args.log) / 1024:.1f} KB), {len(ANALYSES)} analyses")
+    timings = {}
+    outputs = {}
+    for name, run, needs_jar in MODES:
+        if needs_jar and not jar_ok:
+            continue
+        best = None
+        for _ in range(max(1, args.repeat)):
+            output_dir = tempfile.mkdtemp(prefix="codemaat-bench-")
+            try:
+                start = time.perf_counter()
+                outputs[name] = run(args.log, args.jar, args.java, output_dir)
+                elapsed = time.perf_counter() - start
+            finally:
+                shutil.rmtree(output_dir, ignore_errors=True)
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+
+    baseline = timings.get("per-analysis")
+    reference = outputs.get("per-analysis")
+    rows = [("mode", "seconds", "speedup", "completed", "identical", "reordered", "different")]
+    for name, seconds in timings.items():
+        speedup = f"{baseline / seconds:.1f}x" if baseline and seconds else "-"
+        completed = f"{len(outputs[name])}/{len(ANALYSES)}"
+        counts = ["-", "-", "-"]
+        if reference is not None:
+            results = [compare(outputs[name].get(analysis, ""), reference[analysis]) for analysis in reference]
+            counts = [str(results.count(kind)) for kind in ("identical", "reordered", "different")]
+        rows.append((name, f"{seconds:.2f}", speedup, completed, *counts))
+
+    print()
+    for row in rows:
+        print(f"{row[0]:<14}" + "".join(f"{value:>11}" for value in row[1:]))
+
+    mismatches = []
+    if reference is not None:
+        for name in timings:
+            for analysis in reference:
+                result = compare(outputs[name].get(analysis, ""), reference[analysis])
+                if result != "identical":
+                    mismatches.append((name, analysis, result))
+        for name, analysis, result in mismatches:
+            print(f"  {name} {analysis}: {result}")
+
+    if args.record:
+        with open(args.record, "a", encoding="utf-8") as f:
+            f.write(f"## {args.log.name} ({time.strftime('%Y-%m-%d')})\n\n")
+            f.write(f"- log: {os.path.getsize(args.log) / 1024:.1f} KB, {len(ANALYSES)} analyses, "
+                    f"best of {max(1, args.repeat)}\n")
+            f.write(f"- cm.jar: {args.jar if jar_ok else 'not available'}; "
+                    f"java: {java_version(args.java) or 'not available'}\n\n")
+            f.write("| " + " | ".join(rows[0]) + " |\n")
+            f.write("|" + "---|" * len(rows[0]) + "\n")
+            for row in rows[1:]:
+                f.write("| " + " | ".join(row) + " |\n")
+            if mismatches:
+                f.write("\n" + "".join(f"- {name} `{analysis}`: {result}\n"
+                                        for name, analysis, result in mismatches))
+            f.write("\n")
+        print(f"Results appended to {args.record}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Timing of the coupling and soc analyses on a synthetic history.
+
+The history mimics a large repository: mostly small commits clustered in
+directories, plus occasional mass changes (renames, reformatting) that
+touch thousands of files and are dropped by max-changeset-size. Every
+available co-change backend (scipy.sparse, numpy, plain Python) is timed.
+
+Usage:
+    python benchmarks/coupling_scale.py
+    python benchmarks/coupling_scale.py --files 100000 --commits 200000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import codemaat_engine  # noqa: E402
+from codemaat_engine import ChangeLog, CodeMaatEngine  # noqa: E402
+
+
+def synthetic_log(n_files, n_commits, seed=42, module_size=40):
+    rng = random.Random(seed)
+    n_modules = max(n_files // module_size, 1)
+    log = ChangeLog()
+    for commit in range(n_commits):
+        rev = log.add_revision(f"{commit:08x}", f"2024-{commit % 12 + 1:02d}-01", f"dev{rng.randrange(200)}")
+        if rng.random() < 0.001:
+            # Mass change (rename, reformatting) far above max-changeset-size
+            files = rng.sample(range(n_files), rng.randrange(1000, 5000))
+        else:
+            # Most commits touch a few files of one module
+            module = int(rng.paretovariate(1.2)) % n_modules
+            size = min(int(rng.expovariate(0.4)) + 1, module_size)
+            files = [module * module_size + offset for offset in rng.sample(range(module_size), size)]
+        for f in files:
+            log.add_change(rev, f"src/module{f // module_size}/file{f}.py", rng.randrange(100), rng.randrange(50))
+    return log
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time coupling and soc on a synthetic history")
+    parser.add_argument("--files", type=int, default=100000)
+    parser.add_argument("--commits", type=int, default=100000)
+    parser.add_argument("--min-shared-revs", type=int, default=5)
+    parser.add_argument("--max-changeset-size", type=int, default=30)
+    parser.add_argument("--python", action="store_true", help="Also time the plain Python backend (slow)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    log = synthetic_log(args.files, args.commits)
+    print(f"Synthetic history: {len(log.entities):,} files, {len(log.rev_names):,} commits, "
+          f"{len(log):,} changes ({time.perf_counter() - start:.1f}s to build)")
+
+    numpy_module, sparse_module = codemaat_engine.np, codemaat_engine.sparse
+    backends = []
+    if sparse_module is not None:
+        backends.append(("scipy.sparse", numpy_module, sparse_module))
+    if numpy_module is not None:
+        backends.append(("numpy", numpy_module, None))
+    if args.python or not backends:
+        backends.append(("python", None, None))
+
+    print(f"{'backend':<14}{'coupling':>10}{'soc':>10}{'rows':>10}")
+    try:
+        for name, numpy_backend, sparse_backend in backends:
+            codemaat_engine.np, codemaat_engine.sparse = numpy_backend, sparse_backend
+            engine = CodeMaatEngine(log, min_shared_revs=args.min_shared_revs,
+                                    max_changeset_size=args.max_changeset_size)
+            engine._entity_stats()
+            start = time.perf_counter()
+            _, rows = engine.coupling()
+            coupling_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            engine.soc()
+            soc_seconds = time.perf_counter() - start
+            print(f"{name:<14}{coupling_seconds:>9.2f}s{soc_seconds:>9.2f}s{len(rows):>10,}")
+    finally:
+        codemaat_engine.np, codemaat_engine.sparse = numpy_module, sparse_module
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
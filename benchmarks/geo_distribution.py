@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Timing of analyze_geographic_distribution on a large synthetic history.
+
+Generates commit records with a mix of whole-hour, half-hour and
+45-minute UTC offsets and times the analysis on records carrying the
+integer tz_offset_minutes column (as written by the git extraction), on
+records without it (older commits.json files, offsets parsed from the
+date) and with the per-author hour histogram. Every variant is checked
+against the plain-loop counting used without numpy.
+
+Usage:
+    python benchmarks/geo_distribution.py
+    python benchmarks/geo_distribution.py --commits 2000000 --authors 5000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import analyze_geo_distribution as geo  # noqa: E402
+from git_history import utc_offset_minutes  # noqa: E402
+
+OFFSETS = [-480, -420, -300, -210, 0, 60, 120, 330, 345, 480, 540, 570, 765]
+
+
+def generate_commits(count, authors, seed=1):
+    rng = random.Random(seed)
+    emails = [f"dev{i}@example.com" for i in range(authors)]
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    zones = {offset: timezone(timedelta(minutes=offset)) for offset in OFFSETS}
+    commits = []
+    for _ in range(count):
+        date = (start + timedelta(seconds=rng.randrange(365 * 86400))).astimezone(zones[rng.choice(OFFSETS)])
+        commits.append({'author_name': 'dev', 'author_email': rng.choice(emails), 'date': date.isoformat()})
+    return commits
+
+
+def timed(commits, author_hours=False):
+    start = time.perf_counter()
+    result = geo.analyze_geographic_distribution({'commits': commits}, author_hours)
+    seconds = time.perf_counter() - start
+    result.pop('analysis_timestamp')
+    return seconds, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the geographic distribution analysis")
+    parser.add_argument("--commits", type=int, default=2000000)
+    parser.add_argument("--authors", type=int, default=3000)
+    args = parser.parse_args(argv)
+
+    commits = generate_commits(args.commits, args.authors)
+    print(f"{args.commits:,} commits, {args.authors:,} authors")
+
+    parsed_seconds, parsed = timed(commits)
+    for commit in commits:
+        commit['tz_offset_minutes'] = utc_offset_minutes(commit['date'])
+    column_seconds, column = timed(commits)
+    hours_seconds, with_hours = timed(commits, author_hours=True)
+
+    numpy = geo.np
+    geo.np = None
+    try:
+        loop_seconds, loop = timed(commits, author_hours=True)
+    finally:
+        geo.np = numpy
+
+    print(f"Offsets parsed from dates:    {parsed_seconds:6.2f}s")
+    print(f"tz_offset_minutes column:     {column_seconds:6.2f}s")
+    print(f"Column + author hours:        {hours_seconds:6.2f}s")
+    print(f"Plain loop (column + hours):  {loop_seconds:6.2f}s")
+
+    loop_histogram = loop.pop('author_hour_histogram')
+    if with_hours.pop('author_hour_histogram') != loop_histogram or not parsed == column == with_hours == loop:
+        print("Results differ between variants")
+        return 1
+    print("Results identical for all variants")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Timing of hotspot path matching on a synthetic monorepo.
+
+Complexity entries carry the clone directory (./repositories/mono/...)
+while revision paths are repository-relative, so none match exactly. The
+previous matching scanned every complexity entry for each such path; the
+PathIndex resolves each one in O(path depth). The linear scan is timed on a
+sample and extrapolated.
+
+Usage:
+    python benchmarks/path_index_scale.py
+    python benchmarks/path_index_scale.py --paths 200000 --sample 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from path_index import AMBIGUOUS, PathIndex  # noqa: E402
+
+NAMES = ['index.js', 'utils.py', 'main.go', 'service.java', 'README.md', '__init__.py', 'handler.ts']
+
+
+def synthetic_paths(n_paths, seed=7):
+    rng = random.Random(seed)
+    paths = set()
+    while len(paths) < n_paths:
+        depth = rng.randint(2, 8)
+        dirs = [f"{rng.choice(['pkg', 'lib', 'src', 'app', 'internal'])}{rng.randrange(60)}" for _ in range(depth)]
+        name = rng.choice(NAMES) if rng.random() < 0.3 else f"file{rng.randrange(10 ** 6)}.py"
+        paths.add('/'.join(dirs + [name]))
+    return sorted(paths)
+
+
+def linear_match(normalized_complexity, file_path):
+    """The matching analyze_hotspots did before PathIndex"""
+    norm_rev_path = os.path.normpath(file_path).replace('\\', '/').lower()
+    if norm_rev_path in normalized_complexity:
+        return normalized_complexity[norm_rev_path]
+    for norm_complex_path, entry in normalized_complexity.items():
+        if norm_complex_path.endswith(norm_rev_path) or norm_rev_path.endswith(norm_complex_path):
+            return entry
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time hotspot path matching")
+    parser.add_argument("--paths", type=int, default=200000)
+    parser.add_argument("--sample", type=int, default=100, help="Paths timed with the linear scan")
+    args = parser.parse_args(argv)
+
+    relative = synthetic_paths(args.paths)
+    lizard_paths = [f"./repositories/mono/{path}" for path in relative]
+    queries = list(relative)
+    random.Random(1).shuffle(queries)
+    print(f"{len(lizard_paths):,} complexity paths, {len(queries):,} revision paths")
+
+    start = time.perf_counter()
+    index = PathIndex((path, {'file': path}) for path in lizard_paths)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matched = ambiguous = 0
+    for query in queries:
+        match = index.lookup(query)
+        if match.value is not None:
+            matched += 1
+        elif match.status == AMBIGUOUS:
+            ambiguous += 1
+    index_seconds = time.perf_counter() - start
+
+    normalized = {
+        os.path.normpath(path).replace('\\', '/').lower(): {'file': path} for path in lizard_paths
+    }
+    sample = queries[:args.sample]
+    start = time.perf_counter()
+    for query in sample:
+        linear_match(normalized, query)
+    linear_seconds = (time.perf_counter() - start) / max(len(sample), 1) * len(queries)
+
+    print(f"PathIndex build:   {build_seconds:8.2f}s")
+    print(f"PathIndex lookups: {index_seconds:8.2f}s  ({matched:,} matched, {ambiguous:,} ambiguous)")
+    print(f"Linear scan:       {linear_seconds:8.2f}s  (extrapolated from {len(sample)} paths)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Timing of collaboration-partner tracking in the developer ranking on a
+large team with a dense communication matrix.
+
+Writes a synthetic *_code-analysis_communication.csv (every author paired
+with --peers others) and times DeveloperRankingCalculator's
+load_communication_data plus the JSON report, which extracts the top
+collaborators per developer. The previous list-based partner tracking
+(a membership scan of a freshly built list per CSV row) is timed on a
+sample of authors and extrapolated.
+
+Usage:
+    python benchmarks/ranking_scale.py
+    python benchmarks/ranking_scale.py --authors 5000 --peers 1000
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from calculate_developer_ranking import DeveloperRankingCalculator  # noqa: E402
+
+
+def write_communication(path, authors, peers, seed=5):
+    rng = random.Random(seed)
+    rows = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['author', 'peer', 'shared', 'average', 'strength'])
+        for author in authors:
+            for peer in rng.sample(authors, peers):
+                writer.writerow([author, peer, rng.randrange(1, 200), rng.randrange(1, 100), rng.randrange(1, 100)])
+                rows += 1
+    return rows
+
+
+def legacy_partner_tracking(rows):
+    """The partner tracking load_communication_data did before (list scan per row)"""
+    partners = {}
+    for author, peer, shared, strength in rows:
+        author_partners = partners.setdefault(author, [])
+        if peer not in [p['name'] for p in author_partners]:
+            author_partners.append({'name': peer, 'shared_files': shared, 'strength': strength})
+    return partners
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time collaboration-partner tracking")
+    parser.add_argument("--authors", type=int, default=5000)
+    parser.add_argument("--peers", type=int, default=500, help="Communication rows per author")
+    parser.add_argument("--sample", type=int, default=50, help="Authors timed with the legacy tracking")
+    args = parser.parse_args(argv)
+
+    authors = [f"dev{i:05d}" for i in range(args.authors)]
+    with tempfile.TemporaryDirectory() as tmp:
+        results_dir = Path(tmp) / "bench"
+        results_dir.mkdir()
+        comm_file = results_dir / "bench_code-analysis_communication.csv"
+        rows = write_communication(comm_file, authors, min(args.peers, args.authors))
+        print(f"{args.authors:,} authors, {rows:,} communication rows")
+
+        calculator = DeveloperRankingCalculator(results_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            calculator.load_communication_data()
+            load_seconds = time.perf_counter() - start
+            calculator.normalize_scores()
+            calculator.calculate_weighted_scores()
+            start = time.perf_counter()
+            calculator.save_detailed_report(Path(tmp) / "rankings.json")
+            report_seconds = time.perf_counter() - start
+
+        sample = set(authors[:args.sample])
+        with open(comm_file, 'r', encoding='utf-8') as f:
+            sample_rows = [(r['author'], r['peer'], int(r['shared']), int(r['strength']))
+                           for r in csv.DictReader(f) if r['author'] in sample]
+        start = time.perf_counter()
+        legacy_partner_tracking(sample_rows)
+        legacy_seconds = (time.perf_counter() - start) / max(len(sample), 1) * args.authors
+
+    print(f"load_communication_data: {load_seconds:8.2f}s")
+    print(f"JSON report (top-K):     {report_seconds:8.2f}s")
+    print(f"Legacy partner lists:    {legacy_seconds:8.2f}s  (tracking only, extrapolated from {len(sample)} authors)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
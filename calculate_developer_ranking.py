@@ -23,12 +23,90 @@ Configurable weights allow customization of ranking criteria.
 
 import json
 import csv
+import heapq
 import sys
 from pathlib import Path
 from collections import defaultdict
+from itertools import islice
 from typing import Dict, List, Tuple
 from datetime import datetime
 import argparse
+from array import array
+
+import complexity_store
+from commit_store import COMMIT_STORE_FILE, CommitStore
+from path_index import PathIndex
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: ownership rows are then scored in a plain loop
+    np = None
+
+
+# Ranking factors: (weight name, normalized score key, raw value of a developer record)
+FACTORS = [
+    ('commits', 'normalized_commits', lambda d: d['commits']),
+    ('churn', 'normalized_churn', lambda d: d['lines_added'] + d['lines_deleted']),
+    ('hotspot_work', 'normalized_hotspot', lambda d: d['hotspot_score']),
+    ('ownership', 'normalized_ownership', lambda d: d['ownership_score']),
+    ('complexity', 'normalized_complexity', lambda d: d['complexity_score']),
+    ('communication', 'normalized_communication', lambda d: d['communication_score']),
+    ('recency', 'normalized_recency', lambda d: d['recency_score']),
+    ('fragmentation', 'normalized_fragmentation', lambda d: d['fragmentation_score']),
+    ('coupling', 'normalized_coupling', lambda d: d['coupling_score']),
+    ('hotspot_commits', 'normalized_hotspot_commits', lambda d: d['hotspot_commits']),
+]
+NORMALIZED_KEYS = [key for _, key, _ in FACTORS]
+
+# Commits older than this many days all get the lowest recency weight
+RECENCY_HORIZON_DAYS = 365
+
+
+def load_weight_vectors(path):
+    """
+    Weight vectors for a sweep: a JSON list of {factor: weight} objects, or a CSV
+    file with factor names as header and one vector per row. Missing factors
+    weigh 0; every vector must sum to 1.0.
+    """
+    path = Path(path)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if path.suffix.lower() == '.json':
+            vectors = json.load(f)
+        else:
+            vectors = [{factor: float(weight) for factor, weight in row.items() if weight not in (None, '')}
+                       for row in csv.DictReader(f)]
+    
+    factors = {factor for factor, _, _ in FACTORS}
+    for index, vector in enumerate(vectors):
+        unknown = set(vector) - factors
+        if unknown:
+            raise ValueError(f"Weight vector {index}: unknown factors {', '.join(sorted(unknown))}")
+        if abs(sum(vector.values()) - 1.0) > 0.001:
+            raise ValueError(f"Weight vector {index}: weights must sum to 1.0, got {sum(vector.values())}")
+    return vectors
+
+
+def recency_weight(days_ago):
+    """Recency score of one commit (commits in last 90 days weighted higher)"""
+    if days_ago <= 30:
+        return 10.0
+    elif days_ago <= 90:
+        return 5.0
+    elif days_ago <= 180:
+        return 2.0
+    elif days_ago <= RECENCY_HORIZON_DAYS:
+        return 1.0
+    return 0.5
+
+
+def item_count(dev_data, key):
+    """Number of hotspot_files, files_owned or collaboration_partners (org-wide records store the count)"""
+    return dev_data.get(f'{key}_count', len(dev_data.get(key, ())))
+
+
+def top_collaborators(dev_data, k):
+    """The k strongest collaboration partners of a developer (ties in the order they were loaded)"""
+    return heapq.nlargest(k, dev_data.get('collaboration_partners', {}).values(), key=lambda x: x['strength'])
 
 
 class DeveloperRankingCalculator:
@@ -77,63 +155,77 @@ class DeveloperRankingCalculator:
             'hotspot_commits': 0,
             'email': None,
             'files_owned': [],
-            'hotspot_files': [],
+            'hotspot_files': {},  # file -> None, in order of first contribution
             'last_commit_date': None,
-            'collaboration_partners': []
+            'collaboration_partners': {}  # peer -> {'name', 'shared_files', 'strength'}
         })
         
         self.hotspots = {}  # file -> hotspot data
         self.file_to_soc = {}  # file -> sum of coupling score
+        self.file_fragmentation = {}  # file -> fractal value
+        self.complexity_index = None  # PathIndex of file -> complexity aggregates
+        self.ownership = None  # entity ownership rows as columns (see load_entity_ownership)
+        self.normalized = None  # developers x FACTORS matrix of normalized scores (with numpy)
+        self.author_aliases = set()  # (author name, author email) pairs of the commits
+        self.recent_commits = defaultdict(list)  # author -> naive dates of commits within RECENCY_HORIZON_DAYS
+        self.older_commits = defaultdict(int)  # author -> number of older dated commits
         
     def load_commits(self):
-        """Load commit data from commits.json"""
+        """Load commit data from the commit store, or from commits.json"""
+        store_file = self.results_dir / COMMIT_STORE_FILE
         commits_file = self.results_dir / "commits.json"
-        if not commits_file.exists():
+        if store_file.exists():
+            # Only the author and date columns are decompressed
+            columns = CommitStore(store_file).read(['author_name', 'author_email', 'datetime'])
+            commits = zip(columns['author_name'], columns['author_email'], columns['datetime'])
+            count = len(columns['author_name'])
+        elif commits_file.exists():
+            with open(commits_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            commits = [
+                (commit.get('author_name', 'Unknown'), commit.get('author_email', ''), self._commit_date(commit))
+                for commit in data.get('commits', [])
+            ]
+            count = len(commits)
+        else:
             print(f"Warning: {commits_file} not found")
             return
         
-        with open(commits_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
         # Track current date for recency calculations
         current_date = datetime.now()
         
-        for commit in data.get('commits', []):
-            author = commit.get('author_name', 'Unknown')
-            email = commit.get('author_email', '')
-            date_str = commit.get('date', '')
-            
+        for author, email, commit_date in commits:
             self.developers[author]['commits'] += 1
+            self.author_aliases.add((author, email))
             if not self.developers[author]['email'] and email:
                 self.developers[author]['email'] = email
             
             # Track last commit date and calculate recency
-            if date_str:
+            if commit_date is not None:
                 try:
-                    commit_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                    
                     if (self.developers[author]['last_commit_date'] is None or 
                         commit_date > self.developers[author]['last_commit_date']):
                         self.developers[author]['last_commit_date'] = commit_date
                     
                     # Calculate recency score (commits in last 90 days weighted higher)
                     days_ago = (current_date - commit_date.replace(tzinfo=None)).days
-                    if days_ago <= 30:
-                        recency_weight = 10.0
-                    elif days_ago <= 90:
-                        recency_weight = 5.0
-                    elif days_ago <= 180:
-                        recency_weight = 2.0
-                    elif days_ago <= 365:
-                        recency_weight = 1.0
+                    self.developers[author]['recency_score'] += recency_weight(days_ago)
+                    if days_ago <= RECENCY_HORIZON_DAYS:
+                        self.recent_commits[author].append(commit_date.replace(tzinfo=None))
                     else:
-                        recency_weight = 0.5
-                    
-                    self.developers[author]['recency_score'] += recency_weight
+                        self.older_commits[author] += 1
                 except:
                     pass
         
-        print(f"[OK] Loaded {len(data.get('commits', []))} commits")
+        print(f"[OK] Loaded {count} commits")
+    
+    @staticmethod
+    def _commit_date(commit):
+        """Parsed date of a commits.json record (None if missing or unparseable)"""
+        try:
+            return datetime.fromisoformat(commit.get('date', '').replace('Z', '+00:00'))
+        except (AttributeError, ValueError):
+            return None
     
     def load_hotspots(self):
         """Load hotspot data"""
@@ -156,40 +248,25 @@ class DeveloperRankingCalculator:
         print(f"[OK] Loaded {len(self.hotspots)} hotspots")
     
     def load_entity_ownership(self):
-        """Load entity ownership data - lines added/deleted per author per file"""
+        """Load entity ownership data - lines added/deleted per author per file - once, as columns"""
         ownership_file = self.results_dir / f"{self.repo_name}_code-analysis_entity_ownership.csv"
         if not ownership_file.exists():
             print(f"Warning: {ownership_file} not found")
             return
         
+        authors = {}
+        entities = {}
+        table = {name: array('q') for name in ('author', 'entity', 'added', 'deleted')}
         with open(ownership_file, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
-                author = row['author']
-                entity = row['entity']
-                added = int(row['added'])
-                deleted = int(row['deleted'])
-                
-                self.developers[author]['lines_added'] += added
-                self.developers[author]['lines_deleted'] += deleted
-                
-                # Calculate hotspot contribution
-                if entity in self.hotspots:
-                    hotspot_data = self.hotspots[entity]
-                    # Weight by hotspot score and lines changed
-                    contribution = (added + deleted) * hotspot_data['hotspot_score'] / 100.0
-                    self.developers[author]['hotspot_score'] += contribution
-                    
-                    if entity not in self.developers[author]['hotspot_files']:
-                        self.developers[author]['hotspot_files'].append(entity)
-                        # Count as a hotspot commit (simplified)
-                        self.developers[author]['hotspot_commits'] += 1
-                
-                # Track coupling work
-                if entity in self.file_to_soc:
-                    soc_value = self.file_to_soc[entity]
-                    contribution = (added + deleted) * (soc_value / 1000.0)  # Normalize
-                    self.developers[author]['coupling_score'] += contribution
+                table['author'].append(authors.setdefault(row['author'], len(authors)))
+                table['entity'].append(entities.setdefault(row['entity'], len(entities)))
+                table['added'].append(int(row['added']))
+                table['deleted'].append(int(row['deleted']))
+        table['authors'] = list(authors)
+        table['entities'] = list(entities)
+        self.ownership = table
         
         print(f"[OK] Loaded entity ownership data")
     
@@ -217,47 +294,23 @@ class DeveloperRankingCalculator:
         print(f"[OK] Loaded main developer data")
     
     def load_complexity_data(self):
-        """Load complexity data and correlate with developer contributions"""
+        """Load per-file complexity data (correlated with contributions in score_ownership)"""
+        files_table = self.results_dir / complexity_store.FILE_TABLE
         complexity_file = self.results_dir / "complexity.json"
-        if not complexity_file.exists():
-            print(f"Warning: {complexity_file} not found")
+        if files_table.exists():
+            # Per-file aggregates written by the Complexity stage (repository-relative paths)
+            file_complexity = complexity_store.load_file_table(files_table)
+        elif complexity_file.exists():
+            # Older results: aggregate the top functions listed in complexity.json
+            with open(complexity_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            file_complexity = complexity_store.aggregate_functions(data.get('analysis', {}).get('functions', []))
+        else:
+            print(f"Warning: {files_table} not found")
             return
         
-        with open(complexity_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Build file complexity map
-        file_complexity = defaultdict(lambda: {'avg_complexity': 0, 'function_count': 0})
-        
-        for func in data.get('analysis', {}).get('functions', []):
-            file_path = func.get('file', '')
-            # Normalize path to match other data
-            file_path = file_path.replace(str(self.results_dir.parent / 'repositories' / self.repo_name) + '/', '')
-            
-            complexity = func.get('cyclomatic_complexity', 0)
-            file_complexity[file_path]['avg_complexity'] += complexity
-            file_complexity[file_path]['function_count'] += 1
-        
-        # Calculate average complexity per file
-        for file_path, data in file_complexity.items():
-            if data['function_count'] > 0:
-                data['avg_complexity'] /= data['function_count']
-        
-        # Now correlate with developer contributions
-        ownership_file = self.results_dir / f"{self.repo_name}_code-analysis_entity_ownership.csv"
-        if ownership_file.exists():
-            with open(ownership_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    author = row['author']
-                    entity = row['entity']
-                    lines_changed = int(row['added']) + int(row['deleted'])
-                    
-                    if entity in file_complexity:
-                        complexity = file_complexity[entity]['avg_complexity']
-                        # Weight by complexity and contribution size
-                        contribution = lines_changed * complexity / 10.0  # Normalize
-                        self.developers[author]['complexity_score'] += contribution
+        # Older Complexity paths include the clone directory, CodeAnalysis entities are repository-relative
+        self.complexity_index = PathIndex(file_complexity)
         
         print(f"[OK] Loaded complexity data")
     
@@ -268,25 +321,34 @@ class DeveloperRankingCalculator:
             print(f"Warning: {comm_file} not found")
             return
         
-        with open(comm_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        with open(comm_file, 'r', encoding='utf-8', newline='') as f:
+            # Plain csv.reader: the communication matrix can have millions of rows
+            reader = csv.reader(f)
+            header = next(reader, [])
+            author_col, peer_col, shared_col, strength_col = (
+                header.index(name) for name in ('author', 'peer', 'shared', 'strength')
+            )
             for row in reader:
-                author = row['author']
-                peer = row['peer']
-                shared = int(row['shared'])
-                strength = int(row['strength'])
+                if not row:
+                    continue
+                author = row[author_col]
+                peer = row[peer_col]
+                shared = int(row[shared_col])
+                strength = int(row[strength_col])
+                dev_data = self.developers[author]
                 
                 # Weight by both shared files and strength of collaboration
                 collaboration_score = shared * strength / 10.0  # Normalize
-                self.developers[author]['communication_score'] += collaboration_score
+                dev_data['communication_score'] += collaboration_score
                 
-                # Track collaboration partners
-                if peer not in [p['name'] for p in self.developers[author]['collaboration_partners']]:
-                    self.developers[author]['collaboration_partners'].append({
+                # Track collaboration partners (the first row of each peer is kept)
+                partners = dev_data['collaboration_partners']
+                if peer not in partners:
+                    partners[peer] = {
                         'name': peer,
                         'shared_files': shared,
                         'strength': strength
-                    })
+                    }
         
         print(f"[OK] Loaded communication data")
     
@@ -307,31 +369,11 @@ class DeveloperRankingCalculator:
             print(f"Warning: {frag_file} not found")
             return
         
-        # Build file -> fractal value map
-        file_fragmentation = {}
+        # Build file -> fractal value map (correlated with contributions in score_ownership)
         with open(frag_file, 'r', encoding='utf-8') as f:
             reader = csv.DictReader(f)
             for row in reader:
-                entity = row['entity']
-                fractal_value = float(row['fractal-value'])
-                file_fragmentation[entity] = fractal_value
-        
-        # Correlate with developer work
-        ownership_file = self.results_dir / f"{self.repo_name}_code-analysis_entity_ownership.csv"
-        if ownership_file.exists():
-            with open(ownership_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    author = row['author']
-                    entity = row['entity']
-                    lines_changed = int(row['added']) + int(row['deleted'])
-                    
-                    if entity in file_fragmentation:
-                        # Higher fragmentation = more distributed knowledge
-                        # Working on fragmented code is valuable
-                        frag_value = file_fragmentation[entity]
-                        contribution = lines_changed * frag_value
-                        self.developers[author]['fragmentation_score'] += contribution
+                self.file_fragmentation[row['entity']] = float(row['fractal-value'])
         
         print(f"[OK] Loaded fragmentation data")
     
@@ -349,55 +391,197 @@ class DeveloperRankingCalculator:
                 soc = int(row['soc'])
                 self.file_to_soc[entity] = soc
         
-        # Coupling score calculation happens in load_entity_ownership
+        # Coupling score calculation happens in score_ownership
         print(f"[OK] Loaded SOC (coupling) data")
     
+    def score_ownership(self):
+        """
+        Churn, hotspot, coupling, complexity and fragmentation scores per author,
+        in one pass over the entity ownership rows.
+        
+        Each per-file lookup is resolved once per entity; with numpy the rows are
+        then summed per author with bincount.
+        """
+        table = self.ownership
+        if table is None:
+            return
+        
+        # Per entity: hotspot score, SOC, average complexity and fractal value (None = no data)
+        entities = table['entities']
+        entity_hotspot = [self.hotspots[e]['hotspot_score'] if e in self.hotspots else None for e in entities]
+        entity_soc = [self.file_to_soc.get(e) for e in entities]
+        entity_complexity = []
+        for entity in entities:
+            complexity = self.complexity_index.get(entity) if self.complexity_index else None
+            entity_complexity.append(complexity['avg_complexity'] if complexity else None)
+        entity_fragmentation = [self.file_fragmentation.get(e) for e in entities]
+        
+        authors = table['authors']
+        if np is not None:
+            totals = self._score_ownership_numpy(table, entity_hotspot, entity_soc, entity_complexity,
+                                                 entity_fragmentation)
+        else:
+            totals = self._score_ownership_python(table, entity_hotspot, entity_soc, entity_complexity,
+                                                  entity_fragmentation)
+        for metric, values in totals.items():
+            for author, value in zip(authors, values):
+                self.developers[author][metric] += value
+        
+        # Hotspot files per author, in order of first appearance
+        for author_id, entity_id in zip(table['author'], table['entity']):
+            if entity_hotspot[entity_id] is None:
+                continue
+            dev = self.developers[authors[author_id]]
+            if entities[entity_id] not in dev['hotspot_files']:
+                dev['hotspot_files'][entities[entity_id]] = None
+                # Count as a hotspot commit (simplified)
+                dev['hotspot_commits'] += 1
+        
+        print(f"[OK] Scored {len(table['author'])} ownership rows of {len(authors)} authors")
+    
+    @staticmethod
+    def _score_ownership_numpy(table, entity_hotspot, entity_soc, entity_complexity, entity_fragmentation):
+        author = np.frombuffer(table['author'], dtype=np.int64)
+        entity = np.frombuffer(table['entity'], dtype=np.int64)
+        added = np.frombuffer(table['added'], dtype=np.int64)
+        deleted = np.frombuffer(table['deleted'], dtype=np.int64)
+        churn = (added + deleted).astype(np.float64)
+        n_authors = len(table['authors'])
+        
+        def per_author(entity_values, contribution):
+            values = np.array([np.nan if v is None else v for v in entity_values], dtype=np.float64)[entity]
+            rows = ~np.isnan(values)
+            return np.bincount(author[rows], weights=contribution(churn[rows], values[rows]), minlength=n_authors)
+        
+        # Same arithmetic (and summation order) as scoring row by row
+        return {
+            'lines_added': np.bincount(author, weights=added, minlength=n_authors).astype(np.int64).tolist(),
+            'lines_deleted': np.bincount(author, weights=deleted, minlength=n_authors).astype(np.int64).tolist(),
+            'hotspot_score': per_author(entity_hotspot, lambda c, v: c * v / 100.0).tolist(),
+            'coupling_score': per_author(entity_soc, lambda c, v: c * (v / 1000.0)).tolist(),
+            'complexity_score': per_author(entity_complexity, lambda c, v: c * v / 10.0).tolist(),
+            'fragmentation_score': per_author(entity_fragmentation, lambda c, v: c * v).tolist(),
+        }
+    
+    @staticmethod
+    def _score_ownership_python(table, entity_hotspot, entity_soc, entity_complexity, entity_fragmentation):
+        n_authors = len(table['authors'])
+        totals = {metric: [0] * n_authors for metric in ('lines_added', 'lines_deleted')}
+        totals.update({metric: [0.0] * n_authors for metric in
+                       ('hotspot_score', 'coupling_score', 'complexity_score', 'fragmentation_score')})
+        for author, entity, added, deleted in zip(table['author'], table['entity'], table['added'], table['deleted']):
+            lines_changed = added + deleted
+            totals['lines_added'][author] += added
+            totals['lines_deleted'][author] += deleted
+            # Weight by hotspot score and lines changed
+            if entity_hotspot[entity] is not None:
+                totals['hotspot_score'][author] += lines_changed * entity_hotspot[entity] / 100.0
+            # Track coupling work
+            if entity_soc[entity] is not None:
+                totals['coupling_score'][author] += lines_changed * (entity_soc[entity] / 1000.0)  # Normalize
+            # Weight by complexity and contribution size
+            if entity_complexity[entity] is not None:
+                totals['complexity_score'][author] += lines_changed * entity_complexity[entity] / 10.0  # Normalize
+            # Working on fragmented code (distributed knowledge) is valuable
+            if entity_fragmentation[entity] is not None:
+                totals['fragmentation_score'][author] += lines_changed * entity_fragmentation[entity]
+        return totals
+    
+    def feature_matrix(self):
+        """Raw factor values as a developers x factors matrix (rows in self.developers order)"""
+        rows = [[value(dev_data) for _, _, value in FACTORS] for dev_data in self.developers.values()]
+        return np.array(rows, dtype=np.float64).reshape(len(rows), len(FACTORS))
+    
     def normalize_scores(self):
-        """Normalize all scores to 0-100 range"""
+        """Normalize all scores to 0-100 range (relative to the highest value of each factor)"""
         if not self.developers:
             return
         
-        # Get max values for normalization (using max(..., default=1) to avoid division by zero)
-        max_commits = max((d['commits'] for d in self.developers.values()), default=1)
-        max_churn = max((d['lines_added'] + d['lines_deleted'] for d in self.developers.values()), default=1)
-        max_hotspot = max((d['hotspot_score'] for d in self.developers.values()), default=1)
-        max_ownership = max((d['ownership_score'] for d in self.developers.values()), default=1)
-        max_complexity = max((d['complexity_score'] for d in self.developers.values()), default=1)
-        max_communication = max((d['communication_score'] for d in self.developers.values()), default=1)
-        max_recency = max((d['recency_score'] for d in self.developers.values()), default=1)
-        max_fragmentation = max((d['fragmentation_score'] for d in self.developers.values()), default=1)
-        max_coupling = max((d['coupling_score'] for d in self.developers.values()), default=1)
-        max_hotspot_commits = max((d['hotspot_commits'] for d in self.developers.values()), default=1)
-        
-        # Normalize to 0-100
-        for dev_data in self.developers.values():
-            dev_data['normalized_commits'] = (dev_data['commits'] / max_commits) * 100
-            dev_data['normalized_churn'] = ((dev_data['lines_added'] + dev_data['lines_deleted']) / max_churn) * 100
-            dev_data['normalized_hotspot'] = (dev_data['hotspot_score'] / max_hotspot) * 100 if max_hotspot > 0 else 0
-            dev_data['normalized_ownership'] = (dev_data['ownership_score'] / max_ownership) * 100 if max_ownership > 0 else 0
-            dev_data['normalized_complexity'] = (dev_data['complexity_score'] / max_complexity) * 100 if max_complexity > 0 else 0
-            dev_data['normalized_communication'] = (dev_data['communication_score'] / max_communication) * 100 if max_communication > 0 else 0
-            dev_data['normalized_recency'] = (dev_data['recency_score'] / max_recency) * 100 if max_recency > 0 else 0
-            dev_data['normalized_fragmentation'] = (dev_data['fragmentation_score'] / max_fragmentation) * 100 if max_fragmentation > 0 else 0
-            dev_data['normalized_coupling'] = (dev_data['coupling_score'] / max_coupling) * 100 if max_coupling > 0 else 0
-            dev_data['normalized_hotspot_commits'] = (dev_data['hotspot_commits'] / max_hotspot_commits) * 100 if max_hotspot_commits > 0 else 0
+        if np is None:
+            maxima = [max(value(d) for d in self.developers.values()) for _, _, value in FACTORS]
+            for dev_data in self.developers.values():
+                for (_, key, value), maximum in zip(FACTORS, maxima):
+                    dev_data[key] = (value(dev_data) / maximum) * 100 if maximum > 0 else 0
+            return
+        
+        features = self.feature_matrix()
+        maxima = features.max(axis=0)
+        # Factors nobody scored on stay 0 instead of dividing by zero
+        self.normalized = np.where(maxima > 0, features / np.where(maxima > 0, maxima, 1.0) * 100, 0.0)
+        for dev_data, row in zip(self.developers.values(), self.normalized.tolist()):
+            dev_data.update(zip(NORMALIZED_KEYS, row))
     
     def calculate_weighted_scores(self):
         """Calculate final weighted scores for all developers"""
-        for developer, data in self.developers.items():
-            weighted_score = (
-                data.get('normalized_commits', 0) * self.weights['commits'] +
-                data.get('normalized_churn', 0) * self.weights['churn'] +
-                data.get('normalized_hotspot', 0) * self.weights['hotspot_work'] +
-                data.get('normalized_ownership', 0) * self.weights['ownership'] +
-                data.get('normalized_complexity', 0) * self.weights['complexity'] +
-                data.get('normalized_communication', 0) * self.weights['communication'] +
-                data.get('normalized_recency', 0) * self.weights['recency'] +
-                data.get('normalized_fragmentation', 0) * self.weights['fragmentation'] +
-                data.get('normalized_coupling', 0) * self.weights['coupling'] +
-                data.get('normalized_hotspot_commits', 0) * self.weights['hotspot_commits']
-            )
-            data['weighted_score'] = weighted_score
+        if np is None or self.normalized is None:
+            for data in self.developers.values():
+                data['weighted_score'] = sum(
+                    data.get(key, 0) * self.weights[factor] for factor, key, _ in FACTORS
+                )
+            return
+        
+        # Column by column, so each score adds up exactly like the per-developer sum
+        scores = self.normalized[:, 0] * self.weights[FACTORS[0][0]]
+        for column, (factor, _, _) in enumerate(FACTORS[1:], 1):
+            scores = scores + self.normalized[:, column] * self.weights[factor]
+        for data, score in zip(self.developers.values(), scores.tolist()):
+            data['weighted_score'] = score
+    
+    def sweep_weights(self, weight_vectors):
+        """
+        Score every developer under many weight vectors at once (sensitivity analysis).
+        
+        Args:
+            weight_vectors: List of weight dictionaries (factor -> weight, missing factors 0)
+            
+        Returns:
+            (scores, ranks): developers x vectors arrays, rows in self.developers order;
+            rank 1 is the highest score of a vector (ties keep developer order)
+        """
+        if np is None:
+            raise RuntimeError("Weight sweeps require numpy (pip install numpy)")
+        if self.normalized is None:
+            self.normalize_scores()
+        weights = np.array([[vector.get(factor, 0.0) for vector in weight_vectors] for factor, _, _ in FACTORS],
+                           dtype=np.float64).reshape(len(FACTORS), len(weight_vectors))
+        scores = self.normalized @ weights
+        order = np.argsort(-scores, axis=0, kind='stable')
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, len(scores) + 1)[:, None], axis=0)
+        return scores, ranks
+    
+    def print_sweep(self, weight_vectors, top_n: int = 20):
+        """Print how the ranks of the top developers move across weight vectors"""
+        scores, ranks = self.sweep_weights(weight_vectors)
+        developers = list(self.developers)
+        row_of = {developer: row for row, developer in enumerate(developers)}
+        
+        print(f"\n{'='*100}")
+        print(f"{'WEIGHT SENSITIVITY (' + str(len(weight_vectors)) + ' weight vectors)':^100}")
+        print(f"{'='*100}")
+        print(f"{'Rank':<6} {'Developer':<40} {'Best':>6} {'Worst':>6} {'Median':>8} {'Top ' + str(top_n):>10}")
+        print(f"{'-'*100}")
+        for rank, (developer, _) in enumerate(self.get_rankings(top_n), 1):
+            developer_ranks = ranks[row_of[developer]]
+            in_top = int((developer_ranks <= top_n).sum())
+            print(f"{rank:<6} {developer[:39]:<40} {developer_ranks.min():>6} {developer_ranks.max():>6} "
+                  f"{np.median(developer_ranks):>8.1f} {in_top:>4}/{len(weight_vectors):<5}")
+        print(f"{'='*100}\n")
+    
+    def save_sweep_csv(self, weight_vectors, output_file: Path):
+        """Save the rank and score of every developer under each weight vector"""
+        scores, ranks = self.sweep_weights(weight_vectors)
+        with open(output_file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['developer', 'rank'] +
+                            [f"rank_{i}" for i in range(len(weight_vectors))] +
+                            [f"score_{i}" for i in range(len(weight_vectors))])
+            base_rank = {developer: rank for rank, (developer, _) in enumerate(self.get_rankings(), 1)}
+            for row, developer in enumerate(self.developers):
+                writer.writerow([developer, base_rank[developer]] + ranks[row].tolist() +
+                                [round(score, 2) for score in scores[row].tolist()])
+        
+        print(f"[OK] Weight sweep saved to {output_file}")
     
     def get_rankings(self, top_n: int = None) -> List[Tuple[str, Dict]]:
         """
@@ -445,9 +629,9 @@ class DeveloperRankingCalculator:
             score = data.get('weighted_score', 0)
             commits = data.get('commits', 0)
             churn = data.get('lines_added', 0) + data.get('lines_deleted', 0)
-            hotspot_files = len(data.get('hotspot_files', []))
-            files_owned = len(data.get('files_owned', []))
-            collaborators = len(data.get('collaboration_partners', []))
+            hotspot_files = item_count(data, 'hotspot_files')
+            files_owned = item_count(data, 'files_owned')
+            collaborators = item_count(data, 'collaboration_partners')
             
             # Truncate long names
             display_name = developer[:39]
@@ -487,13 +671,12 @@ class DeveloperRankingCalculator:
                 days_ago = (datetime.now() - last_commit_naive).days
                 print(f"    • Last Active: {days_ago} days ago ({last_commit.strftime('%Y-%m-%d')})")
             
-            print(f"\n  Files: {len(data.get('files_owned', []))} owned, {len(data.get('hotspot_files', []))} hotspots")
-            print(f"  Collaborators: {len(data.get('collaboration_partners', []))}")
+            print(f"\n  Files: {item_count(data, 'files_owned')} owned, {item_count(data, 'hotspot_files')} hotspots")
+            print(f"  Collaborators: {item_count(data, 'collaboration_partners')}")
             
             # Show top collaborators
             if data.get('collaboration_partners'):
-                top_collabs = sorted(data['collaboration_partners'], 
-                                   key=lambda x: x['strength'], reverse=True)[:3]
+                top_collabs = top_collaborators(data, 3)
                 print(f"  Top Collaborators:")
                 for collab in top_collabs:
                     print(f"    - {collab['name']} (strength: {collab['strength']}, shared: {collab['shared_files']})")
@@ -524,13 +707,13 @@ class DeveloperRankingCalculator:
                     'lines_deleted': data.get('lines_deleted', 0),
                     'total_churn': data.get('lines_added', 0) + data.get('lines_deleted', 0),
                     'hotspot_score': round(data.get('hotspot_score', 0), 2),
-                    'hotspot_files_count': len(data.get('hotspot_files', [])),
+                    'hotspot_files_count': item_count(data, 'hotspot_files'),
                     'hotspot_commits': data.get('hotspot_commits', 0),
                     'ownership_score': round(data.get('ownership_score', 0), 2),
-                    'files_owned_count': len(data.get('files_owned', [])),
+                    'files_owned_count': item_count(data, 'files_owned'),
                     'complexity_score': round(data.get('complexity_score', 0), 2),
                     'communication_score': round(data.get('communication_score', 0), 2),
-                    'collaborators_count': len(data.get('collaboration_partners', [])),
+                    'collaborators_count': item_count(data, 'collaboration_partners'),
                     'recency_score': round(data.get('recency_score', 0), 2),
                     'fragmentation_score': round(data.get('fragmentation_score', 0), 2),
                     'coupling_score': round(data.get('coupling_score', 0), 2),
@@ -548,16 +731,18 @@ class DeveloperRankingCalculator:
                     'coupling': round(data.get('normalized_coupling', 0), 2),
                     'hotspot_commits': round(data.get('normalized_hotspot_commits', 0), 2)
                 },
-                'top_hotspot_files': data.get('hotspot_files', [])[:10],
+                'top_hotspot_files': list(islice(data.get('hotspot_files', {}), 10)),
                 'top_owned_files': [
                     {'file': f['file'], 'ownership': f['ownership']} 
-                    for f in sorted(data.get('files_owned', []), key=lambda x: x['ownership'], reverse=True)[:10]
+                    for f in heapq.nlargest(10, data.get('files_owned', []), key=lambda x: x['ownership'])
                 ],
                 'top_collaborators': [
                     {'name': c['name'], 'shared_files': c['shared_files'], 'strength': c['strength']}
-                    for c in sorted(data.get('collaboration_partners', []), key=lambda x: x['strength'], reverse=True)[:10]
+                    for c in top_collaborators(data, 10)
                 ]
             }
+            if 'repositories' in data:
+                dev_report['repositories'] = data['repositories']
             report['rankings'].append(dev_report)
         
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -593,13 +778,13 @@ class DeveloperRankingCalculator:
                     'lines_deleted': data.get('lines_deleted', 0),
                     'total_churn': data.get('lines_added', 0) + data.get('lines_deleted', 0),
                     'hotspot_score': round(data.get('hotspot_score', 0), 2),
-                    'hotspot_files_count': len(data.get('hotspot_files', [])),
+                    'hotspot_files_count': item_count(data, 'hotspot_files'),
                     'hotspot_commits': data.get('hotspot_commits', 0),
                     'ownership_score': round(data.get('ownership_score', 0), 2),
-                    'files_owned_count': len(data.get('files_owned', [])),
+                    'files_owned_count': item_count(data, 'files_owned'),
                     'complexity_score': round(data.get('complexity_score', 0), 2),
                     'communication_score': round(data.get('communication_score', 0), 2),
-                    'collaborators_count': len(data.get('collaboration_partners', [])),
+                    'collaborators_count': item_count(data, 'collaboration_partners'),
                     'recency_score': round(data.get('recency_score', 0), 2),
                     'fragmentation_score': round(data.get('fragmentation_score', 0), 2),
                     'coupling_score': round(data.get('coupling_score', 0), 2),
@@ -615,16 +800,7 @@ class DeveloperRankingCalculator:
         print(f"Repository: {self.repo_name}")
         print(f"{'='*100}\n")
         
-        print("Loading data sources...")
-        self.load_commits()
-        self.load_hotspots()
-        self.load_soc_data()  # Load before entity_ownership
-        self.load_entity_ownership()
-        self.load_main_developers()
-        self.load_complexity_data()
-        self.load_communication_data()
-        self.load_author_churn()
-        self.load_fragmentation_data()
+        self.load_data()
         
         print(f"\n{'='*100}")
         print("Calculating normalized and weighted scores...")
@@ -634,6 +810,21 @@ class DeveloperRankingCalculator:
         self.calculate_weighted_scores()
         
         print(f"[OK] Analysis complete! Evaluated {len(self.developers)} developers\n")
+    
+    def load_data(self):
+        """Load every data source and compute the raw factor values"""
+        print("Loading data sources...")
+        self.load_commits()
+        self.load_hotspots()
+        self.load_soc_data()
+        self.load_entity_ownership()
+        self.load_main_developers()
+        self.load_complexity_data()
+        self.load_communication_data()
+        self.load_author_churn()
+        self.load_fragmentation_data()
+        # Ownership rows are scored once every per-file lookup is loaded
+        self.score_ownership()
 
 
 def main():
@@ -655,14 +846,37 @@ Examples:
   # Save comprehensive reports
   python3 calculate_developer_ranking.py results/newrelic-dotnet-agent \\
     --output-json rankings.json --output-csv rankings.csv
+  
+  # Organization-wide ranking over every repository in results/, merging each
+  # developer's names/emails (factor vectors of unchanged repositories are reused)
+  python3 calculate_developer_ranking.py results --org --repos-dir repositories \\
+    --output-csv org_rankings.csv
+  
+  # Sensitivity of the ranking to the weights (one weight vector per CSV row)
+  python3 calculate_developer_ranking.py results/newrelic-dotnet-agent \\
+    --weights weight_vectors.csv --output-sweep sweep.csv
         """
     )
     
-    parser.add_argument('results_dir', type=str, help='Path to results directory')
+    parser.add_argument('results_dir', type=str, help='Path to results directory (the results root with --org)')
     parser.add_argument('--top', type=int, default=20, help='Number of top developers to show in summary (default: 20)')
     parser.add_argument('--detailed', type=int, default=0, help='Show detailed breakdown for top N developers (default: 0)')
     parser.add_argument('--output-json', type=str, help='Save detailed report to JSON file')
     parser.add_argument('--output-csv', type=str, help='Save report to CSV file')
+    parser.add_argument('--weights', type=str, metavar='FILE',
+                        help='Weight sweep: score developers under every weight vector in FILE '
+                             '(JSON list of {factor: weight} or CSV with factor columns) and show rank stability')
+    parser.add_argument('--output-sweep', type=str, help='Save the rank and score per weight vector of --weights to CSV')
+    parser.add_argument('--org', action='store_true',
+                        help='Rank developers across all repository results below results_dir, '
+                             'merging aliases of the same person')
+    parser.add_argument('--repos-dir', type=str,
+                        help='With --org: directory of the clones, whose .mailmap files are used for identities')
+    parser.add_argument('--mailmap', type=str, action='append', default=[],
+                        help='With --org: additional .mailmap file for identities (can be repeated)')
+    parser.add_argument('--join-names', action='store_true',
+                        help='With --org: also merge all emails seen with the same author name '
+                             '(merges unrelated people who share a common name)')
     
     # Weight arguments
     parser.add_argument('--weight-commits', type=float, default=0.15, help='Weight for commit count (default: 0.15)')
@@ -705,11 +919,28 @@ Examples:
         print(f"Error: Results directory not found: {results_path}")
         sys.exit(1)
     
+    weight_vectors = None
+    if args.weights:
+        try:
+            weight_vectors = load_weight_vectors(args.weights)
+        except (OSError, ValueError) as e:
+            print(f"Error: Invalid weight vectors in {args.weights}: {e}")
+            sys.exit(1)
+    
     # Run analysis
-    calculator = DeveloperRankingCalculator(results_path, weights)
-    calculator.run_analysis()
+    if args.org:
+        from org_ranking import OrgRanking
+        calculator = OrgRanking(results_path, args.repos_dir, args.mailmap, weights, args.join_names).run_analysis()
+    else:
+        calculator = DeveloperRankingCalculator(results_path, weights)
+        calculator.run_analysis()
     calculator.print_rankings(top_n=args.top)
     
+    if weight_vectors:
+        calculator.print_sweep(weight_vectors, top_n=args.top)
+        if args.output_sweep:
+            calculator.save_sweep_csv(weight_vectors, Path(args.output_sweep))
+    
     # Show detailed breakdown if requested
     if args.detailed > 0:
         calculator.print_detailed_top_developers(top_n=args.detailed)
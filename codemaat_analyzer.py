@@ -21,6 +21,9 @@ from pathlib import Path
 from typing import Any, Dict, List, Tuple, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from codemaat_batch import run_codemaat_batch
+from codemaat_engine import ChangeLog, CodeMaatEngine
+
 
 # ============================================================================
 # CONFIGURATION - Edit these paths to match your environment
@@ -43,6 +46,9 @@ DEFAULT_GIT_PATH = r"C:\Program Files\Git\bin\git.exe"
 
 
 # Analysis settings
+DEFAULT_ENGINE = "jar"                # "jar" (java -jar cm.jar), "jar-batch" (all analyses in one JVM,
+                                     # needs a JDK 11+) or "native" (in-process, no Java needed; opt-in
+                                     # until verified against cm.jar with benchmarks/compare_codemaat_modes.py)
 DEFAULT_PARALLEL = True               # Run analyses in parallel (True) or sequential (False)
 DEFAULT_MAX_WORKERS = 5               # Number of parallel workers
 
@@ -89,7 +95,8 @@ class CodeMaatAnalyzer:
     ]
     
     def __init__(self, repo_path: Path, output_dir: Path, jar_path: Optional[Path] = None, 
-                 java_path: Optional[str] = None, git_path: Optional[str] = None):
+                 java_path: Optional[str] = None, git_path: Optional[str] = None,
+                 engine: str = DEFAULT_ENGINE):
         """
         Initialize CodeMaat analyzer.
         
@@ -99,13 +106,20 @@ class CodeMaatAnalyzer:
             jar_path: Path to cm.jar (auto-detected if not provided)
             java_path: Path to Java executable (auto-detected if not provided)
             git_path: Path to Git executable (auto-detected if not provided)
+            engine: "native" computes the analyses in-process from one parse of
+                the log; "jar" runs java -jar cm.jar per analysis; "jar-batch"
+                runs all analyses of cm.jar in a single JVM
         """
         self.repo_path = repo_path
         self.output_dir = output_dir
-        self.jar_path = jar_path or self._find_codemaat_jar()
+        self.engine = engine
+        self.uses_jar = engine in ("jar", "jar-batch")
+        self.jar_path = jar_path or (self._find_codemaat_jar() if self.uses_jar else None)
         self.java_path = java_path or os.getenv('CODEMAAT_JAVA_PATH', 'java')
         self.git_path = git_path or os.getenv('CODEMAAT_GIT_PATH', 'git')
         self.git_log_file = None
+        self._native_engine = None
+        self._batch_outputs = {}
         
         # Validate requirements
         self._validate_requirements()
@@ -140,8 +154,8 @@ class CodeMaatAnalyzer:
     
     def _validate_requirements(self):
         """Validate that all requirements are met."""
-        # Check Java
-        if not self._check_java():
+        # Check Java (the native engine does not need it)
+        if self.uses_jar and not self._check_java():
             raise RuntimeError(
                 "Java Runtime Environment (JRE) not found. "
                 "Download from: https://www.oracle.com/java/technologies/downloads/"
@@ -156,13 +170,14 @@ class CodeMaatAnalyzer:
             raise RuntimeError(f"Not a Git repository: {self.repo_path}")
         
         # Check CodeMaat JAR
-        if not self.jar_path.exists():
+        if self.uses_jar and not self.jar_path.exists():
             raise RuntimeError(f"CodeMaat JAR not found: {self.jar_path}")
         
         logger.info(f"✅ All requirements met")
-        logger.info(f"   Java: {self.java_path}")
+        if self.uses_jar:
+            logger.info(f"   Java: {self.java_path}")
         logger.info(f"   Git: {self.git_path}")
-        logger.info(f"   CodeMaat: {self.jar_path}")
+        logger.info(f"   CodeMaat: {self.jar_path if self.uses_jar else 'native engine'}")
         logger.info(f"   Repository: {self.repo_path.name}")
     
     def _check_java(self) -> bool:
@@ -274,6 +289,11 @@ class CodeMaatAnalyzer:
         """
         logger.info(f"🚀 Running {analysis_type} analysis...")
         
+        if self.engine == "native":
+            return self._run_native_analysis(analysis_type)
+        if analysis_type in self._batch_outputs:
+            return self._batch_result(analysis_type)
+        
         try:
             # Run CodeMaat
             cmd = [
@@ -322,6 +342,57 @@ class CodeMaatAnalyzer:
                 "error": str(e)
             })
     
+    def _run_native_analysis(self, analysis_type: str) -> Tuple[str, Dict[str, Any]]:
+        """Run one analysis with the in-process engine; the log is parsed only once."""
+        try:
+            if self._native_engine is None:
+                self._native_engine = CodeMaatEngine(ChangeLog.from_git2_log(self.git_log_file))
+            
+            parsed_data = self._parse_csv_output(self._native_engine.to_csv(analysis_type))
+            
+            logger.info(f"✅ {analysis_type}: {len(parsed_data)} entries")
+            
+            return (analysis_type, {
+                "success": True,
+                "analysis_type": analysis_type,
+                "entries_count": len(parsed_data),
+                "data": parsed_data
+            })
+            
+        except Exception as e:
+            logger.warning(f"⚠️  {analysis_type} failed: {e}")
+            return (analysis_type, {
+                "success": False,
+                "error": str(e)
+            })
+    
+    def _run_batch(self):
+        """Run every analysis in one JVM; analyses it cannot produce fall back to one JVM each."""
+        analyses = [analysis_type for analysis_type, _ in self.ANALYSIS_TYPES]
+        with tempfile.TemporaryDirectory(prefix="codemaat-batch-") as batch_dir:
+            outputs, error = run_codemaat_batch(
+                self.jar_path, self.git_log_file, batch_dir, "", analyses, java_path=self.java_path
+            )
+            for analysis_type, csv_path in outputs.items():
+                self._batch_outputs[analysis_type] = Path(csv_path).read_text(encoding='utf-8')
+        
+        logger.info(f"   Single-JVM batch: {len(outputs)}/{len(analyses)} analyses completed")
+        if error:
+            logger.warning(f"⚠️  Batch incomplete, remaining analyses run one JVM each: {error}")
+    
+    def _batch_result(self, analysis_type: str) -> Tuple[str, Dict[str, Any]]:
+        """Result of an analysis produced by the single-JVM batch."""
+        parsed_data = self._parse_csv_output(self._batch_outputs[analysis_type])
+        
+        logger.info(f"✅ {analysis_type}: {len(parsed_data)} entries")
+        
+        return (analysis_type, {
+            "success": True,
+            "analysis_type": analysis_type,
+            "entries_count": len(parsed_data),
+            "data": parsed_data
+        })
+    
     def _parse_csv_output(self, csv_output: str) -> List[Dict[str, Any]]:
         """Parse CSV output from CodeMaat."""
         try:
@@ -386,7 +457,14 @@ class CodeMaatAnalyzer:
             Dictionary with all analysis results
         """
         logger.info(f"🔄 Running {len(self.ANALYSIS_TYPES)} CodeMaat analyses...")
-        logger.info(f"   Mode: {'Parallel' if parallel else 'Sequential'}")
+        
+        # The native analyses share one parsed log and are CPU-bound, so threads would not help
+        if self.engine == "native":
+            parallel = False
+        logger.info(f"   Mode: {'Parallel' if parallel else 'Sequential'} ({self.engine} engine)")
+        
+        if self.engine == "jar-batch":
+            self._run_batch()
         
         all_results = {}
         successful = 0
@@ -559,6 +637,8 @@ Example Usage:
   python codemaat_analyzer.py --repo /path/to/repo --sequential
   python codemaat_analyzer.py --repo /path/to/repo --java /usr/lib/jvm/java-11/bin/java
   python codemaat_analyzer.py --repo /path/to/repo --jar /custom/cm.jar --java C:\\Java\\bin\\java.exe
+  python codemaat_analyzer.py --repo /path/to/repo --engine native
+  python codemaat_analyzer.py --repo /path/to/repo --engine jar-batch
 
 Environment Variables:
   CODEMAAT_JAR_PATH      Path to cm.jar
@@ -604,6 +684,15 @@ Environment Variables:
         help="Path to Git executable (can be set in script config, default: 'git' from PATH or CODEMAAT_GIT_PATH env var)"
     )
     
+    parser.add_argument(
+        "--engine",
+        choices=["native", "jar", "jar-batch"],
+        default=DEFAULT_ENGINE,
+        help=f"Analysis implementation: native (in-process, no Java needed), jar (java -jar cm.jar per analysis) "
+             f"or jar-batch (all analyses of cm.jar in one JVM, needs a JDK 11+) "
+             f"(can be set in script config, default: {DEFAULT_ENGINE})"
+    )
+    
     parser.add_argument(
         "--sequential",
         action="store_true",
@@ -652,7 +741,8 @@ Environment Variables:
             output_dir=output_dir,
             jar_path=args.jar,
             java_path=args.java,
-            git_path=args.git
+            git_path=args.git,
+            engine=args.engine
         )
         
         # Run analysis
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Single-JVM batch mode for cm.jar.
+
+`java -jar cm.jar` starts a JVM, loads Clojure and parses the log for every
+analysis type. tools/CodeMaatBatch.java runs all requested analyses in one
+JVM instead, writing one CSV per analysis; this module launches it and
+reports which analyses completed so callers can fall back to one JVM per
+analysis for the rest.
+
+The launcher is run from source (java -cp cm.jar CodeMaatBatch.java ...),
+which needs a JDK 11+ `java`; a plain JRE cannot compile it and every
+analysis falls back.
+"""
+
+import os
+import subprocess
+from pathlib import Path
+
+BATCH_LAUNCHER = Path(__file__).resolve().parent / "tools" / "CodeMaatBatch.java"
+
+
+def batch_csv_name(file_prefix, analysis):
+    """File name the launcher writes an analysis to"""
+    return f"{file_prefix}{analysis.replace('-', '_')}.csv"
+
+
+def run_codemaat_batch(jar_path, log_path, output_dir, file_prefix, analyses, java_path="java", timeout=1800):
+    """
+    Run analyses in one JVM.
+
+    Returns (outputs, error): outputs maps every completed analysis to its
+    CSV path, error describes why the others did not complete (None when
+    all did).
+    """
+    analyses = list(analyses)
+    cmd = [
+        java_path, "-cp", str(jar_path), str(BATCH_LAUNCHER),
+        str(log_path), str(output_dir), file_prefix
+    ] + analyses
+
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {}, f"batch timed out after {timeout}s"
+    except OSError as e:
+        return {}, str(e)
+
+    outputs = {}
+    failures = []
+    for line in result.stdout.splitlines():
+        status, _, rest = line.partition(" ")
+        analysis, _, detail = rest.partition(" ")
+        if status == "OK" and analysis in analyses:
+            csv_path = os.path.join(output_dir, batch_csv_name(file_prefix, analysis))
+            if os.path.isfile(csv_path):
+                outputs[analysis] = csv_path
+        elif status == "FAIL":
+            failures.append(f"{analysis}: {detail}")
+
+    if len(outputs) == len(analyses):
+        return outputs, None
+    if failures:
+        return outputs, "; ".join(failures)
+    stderr = result.stderr.strip().splitlines()
+    return outputs, stderr[-1] if stderr else f"launcher exited with code {result.returncode}"
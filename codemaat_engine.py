@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+"""
+Native code-maat engine.
+
+Parses a git2 log (git log --numstat --date=short --pretty=format:--%h--%ad--%aN)
+once into columnar arrays and computes the code-maat analyses in-process,
+instead of starting a JVM (java -jar cm.jar) and re-parsing the log for
+every analysis type.
+
+The CSV output follows code-maat: the same headers, column order, sort
+order, number formatting and LF line endings, so the dashboard and
+calculate_developer_ranking.py read it unchanged. Rows that tie on the sort
+key are ordered by name (code-maat takes the order of ties from hash maps).
+
+Usage mirrors the jar:
+    python codemaat_engine.py -l git.log -c git2 -a coupling
+"""
+
+import argparse
+import csv
+import io
+import math
+import re
+import sys
+from array import array
+from collections import defaultdict
+from datetime import date
+
+# Optional: co-change counts for coupling use scipy.sparse when installed,
+# else numpy, else plain Python
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+# Bump when the output of any analysis changes, to invalidate cached CSVs
+ENGINE_VERSION = 1
+
+# Analysis types in the order the pipeline runs them
+ANALYSES = (
+    "revisions",
+    "authors",
+    "entity-churn",
+    "coupling",
+    "communication",
+    "main-dev",
+    "entity-effort",
+    "abs-churn",
+    "age",
+    "author-churn",
+    "entity-ownership",
+    "fragmentation",
+    "soc",
+    "main-dev-by-revs",
+    "refactoring-main-dev",
+)
+
+# code-maat's command line defaults
+DEFAULT_OPTIONS = {
+    'min_revs': 5,
+    'min_shared_revs': 5,
+    'min_coupling': 30,
+    'max_coupling': 100,
+    'max_changeset_size': 30,
+}
+
+HEADER_PATTERN = re.compile(r'^--(\S+?)--(\d{4}-\d{2}-\d{2})--(.*)$')
+CHANGE_PATTERN = re.compile(r'^(\d+|-)\t(\d+|-)\t(.+)$')
+
+
+class _Interner:
+    """Maps strings to dense integer ids"""
+
+    def __init__(self):
+        self.values = []
+        self.ids = {}
+
+    def id(self, value):
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ChangeLog:
+    """
+    Modifications of a git2 log in columnar form.
+
+    Revisions (rev, date, author) and change rows (revision, entity, added,
+    deleted) are kept in parallel integer arrays; entity, author and date
+    strings are interned once. Binary changes count as 0 lines, as in
+    code-maat.
+    """
+
+    def __init__(self):
+        self.entities = _Interner()
+        self.authors = _Interner()
+        self.dates = _Interner()
+        self.rev_names = []
+        self.rev_author = array('l')
+        self.rev_date = array('l')
+        self.row_rev = array('l')
+        self.row_entity = array('l')
+        self.row_added = array('q')
+        self.row_deleted = array('q')
+
+    def __len__(self):
+        return len(self.row_rev)
+
+    def add_revision(self, rev, date_str, author):
+        self.rev_names.append(rev)
+        self.rev_author.append(self.authors.id(author))
+        self.rev_date.append(self.dates.id(date_str))
+        return len(self.rev_names) - 1
+
+    def add_change(self, rev_id, entity, added, deleted):
+        self.row_rev.append(rev_id)
+        self.row_entity.append(self.entities.id(entity))
+        self.row_added.append(added)
+        self.row_deleted.append(deleted)
+
+    @classmethod
+    def from_git2_lines(cls, lines):
+        """Parse git2 log lines"""
+        log = cls()
+        rev_id = None
+        for line in lines:
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+            change = CHANGE_PATTERN.match(line)
+            if change and rev_id is not None:
+                added, deleted, entity = change.groups()
+                log.add_change(rev_id,
+                               entity,
+                               int(added) if added != '-' else 0,
+                               int(deleted) if deleted != '-' else 0)
+                continue
+            header = HEADER_PATTERN.match(line)
+            if header:
+                rev_id = log.add_revision(*header.groups())
+        return log
+
+    @classmethod
+    def from_git2_log(cls, path):
+        """Parse a git2 log file"""
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return cls.from_git2_lines(f)
+
+    @classmethod
+    def from_history(cls, history):
+        """Build directly from a git_history.CommitTable, skipping the text log"""
+        log = cls()
+        for commit in history:
+            rev_id = log.add_revision(commit['abbrev'], commit['date'][:10], commit['author_mailmap'])
+            for added, deleted, path in commit['files']:
+                log.add_change(rev_id, path, added or 0, deleted or 0)
+        return log
+
+
+def _ratio(numerator, denominator):
+    """code-maat's two-decimal ratio"""
+    if not denominator:
+        return 0.0
+    return round(numerator / denominator, 2)
+
+
+def _percentage(numerator, denominator):
+    """Whole percentage, truncated"""
+    if not denominator:
+        return 0
+    return int(math.floor(numerator * 100 / denominator))
+
+
+def _co_changes_sparse(changesets, n_entities):
+    """Co-change counts as the upper triangle of M^T M for the changeset x entity incidence matrix M"""
+    indptr = np.zeros(len(changesets) + 1, dtype=np.int64)
+    np.cumsum([len(ids) for ids in changesets], out=indptr[1:])
+    indices = np.fromiter((e for ids in changesets for e in ids), dtype=np.int64, count=int(indptr[-1]))
+    incidence = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.int32), indices, indptr),
+        shape=(len(changesets), n_entities)
+    )
+    co_changes = sparse.triu(incidence.T.tocsr() @ incidence, k=1).tocoo()
+    return co_changes.row, co_changes.col, co_changes.data
+
+
+def _co_changes_numpy(changesets, n_entities):
+    """Co-change counts from pair codes first * n + second, built per changeset size"""
+    by_size = defaultdict(list)
+    for ids in changesets:
+        by_size[len(ids)].append(ids)
+    codes = []
+    for size, group in by_size.items():
+        block = np.array(group, dtype=np.int64)
+        first, second = np.triu_indices(size, 1)
+        codes.append((block[:, first] * n_entities + block[:, second]).ravel())
+    pairs, counts = np.unique(np.concatenate(codes), return_counts=True)
+    return pairs // n_entities, pairs % n_entities, counts
+
+
+def _co_changes_python(changesets, n_entities):
+    shared = defaultdict(int)
+    for ids in changesets:
+        for i, first in enumerate(ids):
+            for second in ids[i + 1:]:
+                shared[(first, second)] += 1
+    pairs = list(shared)
+    return [p[0] for p in pairs], [p[1] for p in pairs], list(shared.values())
+
+
+def co_change_counts(changesets, n_entities, min_shared=1):
+    """
+    Count how often every pair of entities changed together.
+
+    changesets are ascending lists of distinct entity ids below n_entities.
+    Returns (first, second, shared) triples with first < second and
+    shared >= min_shared.
+    """
+    if not changesets:
+        return []
+    if sparse is not None:
+        first, second, shared = _co_changes_sparse(changesets, n_entities)
+    elif np is not None:
+        first, second, shared = _co_changes_numpy(changesets, n_entities)
+    else:
+        first, second, shared = _co_changes_python(changesets, n_entities)
+    return [
+        (int(f), int(s), int(count))
+        for f, s, count in zip(first, second, shared)
+        if count >= min_shared
+    ]
+
+
+def _months_between(start, end):
+    """Whole calendar months from start to end"""
+    months = (end.year - start.year) * 12 + end.month - start.month
+    if end.day < start.day:
+        months -= 1
+    return max(months, 0)
+
+
+class CodeMaatEngine:
+    """
+    Compute code-maat analyses from a ChangeLog.
+
+    Per-entity and per-author aggregates are computed once and shared by
+    every analysis. options override DEFAULT_OPTIONS; now is the reference
+    date of the age analysis (default: today).
+    """
+
+    def __init__(self, change_log, now=None, **options):
+        self.log = change_log
+        self.options = dict(DEFAULT_OPTIONS, **options)
+        self.now = now or date.today()
+        self._stats = None
+        self._changesets = None
+        self._coupling_changesets = None
+
+    # -- shared aggregates -------------------------------------------------
+
+    def _entity_stats(self):
+        """Per entity: revisions, added, deleted; per (entity, author): added, deleted, revisions"""
+        if self._stats is None:
+            log = self.log
+            n_entities = len(log.entities)
+            revs = [0] * n_entities
+            added = [0] * n_entities
+            deleted = [0] * n_entities
+            last_date = [None] * n_entities
+            by_author = defaultdict(lambda: [0, 0, 0])
+            authors_of = [[] for _ in range(n_entities)]
+            dates = log.dates.values
+
+            for row in range(len(log)):
+                entity = log.row_entity[row]
+                rev = log.row_rev[row]
+                author = log.rev_author[rev]
+                revs[entity] += 1
+                added[entity] += log.row_added[row]
+                deleted[entity] += log.row_deleted[row]
+                change_date = dates[log.rev_date[rev]]
+                if last_date[entity] is None or change_date > last_date[entity]:
+                    last_date[entity] = change_date
+                stats = by_author[(entity, author)]
+                if not stats[2]:
+                    authors_of[entity].append(author)
+                stats[0] += log.row_added[row]
+                stats[1] += log.row_deleted[row]
+                stats[2] += 1
+
+            self._stats = {
+                'revs': revs,
+                'added': added,
+                'deleted': deleted,
+                'last_date': last_date,
+                'by_author': by_author,
+                'authors_of': authors_of,
+            }
+        return self._stats
+
+    def _changeset_entities(self):
+        """Entity ids changed together in each revision"""
+        if self._changesets is None:
+            changesets = defaultdict(list)
+            for row in range(len(self.log)):
+                changesets[self.log.row_rev[row]].append(self.log.row_entity[row])
+            self._changesets = changesets
+        return self._changesets
+
+    def _entity_name(self, entity):
+        return self.log.entities.values[entity]
+
+    def _author_name(self, author):
+        return self.log.authors.values[author]
+
+    def _sorted_entities(self):
+        names = self.log.entities.values
+        return sorted(range(len(names)), key=names.__getitem__)
+
+    def _sorted_authors(self, authors):
+        names = self.log.authors.values
+        return sorted(authors, key=names.__getitem__)
+
+    # -- analyses ----------------------------------------------------------
+
+    def revisions(self):
+        stats = self._entity_stats()
+        rows = [(self._entity_name(e), stats['revs'][e]) for e in range(len(self.log.entities))]
+        rows.sort(key=lambda r: (-r[1], r[0]))
+        return ['entity', 'n-revs'], rows
+
+    def authors(self):
+        stats = self._entity_stats()
+        rows = [
+            (self._entity_name(e), len(stats['authors_of'][e]), stats['revs'][e])
+            for e in range(len(self.log.entities))
+            if stats['revs'][e] >= self.options['min_revs']
+        ]
+        rows.sort(key=lambda r: (-r[1], -r[2], r[0]))
+        return ['entity', 'n-authors', 'n-revs'], rows
+
+    def entity_churn(self):
+        stats = self._entity_stats()
+        rows = [
+            (self._entity_name(e), stats['added'][e], stats['deleted'][e], stats['revs'][e])
+            for e in range(len(self.log.entities))
+        ]
+        rows.sort(key=lambda r: (-r[1], r[0]))
+        return ['entity', 'added', 'deleted', 'commits'], rows
+
+    def abs_churn(self):
+        log = self.log
+        totals = defaultdict(lambda: [0, 0, set()])
+        for row in range(len(log)):
+            rev = log.row_rev[row]
+            day = totals[log.dates.values[log.rev_date[rev]]]
+            day[0] += log.row_added[row]
+            day[1] += log.row_deleted[row]
+            day[2].add(rev)
+        rows = [(day, t[0], t[1], len(t[2])) for day, t in sorted(totals.items())]
+        return ['date', 'added', 'deleted', 'commits'], rows
+
+    def author_churn(self):
+        log = self.log
+        totals = defaultdict(lambda: [0, 0, set()])
+        for row in range(len(log)):
+            rev = log.row_rev[row]
+            author = totals[log.rev_author[rev]]
+            author[0] += log.row_added[row]
+            author[1] += log.row_deleted[row]
+            author[2].add(rev)
+        rows = [(self._author_name(a), t[0], t[1], len(t[2])) for a, t in totals.items()]
+        rows.sort(key=lambda r: r[0])
+        return ['author', 'added', 'deleted', 'commits'], rows
+
+    def entity_ownership(self):
+        stats = self._entity_stats()
+        rows = []
+        for e in self._sorted_entities():
+            for a in self._sorted_authors(stats['authors_of'][e]):
+                added, deleted, _ = stats['by_author'][(e, a)]
+                rows.append((self._entity_name(e), self._author_name(a), added, deleted))
+        return ['entity', 'author', 'added', 'deleted'], rows
+
+    def entity_effort(self):
+        stats = self._entity_stats()
+        rows = []
+        for e in self._sorted_entities():
+            for a in self._sorted_authors(stats['authors_of'][e]):
+                rows.append((self._entity_name(e), self._author_name(a),
+                             stats['by_author'][(e, a)][2], stats['revs'][e]))
+        return ['entity', 'author', 'author-revs', 'total-revs'], rows
+
+    def _main_developers(self, column, header):
+        """Main developer per entity by one of the per-author columns (0 added, 1 deleted, 2 revisions)"""
+        stats = self._entity_stats()
+        rows = []
+        for e in self._sorted_entities():
+            authors = self._sorted_authors(stats['authors_of'][e])
+            values = [stats['by_author'][(e, a)][column] for a in authors]
+            total = sum(values)
+            best = max(range(len(authors)), key=values.__getitem__)
+            rows.append((self._entity_name(e), self._author_name(authors[best]),
+                         values[best], total, _ratio(values[best], total)))
+        return ['entity', 'main-dev'] + header + ['ownership'], rows
+
+    def main_dev(self):
+        return self._main_developers(0, ['added', 'total-added'])
+
+    def refactoring_main_dev(self):
+        return self._main_developers(1, ['removed', 'total-removed'])
+
+    def main_dev_by_revs(self):
+        return self._main_developers(2, ['added', 'total-added'])
+
+    def age(self):
+        stats = self._entity_stats()
+        rows = []
+        for e in range(len(self.log.entities)):
+            last = date.fromisoformat(stats['last_date'][e])
+            rows.append((self._entity_name(e), _months_between(last, self.now)))
+        rows.sort(key=lambda r: (r[1], r[0]))
+        return ['entity', 'age-months'], rows
+
+    def fragmentation(self):
+        stats = self._entity_stats()
+        rows = []
+        for e in range(len(self.log.entities)):
+            total = stats['revs'][e]
+            concentration = sum(
+                (stats['by_author'][(e, a)][2] / total) ** 2 for a in stats['authors_of'][e]
+            ) if total else 1.0
+            rows.append((self._entity_name(e), round(1 - concentration, 2), total))
+        rows.sort(key=lambda r: (-r[1], r[0]))
+        return ['entity', 'fractal-value', 'total-revs'], rows
+
+    def _coupled_changesets(self):
+        """Changesets of two or more entities within max_changeset_size"""
+        if self._coupling_changesets is None:
+            limit = self.options['max_changeset_size']
+            self._coupling_changesets = [
+                entities for entities in self._changeset_entities().values()
+                if 1 < len(entities) <= limit
+            ]
+        return self._coupling_changesets
+
+    def soc(self):
+        soc = defaultdict(int)
+        for entities in self._coupled_changesets():
+            degree = len(entities) - 1
+            for e in entities:
+                soc[e] += degree
+        rows = [(self._entity_name(e), value) for e, value in soc.items()]
+        rows.sort(key=lambda r: (-r[1], r[0]))
+        return ['entity', 'soc'], rows
+
+    def coupling(self):
+        stats = self._entity_stats()
+        names = self.log.entities.values
+        options = self.options
+        changesets = self._coupled_changesets()
+
+        # A pair shares at most as many changesets as its rarer entity is in, so
+        # entities in fewer than min_shared_revs changesets are dropped before
+        # any pair is formed
+        min_shared = max(options['min_shared_revs'], 1)
+        occurrences = [0] * len(names)
+        for entities in changesets:
+            for e in entities:
+                occurrences[e] += 1
+        kept = sorted((e for e, count in enumerate(occurrences) if count >= min_shared),
+                      key=names.__getitem__)
+        # Compact ids follow name order, so first < second orders each pair by name
+        compact = {e: i for i, e in enumerate(kept)}
+        pruned = []
+        for entities in changesets:
+            ids = sorted({compact[e] for e in entities if e in compact})
+            if len(ids) > 1:
+                pruned.append(ids)
+
+        rows = []
+        for first, second, shared_revs in co_change_counts(pruned, len(kept), min_shared):
+            first, second = kept[first], kept[second]
+            average_revs = math.ceil((stats['revs'][first] + stats['revs'][second]) / 2)
+            degree = _percentage(shared_revs, average_revs)
+            if (average_revs >= options['min_revs'] and shared_revs >= options['min_shared_revs'] and
+                    options['min_coupling'] <= degree <= options['max_coupling']):
+                rows.append((names[first], names[second], degree, average_revs))
+        rows.sort(key=lambda r: (-r[2], -r[3], r[0], r[1]))
+        return ['entity', 'coupled', 'degree', 'average-revs'], rows
+
+    def communication(self):
+        stats = self._entity_stats()
+        entity_count = defaultdict(int)
+        shared = defaultdict(int)
+        for authors in stats['authors_of']:
+            for author in authors:
+                entity_count[author] += 1
+            for author in authors:
+                for peer in authors:
+                    if author != peer:
+                        shared[(author, peer)] += 1
+
+        rows = []
+        for (author, peer), shared_entities in shared.items():
+            average = math.ceil((entity_count[author] + entity_count[peer]) / 2)
+            rows.append((self._author_name(author), self._author_name(peer), shared_entities, average,
+                         _percentage(shared_entities, average)))
+        rows.sort(key=lambda r: (-r[4], -r[2], r[0], r[1]))
+        return ['author', 'peer', 'shared', 'average', 'strength'], rows
+
+    # -- output ------------------------------------------------------------
+
+    def analyze(self, analysis):
+        """Return (header, rows) of one analysis type, e.g. 'entity-churn'"""
+        if analysis not in ANALYSES:
+            raise ValueError(f"Unknown analysis type: {analysis}")
+        return getattr(self, analysis.replace('-', '_'))()
+
+    def to_csv(self, analysis):
+        """One analysis as code-maat CSV text"""
+        header, rows = self.analyze(analysis)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+    def write_csv(self, analysis, path):
+        """Write one analysis as CSV to path and return its number of rows"""
+        header, rows = self.analyze(analysis)
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(header)
+            writer.writerows(rows)
+        return len(rows)
+
+
+def main(argv=None):
+    """Command line compatible with the common cm.jar options"""
+    parser = argparse.ArgumentParser(description="Native code-maat analyses on a git2 log")
+    parser.add_argument('-l', '--log', required=True, help='Log file in git2 format')
+    parser.add_argument('-c', '--version-control', default='git2', choices=['git2'],
+                        help='Log format (only git2 is supported)')
+    parser.add_argument('-a', '--analysis', default='authors', choices=ANALYSES, help='Analysis type')
+    parser.add_argument('-n', '--min-revs', type=int, default=DEFAULT_OPTIONS['min_revs'])
+    parser.add_argument('-m', '--min-shared-revs', type=int, default=DEFAULT_OPTIONS['min_shared_revs'])
+    parser.add_argument('-i', '--min-coupling', type=int, default=DEFAULT_OPTIONS['min_coupling'])
+    parser.add_argument('-x', '--max-coupling', type=int, default=DEFAULT_OPTIONS['max_coupling'])
+    parser.add_argument('-s', '--max-changeset-size', type=int, default=DEFAULT_OPTIONS['max_changeset_size'])
+    parser.add_argument('-d', '--age-time-now', type=date.fromisoformat, default=None,
+                        help='Reference date for the age analysis (YYYY-MM-DD, default: today)')
+    args = parser.parse_args(argv)
+
+    engine = CodeMaatEngine(
+        ChangeLog.from_git2_log(args.log),
+        now=args.age_time_now,
+        min_revs=args.min_revs,
+        min_shared_revs=args.min_shared_revs,
+        min_coupling=args.min_coupling,
+        max_coupling=args.max_coupling,
+        max_changeset_size=args.max_changeset_size
+    )
+    sys.stdout.write(engine.to_csv(args.analysis))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
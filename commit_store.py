@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Columnar on-disk store of a repository's commits (commits_columns.zip).
+
+commits.json is one pretty-printed array that every consumer parses in
+full. The store keeps each column in its own zip member instead, so a
+reader only decompresses the columns it asks for:
+- author_name, author_email: dictionary-encoded (int32 ids + JSON dictionary)
+- timestamp: author time, int64 seconds since the epoch
+- tz_offset_minutes: author UTC offset, int16
+- hash, message: JSON string lists
+Numeric columns are little-endian arrays. Members are compressed with
+deflate (default), bzip2 or lzma, or stored uncompressed.
+
+CommitStore reads columns with projection and time-range filtering; the
+ISO 8601 'date' and timezone-aware 'datetime' of the legacy records are
+derived from timestamp and offset. export_legacy_json() writes the
+commits.json format for the dashboard and older tools.
+
+Usage:
+    python3 commit_store.py export results/my-repo/commits_columns.zip [commits.json]
+    python3 commit_store.py import results/my-repo/commits.json [commits_columns.zip]
+"""
+
+import json
+import os
+import sys
+import zipfile
+from array import array
+from datetime import datetime, timedelta, timezone
+
+COMMIT_STORE_FILE = 'commits_columns.zip'
+STORE_VERSION = 1
+
+COMPRESSION = {
+    'deflate': zipfile.ZIP_DEFLATED,
+    'bzip2': zipfile.ZIP_BZIP2,
+    'lzma': zipfile.ZIP_LZMA,
+    'none': zipfile.ZIP_STORED,
+}
+
+# Stored columns: name -> kind
+COLUMNS = {
+    'hash': 'text',
+    'author_name': 'dictionary',
+    'author_email': 'dictionary',
+    'timestamp': 'q',
+    'tz_offset_minutes': 'h',
+    'message': 'text',
+}
+# Columns derived from timestamp and tz_offset_minutes
+DERIVED_COLUMNS = ('date', 'datetime')
+
+# Column order of the legacy commits.json records
+LEGACY_FIELDS = ('hash', 'author_name', 'author_email', 'date', 'tz_offset_minutes', 'message')
+
+
+def _to_bytes(values, typecode):
+    column = array(typecode, values)
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column.tobytes()
+
+
+def _from_bytes(data, typecode):
+    column = array(typecode)
+    column.frombytes(data)
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column
+
+
+_ZONES = {}
+
+
+def _zone(minutes):
+    zone = _ZONES.get(minutes)
+    if zone is None:
+        zone = _ZONES[minutes] = timezone(timedelta(minutes=minutes))
+    return zone
+
+
+def _parse_date(date):
+    try:
+        return datetime.fromisoformat(date.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+
+def iso_date(timestamp, tz_offset_minutes):
+    """The strict ISO 8601 author date git reports (%aI) for a timestamp and offset"""
+    return datetime.fromtimestamp(timestamp, _zone(tz_offset_minutes)).isoformat()
+
+
+def write_commit_store(path, records, repository_url='', repository_name='', compression='deflate'):
+    """
+    Write commit records in the commits.json format as a columnar store.
+
+    Dates that do not round-trip through timestamp and offset (unparseable
+    or unusual ISO strings) are kept verbatim, as are tz_offset_minutes
+    values that differ from the offset of the date (None for 'Z' dates), so
+    the export is lossless. Records without tz_offset_minutes get the
+    offset of their date.
+    """
+    columns = {name: [] for name in COLUMNS}
+    dictionaries = {name: {} for name, kind in COLUMNS.items() if kind == 'dictionary'}
+    date_overrides = {}
+    offset_overrides = {}
+    for index, record in enumerate(records):
+        columns['hash'].append(record.get('hash', ''))
+        columns['message'].append(record.get('message', ''))
+        for name, dictionary in dictionaries.items():
+            columns[name].append(dictionary.setdefault(record.get(name, ''), len(dictionary)))
+        date = record.get('date', '')
+        try:
+            commit_date = datetime.fromisoformat(date)
+            offset = int(commit_date.utcoffset().total_seconds() // 60)
+            timestamp = int(commit_date.timestamp())
+        except (TypeError, ValueError, AttributeError):
+            offset = timestamp = 0
+        columns['timestamp'].append(timestamp)
+        columns['tz_offset_minutes'].append(offset)
+        if iso_date(timestamp, offset) != date:
+            date_overrides[index] = date
+        if 'tz_offset_minutes' in record and record['tz_offset_minutes'] != offset:
+            offset_overrides[index] = record.get('tz_offset_minutes')
+
+    meta = {
+        'version': STORE_VERSION,
+        'repository_url': repository_url,
+        'repository_name': repository_name,
+        'count': len(columns['hash']),
+        'columns': COLUMNS,
+        # Fields of the records written (commits.json files from before tz_offset_minutes lack it)
+        'fields': [name for name in LEGACY_FIELDS if not records or name in records[0]],
+        'date_overrides': date_overrides,
+        'offset_overrides': offset_overrides,
+    }
+    temp_path = f"{path}.tmp"
+    try:
+        with zipfile.ZipFile(temp_path, 'w', compression=COMPRESSION[compression]) as store:
+            store.writestr('meta.json', json.dumps(meta))
+            for name, kind in COLUMNS.items():
+                if kind == 'text':
+                    store.writestr(f'{name}.json', json.dumps(columns[name], ensure_ascii=False))
+                elif kind == 'dictionary':
+                    store.writestr(f'{name}.dict.json', json.dumps(list(dictionaries[name]), ensure_ascii=False))
+                    store.writestr(f'{name}.bin', _to_bytes(columns[name], 'i'))
+                else:
+                    store.writestr(f'{name}.bin', _to_bytes(columns[name], kind))
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return path
+
+
+class CommitStore:
+    """Reader of a commits_columns.zip store"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with zipfile.ZipFile(self.path) as store:
+            self.meta = json.loads(store.read('meta.json'))
+        if self.meta.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported commit store version {self.meta.get('version')} in {self.path}")
+        self.repository_url = self.meta['repository_url']
+        self.repository_name = self.meta['repository_name']
+        self.date_overrides = {int(index): date for index, date in self.meta['date_overrides'].items()}
+        self.offset_overrides = {int(index): offset for index, offset in self.meta['offset_overrides'].items()}
+
+    def __len__(self):
+        return self.meta['count']
+
+    def _read_columns(self, names):
+        values = {}
+        with zipfile.ZipFile(self.path) as store:
+            for name in names:
+                kind = COLUMNS[name]
+                if kind == 'text':
+                    values[name] = json.loads(store.read(f'{name}.json'))
+                elif kind == 'dictionary':
+                    dictionary = json.loads(store.read(f'{name}.dict.json'))
+                    values[name] = [dictionary[i] for i in _from_bytes(store.read(f'{name}.bin'), 'i')]
+                else:
+                    values[name] = _from_bytes(store.read(f'{name}.bin'), kind)
+        return values
+
+    def read(self, columns=None, since=None, until=None):
+        """
+        Columns as {name: list}, for the commits with since <= author time < until.
+
+        columns defaults to every legacy field; 'date' (ISO 8601 string) and
+        'datetime' (timezone-aware datetime, None for unparseable dates) are
+        derived. since and until are datetimes or epoch seconds.
+        """
+        columns = list(columns or LEGACY_FIELDS)
+        unknown = [name for name in columns if name not in COLUMNS and name not in DERIVED_COLUMNS]
+        if unknown:
+            raise KeyError(f"Unknown commit store columns: {', '.join(unknown)}")
+        stored = {name for name in columns if name in COLUMNS}
+        if since is not None or until is not None or any(name in DERIVED_COLUMNS for name in columns):
+            stored |= {'timestamp', 'tz_offset_minutes'}
+        values = self._read_columns(sorted(stored))
+
+        overrides = self.date_overrides
+        offset_overrides = self.offset_overrides
+        if since is not None or until is not None:
+            since = since.timestamp() if isinstance(since, datetime) else since
+            until = until.timestamp() if isinstance(until, datetime) else until
+            # Commits with an unparseable date have no author time and never match a range
+            undated = {index for index, date in overrides.items() if _parse_date(date) is None}
+            rows = [index for index, timestamp in enumerate(values['timestamp'])
+                    if (since is None or timestamp >= since) and (until is None or timestamp < until)
+                    and index not in undated]
+            values = {name: [column[index] for index in rows] for name, column in values.items()}
+            overrides = {position: overrides[index] for position, index in enumerate(rows) if index in overrides}
+            offset_overrides = {position: offset_overrides[index]
+                                for position, index in enumerate(rows) if index in offset_overrides}
+
+        if 'date' in columns or 'datetime' in columns:
+            timestamps = values['timestamp']
+            offsets = values['tz_offset_minutes']
+            if 'datetime' in columns:
+                values['datetime'] = [
+                    datetime.fromtimestamp(timestamp, _zone(offset))
+                    for timestamp, offset in zip(timestamps, offsets)
+                ]
+            if 'date' in columns:
+                values['date'] = [
+                    iso_date(timestamp, offset) for timestamp, offset in zip(timestamps, offsets)
+                ]
+            # Dates kept verbatim
+            for position, date in overrides.items():
+                if 'date' in columns:
+                    values['date'][position] = date
+                if 'datetime' in columns:
+                    values['datetime'][position] = _parse_date(date)
+
+        if 'tz_offset_minutes' in columns and offset_overrides:
+            values['tz_offset_minutes'] = list(values['tz_offset_minutes'])
+            for position, offset in offset_overrides.items():
+                values['tz_offset_minutes'][position] = offset
+
+        return {name: list(values[name]) for name in columns}
+
+    def iter_records(self, columns=None, since=None, until=None):
+        """Commits as dicts of the requested columns (the legacy commits.json records by default)"""
+        values = self.read(columns, since, until)
+        names = list(values)
+        for row in zip(*(values[name] for name in names)):
+            yield dict(zip(names, row))
+
+    def legacy_data(self):
+        """The commits.json document"""
+        commits = list(self.iter_records(self.meta['fields']))
+        return {
+            'repository_url': self.repository_url,
+            'repository_name': self.repository_name,
+            'total_commits': len(commits),
+            'commits': commits
+        }
+
+
+def export_legacy_json(store_path, json_path):
+    """Write a store as commits.json (the format save_results writes)"""
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(CommitStore(store_path).legacy_data(), f, indent=2, ensure_ascii=False)
+    return json_path
+
+
+def import_legacy_json(json_path, store_path, compression='deflate'):
+    """Convert a commits.json into a store"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return write_commit_store(store_path, data.get('commits', []), data.get('repository_url', ''),
+                              data.get('repository_name', ''), compression)
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ('export', 'import'):
+        print("Usage: python3 commit_store.py export <commits_columns.zip> [commits.json]")
+        print("       python3 commit_store.py import <commits.json> [commits_columns.zip]")
+        sys.exit(1)
+
+    command, source = sys.argv[1], sys.argv[2]
+    directory = os.path.dirname(source)
+    if command == 'export':
+        target = sys.argv[3] if len(sys.argv) > 3 else os.path.join(directory, 'commits.json')
+        export_legacy_json(source, target)
+    else:
+        target = sys.argv[3] if len(sys.argv) > 3 else os.path.join(directory, COMMIT_STORE_FILE)
+        import_legacy_json(source, target)
+    print(f"Saved {target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+In-process lizard complexity analysis.
+
+Calls the vendored lizard.py API directly instead of running
+`python -m lizard --csv` and re-parsing its CSV: files are parsed by
+lizard's FileAnalyzer, spread over a process pool, and the per-repository
+results are aggregated while they stream in, so memory does not grow with
+the number of functions (only the most complex functions are kept).
+
+Workers return compact per-function rows (see FUNCTION_FIELDS) rather than
+lizard objects; the same rows are stored in the ComplexityCache, so files
+whose git blob was analyzed before are not parsed again.
+"""
+
+import heapq
+import importlib.util
+import itertools
+import multiprocessing
+import os
+import queue
+import signal
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from complexity_cache import CACHE_VERSION
+
+# lizard.py exits the interpreter when the lizard package (lizard_languages) is missing
+if importlib.util.find_spec("lizard_languages") is not None:
+    import lizard
+else:
+    lizard = None
+
+# Infrastructure directories skipped by the Complexity analysis
+DEFAULT_EXCLUDES = [
+    "*/node_modules/*",
+    "*/venv/*",
+    "*/env/*",
+    "*/__pycache__/*",
+    "*/.git/*",
+]
+
+# Number of most complex functions kept in the results
+TOP_FUNCTIONS = 500
+
+# Files handed to a worker per task; small enough to balance uneven file sizes
+POOL_CHUNKSIZE = 8
+
+# Seconds the pool may go without finishing any task before the analysis fails
+POOL_STALL_TIMEOUT = 600
+
+# Fields of the per-function rows returned by analyze_file
+FUNCTION_FIELDS = (
+    'nloc', 'cyclomatic_complexity', 'token_count', 'parameter_count',
+    'name', 'long_name', 'start_line', 'end_line'
+)
+
+_file_analyzer = None
+
+
+class ComplexityAnalysisError(RuntimeError):
+    """The worker pool died or stopped making progress"""
+
+
+def analyze_file(filename):
+    """lizard results of one file as (filename, nloc, function rows)"""
+    global _file_analyzer
+    if _file_analyzer is None:
+        _file_analyzer = lizard.FileAnalyzer(lizard.get_extensions([]))
+    file_info = _file_analyzer(filename)
+    return filename, file_info.nloc, [
+        (func.nloc, func.cyclomatic_complexity, func.token_count, len(func.parameters),
+         # lizard's CSV output replaces double quotes in names
+         func.name.replace('"', "'"), func.long_name.replace('"', "'"),
+         func.start_line, func.end_line)
+        for func in file_info.function_list
+    ]
+
+
+def analyzer_id(filename):
+    """How lizard parses a file: analyzer version and the reader chosen for its name"""
+    reader = lizard.get_reader_for(filename) or lizard.CLikeReader
+    return f"lizard-{lizard.version}/{CACHE_VERSION}/{reader.__name__}"
+
+
+def analyze_files(filenames):
+    """analyze_file results of a chunk of files (one pool task)"""
+    return [analyze_file(filename) for filename in filenames]
+
+
+def _report_pid(pids):
+    """Pool initializer: tell the parent which process to stop if the pool hangs"""
+    pids.put(os.getpid())
+
+
+def _stop_workers(executor, pids):
+    # shutdown() waits for running tasks, which never finish in a hung worker
+    while True:
+        try:
+            pid = pids.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass  # already exited
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _map_files(files, workers, stall_timeout=POOL_STALL_TIMEOUT):
+    if workers <= 1:
+        yield from map(analyze_file, files)
+        return
+    files = list(files)
+    # spawn: the pipeline starts the pool from worker threads, where forking is unsafe
+    context = multiprocessing.get_context("spawn")
+    pids = context.Queue()
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                   initializer=_report_pid, initargs=(pids,))
+    try:
+        chunks = {executor.submit(analyze_files, files[start:start + POOL_CHUNKSIZE]): index
+                  for index, start in enumerate(range(0, len(files), POOL_CHUNKSIZE))}
+        pending = set(chunks)
+        # Chunks finished ahead of an earlier one wait here, so results come in file order
+        finished = {}
+        next_chunk = 0
+        while pending:
+            done, pending = wait(pending, timeout=stall_timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                raise ComplexityAnalysisError(
+                    f"no file finished within {stall_timeout} seconds ({len(pending)} chunks of "
+                    f"{POOL_CHUNKSIZE} files left); a worker is hung"
+                )
+            for future in done:
+                try:
+                    finished[chunks[future]] = future.result()
+                except BrokenProcessPool as e:
+                    raise ComplexityAnalysisError(f"a worker process died: {e}") from e
+            while next_chunk in finished:
+                yield from finished.pop(next_chunk)
+                next_chunk += 1
+    except BaseException:
+        _stop_workers(executor, pids)
+        raise
+    finally:
+        pids.close()
+    executor.shutdown()
+
+
+def iter_file_functions(paths, workers=1, exclude_patterns=DEFAULT_EXCLUDES, cache=None):
+    """
+    Yield (filename, nloc, function rows, cached) per source file below paths.
+
+    Files are yielded in listing order, also when served from the cache or
+    by the pool, so the aggregates (and which functions win ties) do not
+    depend on the cache state or worker timing.
+    With more than one worker the files are analyzed by a process pool;
+    ComplexityAnalysisError is raised if a worker dies or no task finishes
+    within POOL_STALL_TIMEOUT seconds.
+    With a ComplexityCache, files whose git blob is cached are served from
+    it and only the remaining files are parsed (and then cached).
+    """
+    if lizard is None:
+        raise ImportError("lizard is not installed (pip install lizard)")
+
+    # Blob ids of the files git lists unmodified, from the same `git ls-files` pass
+    blob_ids = {}
+    files = lizard.get_all_source_files([str(path) for path in paths], list(exclude_patterns), None,
+                                        blob_ids)
+    if cache is None:
+        for result in _map_files(files, workers):
+            yield result + (False,)
+        return
+
+    files = list(files)
+    keys = {filename: (blob_ids[filename], analyzer_id(filename)) for filename in files if filename in blob_ids}
+
+    cached = cache.get_many(set(keys.values()))
+    # Parsed results come in the order of pending; interleaving them with the cached
+    # files keeps the file order of an uncached run, whatever the cache holds
+    pending = [filename for filename in files if keys.get(filename) not in cached]
+    parsed = _map_files(pending, workers)
+    results = (((filename,) + cached[keys[filename]] + (True,)) if keys.get(filename) in cached
+               else next(parsed) + (False,) for filename in files)
+
+    new_entries = {}
+    for filename, nloc, rows, from_cache in results:
+        # Unreadable files also report 0 lines; only cache files that were parsed
+        if not from_cache and nloc and filename in keys:
+            new_entries[keys[filename]] = (nloc, rows)
+        yield filename, nloc, rows, from_cache
+    cache.put_many(new_entries)
+
+
+def function_record(row, filename):
+    """A function row in the format of the complexity.json 'functions' list"""
+    nloc, ccn, token_count, parameter_count, name, long_name, start_line, end_line = row
+    return {
+        'nloc': nloc,
+        'cyclomatic_complexity': ccn,
+        'token_count': token_count,
+        'parameter_count': parameter_count,
+        'length': end_line - start_line + 1,
+        'file': filename,
+        'name': name,
+        'long_name': long_name,
+        'start_line': start_line,
+        'end_line': end_line,
+    }
+
+
+class ComplexityAggregator:
+    """
+    Running complexity summary of a repository.
+
+    Counts, sums and the complexity distribution are updated per function;
+    only the top_n most complex functions are kept (ties keep the function
+    seen first).
+    """
+
+    def __init__(self, top_n=TOP_FUNCTIONS):
+        self.top_n = top_n
+        self.file_count = 0
+        self.cached_files = 0
+        self.total_functions = 0
+        self.total_complexity = 0
+        self.total_nloc = 0
+        self.max_complexity = 0
+        self.min_complexity = None
+        self.distribution = {'low': 0, 'medium': 0, 'high': 0, 'very_high': 0}
+        self._top = []
+        self._sequence = itertools.count()
+
+    def add_file(self, filename, rows, cached=False):
+        self.file_count += 1
+        self.cached_files += cached
+        for row in rows:
+            self.add_function(row, filename)
+
+    def add_function(self, row, filename):
+        """Add one function row (see FUNCTION_FIELDS)"""
+        ccn = row[1]
+        self.total_functions += 1
+        self.total_complexity += ccn
+        self.total_nloc += row[0]
+        self.max_complexity = max(self.max_complexity, ccn)
+        self.min_complexity = ccn if self.min_complexity is None else min(self.min_complexity, ccn)
+        if ccn <= 5:
+            self.distribution['low'] += 1
+        elif ccn <= 10:
+            self.distribution['medium'] += 1
+        elif ccn <= 20:
+            self.distribution['high'] += 1
+        else:
+            self.distribution['very_high'] += 1
+
+        # Min-heap on (ccn, -sequence): the root is the function evicted next
+        key = (ccn, -next(self._sequence))
+        if len(self._top) < self.top_n:
+            heapq.heappush(self._top, (key, function_record(row, filename)))
+        elif key > self._top[0][0]:
+            heapq.heapreplace(self._top, (key, function_record(row, filename)))
+
+    def top_functions(self):
+        """The kept functions, most complex first"""
+        return [record for _, record in sorted(self._top, key=lambda item: item[0], reverse=True)]
+
+    def summary(self):
+        if not self.total_functions:
+            return {
+                'total_functions': 0,
+                'average_complexity': 0,
+                'max_complexity': 0,
+                'min_complexity': 0
+            }
+        return {
+            'total_functions': self.total_functions,
+            'average_complexity': round(self.total_complexity / self.total_functions, 2),
+            'max_complexity': self.max_complexity,
+            'min_complexity': self.min_complexity,
+            'complexity_distribution': dict(self.distribution),
+            'total_nloc': self.total_nloc
+        }
+
+
+def analyze_paths(paths, workers=1, exclude_patterns=DEFAULT_EXCLUDES, top_n=TOP_FUNCTIONS, cache=None,
+                  columns=None):
+    """
+    Aggregate the complexity of every source file below paths.
+
+    Every function is also added to columns (a complexity_store.FunctionColumns), if given.
+    """
+    aggregator = ComplexityAggregator(top_n)
+    for filename, nloc, rows, cached in iter_file_functions(paths, workers, exclude_patterns, cache):
+        aggregator.add_file(filename, rows, cached)
+        if columns is not None:
+            columns.add_file(filename, nloc, rows)
+    return aggregator
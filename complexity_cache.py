@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Persistent per-file cache of lizard results, keyed by git blob SHA.
+
+The `git ls-files -s` pass that lists the source files (lizard's
+get_all_source_files) also yields the blob SHA of every tracked file
+without reading file contents, so a file whose blob was analyzed before
+(in an earlier run, another branch, a fork or any other repository
+sharing the cache) is not tokenized again. Entries also record the lizard reader chosen for the file
+name and the analyzer version, since the same blob can be parsed
+differently as a .c and a .h file.
+
+The cache is a single sqlite3 file shared by all repositories of a run;
+concurrent repositories write to it in short transactions.
+"""
+
+import json
+import sqlite3
+
+# Bump when the cached function rows change, to invalidate old entries
+CACHE_VERSION = 1
+
+# sqlite's default limit of host parameters per statement is 999
+_LOOKUP_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_complexity (
+    blob_sha TEXT NOT NULL,
+    analyzer TEXT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (blob_sha, analyzer)
+)
+"""
+
+
+class ComplexityCache:
+    """sqlite3 store of (file nloc, function rows) per (blob SHA, analyzer)"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with self._connect() as connection:
+            connection.execute(_SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=60)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def get_many(self, keys):
+        """Cached results for (blob_sha, analyzer) keys, as {key: (nloc, rows)}"""
+        keys = list(keys)
+        found = {}
+        connection = self._connect()
+        try:
+            for start in range(0, len(keys), _LOOKUP_BATCH):
+                batch = keys[start:start + _LOOKUP_BATCH]
+                placeholders = ','.join('(?, ?)' for _ in batch)
+                query = (f"SELECT blob_sha, analyzer, result FROM file_complexity "
+                         f"WHERE (blob_sha, analyzer) IN (VALUES {placeholders})")
+                params = [value for key in batch for value in key]
+                for blob_sha, analyzer, result in connection.execute(query, params):
+                    nloc, rows = json.loads(result)
+                    found[(blob_sha, analyzer)] = (nloc, [tuple(row) for row in rows])
+        finally:
+            connection.close()
+        return found
+
+    def put_many(self, items):
+        """Store {(blob_sha, analyzer): (nloc, rows)}"""
+        if not items:
+            return
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO file_complexity (blob_sha, analyzer, result) VALUES (?, ?, ?)",
+                    [(blob_sha, analyzer, json.dumps(result, separators=(',', ':')))
+                     for (blob_sha, analyzer), result in items.items()]
+                )
+        finally:
+            connection.close()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Columnar store of every function found by the Complexity analysis.
+
+complexity.json only keeps the summary and the most complex functions. The
+complete results are streamed to complexity_functions.jsonl.gz, gzipped
+JSON lines: a header line ({"version", "function_columns"}) followed by one
+line per chunk of CHUNK_FUNCTIONS functions, {"files": [...], "functions":
+{column: [...]}}, with one array per column. "files" lists the files first
+seen in the chunk (repository-relative, '/'-separated, as in
+complexity_files.csv); functions refer to their file by its index in the
+concatenation of all chunks' file lists. Only the current chunk is held in
+memory, so memory does not grow with the number of functions, and
+iter_chunks/iter_functions read the store back the same way.
+Per-file aggregates (function count, total/max/average complexity, NLOC)
+are computed while the columns are collected and written only to
+complexity_files.csv, with repository-relative '/'-separated paths: the
+one file-level table both hotspots and the developer ranking load,
+instead of each re-aggregating functions.
+"""
+
+import csv
+import gzip
+import json
+import os
+from array import array
+
+FUNCTIONS_FILE = 'complexity_functions.jsonl.gz'
+FILE_TABLE = 'complexity_files.csv'
+STORE_VERSION = 4
+
+# Functions buffered before a chunk is written to the store
+CHUNK_FUNCTIONS = 50000
+
+# Integer function columns, in addition to 'file' (index into the file table)
+FUNCTION_INT_COLUMNS = (
+    'nloc', 'cyclomatic_complexity', 'token_count', 'parameter_count', 'start_line', 'end_line'
+)
+FUNCTION_TEXT_COLUMNS = ('name', 'long_name')
+
+# Per-file aggregate columns; avg_complexity is rounded to 2 decimals
+FILE_COLUMNS = (
+    'file_nloc', 'function_count', 'total_complexity', 'max_complexity', 'total_nloc', 'avg_complexity'
+)
+
+
+def relative_path(filename, root):
+    """filename relative to root with '/' separators, the form code-maat reports entities in"""
+    return os.path.relpath(filename, root).replace(os.sep, '/')
+
+
+class FunctionColumns:
+    """
+    Function rows (complexity_analysis.FUNCTION_FIELDS) of many files, collected as columns.
+
+    Files are recorded relative to root. With a path, functions are
+    streamed to the store there in chunks (call close() once every file is
+    added, or discard() on failure); without one, only the per-file
+    aggregates are kept.
+    """
+
+    def __init__(self, root, path=None, chunk_functions=CHUNK_FUNCTIONS):
+        self.root = root
+        self.path = path
+        self.chunk_functions = chunk_functions
+        self.files = []
+        self.function_count = 0
+        self.file_columns = {name: array('q') for name in FILE_COLUMNS if name != 'avg_complexity'}
+        self.file_columns['avg_complexity'] = array('d')
+        self._chunk_start = 0
+        self._new_chunk()
+        self._stream = None
+        if path:
+            self._stream = gzip.open(f"{path}.tmp", 'wt', encoding='utf-8', compresslevel=6)
+            self._write_line({
+                'version': STORE_VERSION,
+                'function_columns': ('file',) + FUNCTION_INT_COLUMNS + FUNCTION_TEXT_COLUMNS,
+            })
+
+    def __len__(self):
+        return self.function_count
+
+    def _new_chunk(self):
+        self.columns = {name: array('q') for name in ('file',) + FUNCTION_INT_COLUMNS}
+        self.text_columns = {name: [] for name in FUNCTION_TEXT_COLUMNS}
+
+    def _write_line(self, value):
+        json.dump(value, self._stream, separators=(',', ':'))
+        self._stream.write('\n')
+
+    def _flush(self):
+        if not len(self.columns['file']) and self._chunk_start == len(self.files):
+            return
+        self._write_line({
+            'files': self.files[self._chunk_start:],
+            'functions': dict(
+                [(name, column.tolist()) for name, column in self.columns.items()] +
+                list(self.text_columns.items())
+            ),
+        })
+        self._chunk_start = len(self.files)
+        self._new_chunk()
+
+    def add_file(self, filename, file_nloc, rows):
+        file_id = len(self.files)
+        self.files.append(relative_path(filename, self.root))
+        self.function_count += len(rows)
+        streaming = self._stream is not None
+        columns = self.columns
+        total_complexity = max_complexity = total_nloc = 0
+        for nloc, ccn, token_count, parameter_count, name, long_name, start_line, end_line in rows:
+            if streaming:
+                columns['file'].append(file_id)
+                columns['nloc'].append(nloc)
+                columns['cyclomatic_complexity'].append(ccn)
+                columns['token_count'].append(token_count)
+                columns['parameter_count'].append(parameter_count)
+                columns['start_line'].append(start_line)
+                columns['end_line'].append(end_line)
+                self.text_columns['name'].append(name)
+                self.text_columns['long_name'].append(long_name)
+            total_complexity += ccn
+            max_complexity = max(max_complexity, ccn)
+            total_nloc += nloc
+
+        file_columns = self.file_columns
+        file_columns['file_nloc'].append(file_nloc)
+        file_columns['function_count'].append(len(rows))
+        file_columns['total_complexity'].append(total_complexity)
+        file_columns['max_complexity'].append(max_complexity)
+        file_columns['total_nloc'].append(total_nloc)
+        file_columns['avg_complexity'].append(round(total_complexity / len(rows), 2) if rows else 0)
+
+        if streaming and len(columns['file']) >= self.chunk_functions:
+            self._flush()
+
+    def close(self):
+        """Write the last chunk and replace path with the complete store"""
+        if self._stream is None:
+            return None
+        self._flush()
+        self._stream.close()
+        self._stream = None
+        os.replace(f"{self.path}.tmp", self.path)
+        return self.path
+
+    def discard(self):
+        """Drop a partially written store"""
+        if self._stream is None:
+            return
+        self._stream.close()
+        self._stream = None
+        try:
+            os.remove(f"{self.path}.tmp")
+        except OSError:
+            pass
+
+    def save_file_table(self, path):
+        """Write the per-file aggregates as CSV"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(('file',) + FILE_COLUMNS)
+            for index, filename in enumerate(self.files):
+                writer.writerow([filename] + [self.file_columns[name][index] for name in FILE_COLUMNS])
+        os.replace(temp_path, path)
+        return path
+
+
+def iter_chunks(path, columns=None):
+    """
+    The store written by FunctionColumns, one {column: list} dict per chunk.
+
+    columns selects the function columns to return (default: all); 'file'
+    holds the file path of each function rather than its index.
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline() or '{}')
+        if header.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported complexity store version {header.get('version')} in {path}")
+        names = header['function_columns'] if columns is None else list(columns)
+        unknown = set(names) - set(header['function_columns'])
+        if unknown:
+            raise ValueError(f"Unknown complexity store columns: {', '.join(sorted(unknown))}")
+        files = []
+        for line in f:
+            chunk = json.loads(line)
+            files.extend(chunk['files'])
+            functions = chunk['functions']
+            yield {
+                name: [files[index] for index in functions['file']] if name == 'file' else functions[name]
+                for name in names
+            }
+
+
+def iter_functions(path, columns=None):
+    """Every function of the store as a {column: value} dict (see iter_chunks)"""
+    for chunk in iter_chunks(path, columns):
+        names = list(chunk)
+        for values in zip(*chunk.values()):
+            yield dict(zip(names, values))
+
+
+def load_file_table(path, with_functions_only=True):
+    """complexity_files.csv as {repository-relative path: {column: value}}"""
+    table = {}
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            aggregate = {name: int(row[name]) for name in FILE_COLUMNS if name != 'avg_complexity'}
+            aggregate['avg_complexity'] = float(row['avg_complexity'])
+            if with_functions_only and not aggregate['function_count']:
+                continue
+            table[row['file']] = aggregate
+    return table
+
+
+def aggregate_functions(functions):
+    """Per-file aggregates (as in complexity_files.csv, without file_nloc) of function records"""
+    table = {}
+    for func in functions:
+        aggregate = table.setdefault(func['file'], {
+            'function_count': 0, 'total_complexity': 0, 'max_complexity': 0, 'total_nloc': 0
+        })
+        aggregate['function_count'] += 1
+        aggregate['total_complexity'] += func['cyclomatic_complexity']
+        aggregate['max_complexity'] = max(aggregate['max_complexity'], func['cyclomatic_complexity'])
+        aggregate['total_nloc'] += func['nloc']
+    for aggregate in table.values():
+        aggregate['avg_complexity'] = round(aggregate['total_complexity'] / aggregate['function_count'], 2)
+    return table
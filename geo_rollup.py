@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Organization-wide geographic distribution from per-repository partials.
+
+Every repository's geo stage writes geo_partial.json next to its
+geographic_distribution.json: commits per 15-minute UTC offset bucket, a
+HyperLogLog sketch of the authors of each bucket (and of all authors), and
+the commits of each author per bucket. This script merges any number of
+partials one file at a time into a fixed-size state and writes an
+org-wide geographic_distribution.json in the per-repository format.
+
+Commit counts are exact. Unique author counts are HyperLogLog estimates
+(about 1.6% standard error), so the same author committing to several
+repositories is counted once. Author commit counts are summed per timezone
+and pruned to the ROLLUP_TOP_AUTHORS most active authors whenever twice as
+many are held, which keeps memory bounded; an author is only undercounted
+after dropping out of the top ROLLUP_TOP_AUTHORS of a timezone.
+
+Usage:
+    python3 geo_rollup.py results
+    python3 geo_rollup.py results -o results/geographic_distribution.json
+    python3 geo_rollup.py results/a/geo_partial.json results/b/geo_partial.json -o geo.json
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+
+from analyze_geo_distribution import (
+    PARTIAL_FILE, PARTIAL_VERSION, TOP_AUTHORS,
+    get_location_info, offset_hours, offset_to_key, save_geographic_distribution
+)
+from hyperloglog import HyperLogLog
+
+# Authors kept per timezone while merging (pruned to this many whenever twice as many are held)
+ROLLUP_TOP_AUTHORS = 5000
+
+
+def iter_partial_files(paths):
+    """Partial files given directly, in a given directory or in its repository subdirectories"""
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+            continue
+        if os.path.isfile(os.path.join(path, PARTIAL_FILE)):
+            yield os.path.join(path, PARTIAL_FILE)
+        for name in sorted(entry.name for entry in os.scandir(path) if entry.is_dir()):
+            partial_file = os.path.join(path, name, PARTIAL_FILE)
+            if os.path.isfile(partial_file):
+                yield partial_file
+
+
+class GeoRollup:
+    """Running merge of geo partials; memory depends on the number of timezones, not of repositories"""
+
+    def __init__(self, max_authors=ROLLUP_TOP_AUTHORS):
+        self.max_authors = max_authors
+        self.repositories = 0
+        self.total_commits = 0
+        self.commits_with_timezone = 0
+        self.authors = None
+        self.timezones = {}  # bucket -> merged state
+
+    def _parse(self, partial):
+        """
+        Validate a partial and decode its sketches, without touching the merged state.
+
+        Raises ValueError or KeyError for a malformed partial.
+        """
+        if partial.get('version') != PARTIAL_VERSION:
+            raise ValueError(f"unsupported partial version {partial.get('version')}")
+        precision = partial['hll_precision']
+        if self.authors is not None and precision != self.authors.precision:
+            raise ValueError(f"HyperLogLog precision {precision} differs from {self.authors.precision} "
+                             f"of the partials merged so far")
+        try:
+            authors = HyperLogLog.from_string(partial['authors_hll'], precision)
+            timezones = [
+                (int(timezone['bucket']), int(timezone['offset_minutes']), int(timezone['commit_count']),
+                 HyperLogLog.from_string(timezone['authors_hll'], precision),
+                 [(str(email), int(commits)) for email, commits in timezone['author_commits']])
+                for timezone in partial['timezones']
+            ]
+            total_commits = int(partial['total_commits_analyzed'])
+            commits_with_timezone = int(partial['commits_with_timezone'])
+        except (TypeError, zlib.error) as e:
+            raise ValueError(f"malformed partial: {e}") from e
+        return precision, authors, timezones, total_commits, commits_with_timezone
+
+    def add(self, partial):
+        """Merge one partial; a malformed partial raises before anything is merged"""
+        precision, authors, timezones, total_commits, commits_with_timezone = self._parse(partial)
+
+        self.authors = authors if self.authors is None else self.authors.merge(authors)
+        self.repositories += 1
+        self.total_commits += total_commits
+        self.commits_with_timezone += commits_with_timezone
+
+        for bucket, offset_minutes, commit_count, bucket_authors, author_commits in timezones:
+            state = self.timezones.get(bucket)
+            if state is None:
+                state = self.timezones[bucket] = {
+                    'commit_count': 0,
+                    'offset_commits': {},
+                    'authors': HyperLogLog(precision),
+                    'top_authors': {}
+                }
+            state['commit_count'] += commit_count
+            offset_commits = state['offset_commits']
+            offset_commits[offset_minutes] = offset_commits.get(offset_minutes, 0) + commit_count
+            state['authors'].merge(bucket_authors)
+            top_authors = state['top_authors']
+            for email, commits in author_commits:
+                top_authors[email] = top_authors.get(email, 0) + commits
+            if len(top_authors) > 2 * self.max_authors:
+                state['top_authors'] = dict(
+                    heapq.nlargest(self.max_authors, top_authors.items(), key=lambda x: x[1])
+                )
+
+    def result(self, name):
+        """The merged distribution in the geographic_distribution.json format"""
+        geographic_distribution = []
+        for bucket in sorted(self.timezones):
+            state = self.timezones[bucket]
+            # The exact offset most commits of the bucket were made in
+            offset = offset_hours(max(state['offset_commits'].items(), key=lambda x: (x[1], -x[0]))[0])
+            location_info = get_location_info(offset)
+            top_authors = heapq.nlargest(TOP_AUTHORS, state['top_authors'].items(), key=lambda x: x[1])
+            geographic_distribution.append({
+                'timezone_offset': offset_to_key(bucket / 4),
+                'offset_hours': offset,
+                'region': location_info['region'],
+                'likely_cities': location_info['cities'],
+                'likely_countries': location_info['countries'],
+                'commit_count': state['commit_count'],
+                'commit_percentage': round(state['commit_count'] / self.commits_with_timezone * 100, 2),
+                'unique_authors': round(state['authors'].estimate()),
+                'top_authors': [
+                    {'email': email, 'commits': count}
+                    for email, count in top_authors
+                ]
+            })
+
+        return {
+            'repository_url': '',
+            'repository_name': name,
+            'analysis_timestamp': datetime.now().isoformat(),
+            'summary': {
+                'total_commits_analyzed': self.total_commits,
+                'commits_with_timezone': self.commits_with_timezone,
+                'commits_without_timezone': self.total_commits - self.commits_with_timezone,
+                'unique_timezones': len(geographic_distribution),
+                'total_unique_authors': round(self.authors.estimate()) if self.authors else 0,
+                'repositories': self.repositories,
+                'unique_authors_estimated': True
+            },
+            'geographic_distribution': geographic_distribution
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Combine per-repository geo_partial.json files into an org-wide geographic_distribution.json'
+    )
+    parser.add_argument('paths', nargs='+',
+                        help='Results directory (its repository subdirectories are searched) or partial files')
+    parser.add_argument('-o', '--output',
+                        help='Output file (default: geographic_distribution.json in the first directory given)')
+    parser.add_argument('--name', default='All repositories', help='repository_name of the output')
+    parser.add_argument('--max-authors', type=int, default=ROLLUP_TOP_AUTHORS,
+                        help=f'Authors whose commits are tracked per timezone (default: {ROLLUP_TOP_AUTHORS})')
+    args = parser.parse_args(argv)
+
+    output = args.output
+    if output is None:
+        if not os.path.isdir(args.paths[0]):
+            parser.error("--output is required when the first path is not a directory")
+        output = os.path.join(args.paths[0], 'geographic_distribution.json')
+
+    rollup = GeoRollup(args.max_authors)
+    for partial_file in iter_partial_files(args.paths):
+        try:
+            with open(partial_file, 'r', encoding='utf-8') as f:
+                rollup.add(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: Skipping {partial_file}: {e}")
+
+    if not rollup.repositories:
+        print("Error: No geo partials found")
+        return 1
+
+    result = rollup.result(args.name)
+    save_geographic_distribution(result, output)
+    summary = result['summary']
+    print(f"Merged {rollup.repositories} repositories: {summary['total_commits_analyzed']} commits, "
+          f"{summary['unique_timezones']} timezones, ~{summary['total_unique_authors']} unique authors")
+    print(f"Results saved to: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
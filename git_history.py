@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Single-pass git history extraction shared by every history consumer.
+
+One `git log --all --numstat --no-renames -z` walk with a rich format is
+streamed through a generator and collected into a CommitTable, from which
+the other artifacts are derived without walking the history again:
+- commits.json records (hash, author, ISO date, UTC offset in minutes, subject)
+- the code-maat git2 log (--%h--%ad--%aN + numstat lines)
+- the standalone analyzer history and classification inputs
+
+git's stdout is read incrementally in NUL-delimited records, so memory does
+not grow with the size of the history, and git is only stopped when it makes
+no progress for stall_timeout seconds (a slow but progressing walk of a large
+monorepo is never killed). A CommitTable can be spooled to a JSON-lines file
+so consumers iterate it from disk as well.
+"""
+
+import heapq
+import json
+import os
+import queue
+import subprocess
+import threading
+
+# Record separator starts every commit, unit separator splits the header fields.
+# Neither appears in author names or commit messages in practice.
+RECORD_SEP = '\x1e'
+FIELD_SEP = '\x1f'
+
+# Seconds git may go without producing any output before it is considered stuck
+DEFAULT_STALL_TIMEOUT = 300
+
+READ_CHUNK_SIZE = 64 * 1024
+
+# Field order of the --pretty format below; the numstat block follows the last separator
+FIELDS = ('hash', 'abbrev', 'author_name', 'author_email', 'author_mailmap', 'date', 'commit_time',
+          'subject', 'body')
+
+PRETTY_FORMAT = 'format:' + RECORD_SEP + FIELD_SEP.join(
+    ['%H', '%h', '%an', '%ae', '%aN', '%aI', '%ct', '%s', '%B']
+) + FIELD_SEP
+
+# Bump when the commit record layout or order changes, to force a full re-extraction
+STORE_VERSION = 2
+
+
+def utc_offset_minutes(iso_date):
+    """UTC offset of a '...+HH:MM' ISO 8601 date in minutes (None without such a suffix)"""
+    if len(iso_date) < 6 or iso_date[-3] != ':' or iso_date[-6] not in '+-':
+        return None
+    hours = iso_date[-5:-3]
+    minutes = iso_date[-2:]
+    if not (hours.isdigit() and minutes.isdigit()):
+        return None
+    offset = int(hours) * 60 + int(minutes)
+    return -offset if iso_date[-6] == '-' else offset
+
+
+class GitHistoryError(Exception):
+    """Raised when the history cannot be extracted"""
+
+
+def build_log_command(repo_path, since=None, all_refs=True, exclude=()):
+    """
+    git log command for the single rich-format pass. Commits reachable from
+    the exclude SHAs are left out; they are passed on stdin (see iter_history)
+    so any number of them fits.
+    """
+    cmd = ["git", "-C", str(repo_path), "log"]
+    if since:
+        cmd.append(f"--since={since}")
+    cmd += ["-z", "--numstat", "--no-renames", f"--pretty={PRETTY_FORMAT}"]
+    cmd.append("--all" if all_refs else "HEAD")
+    if exclude:
+        cmd.append("--stdin")
+    return cmd
+
+
+def _parse_numstat(entry):
+    """Parse one numstat entry into [added, deleted, path]; binary files have None counts"""
+    parts = entry.split('\t', 2)
+    if len(parts) != 3:
+        return None
+    added = int(parts[0]) if parts[0].isdigit() else None
+    deleted = int(parts[1]) if parts[1].isdigit() else None
+    return [added, deleted, parts[2]]
+
+
+def _parse_header(token):
+    """Parse a header token (text after RECORD_SEP) into a commit dict"""
+    parts = token.split(FIELD_SEP, len(FIELDS))
+    if len(parts) <= len(FIELDS):
+        return None
+    commit = dict(zip(FIELDS, parts))
+    commit['commit_time'] = int(commit['commit_time']) if commit['commit_time'].isdigit() else 0
+    commit['body'] = commit['body'].strip()
+    commit['files'] = []
+    # With -z the first numstat entry shares the token with the header
+    first_entry = parts[len(FIELDS)].lstrip('\n')
+    if first_entry:
+        stat = _parse_numstat(first_entry)
+        if stat:
+            commit['files'].append(stat)
+    return commit
+
+
+def parse_records(tokens):
+    """
+    Turn the NUL-separated tokens of build_log_command output into commit
+    dicts, yielding each commit as soon as the next one starts.
+    """
+    commit = None
+    for token in tokens:
+        if token.startswith(RECORD_SEP):
+            if commit:
+                yield commit
+            commit = _parse_header(token[len(RECORD_SEP):])
+        elif token and commit is not None:
+            stat = _parse_numstat(token)
+            if stat:
+                commit['files'].append(stat)
+    if commit:
+        yield commit
+
+
+def _read_tokens(process, stall_timeout):
+    """
+    Yield NUL-delimited tokens from process stdout. A reader thread feeds a
+    bounded queue; waiting longer than stall_timeout for the next chunk
+    means git stopped making progress.
+    """
+    chunks = queue.Queue(maxsize=16)
+
+    def reader():
+        try:
+            while True:
+                chunk = process.stdout.read(READ_CHUNK_SIZE)
+                chunks.put(chunk)
+                if not chunk:
+                    break
+        except Exception:
+            chunks.put(b'')
+
+    threading.Thread(target=reader, daemon=True).start()
+
+    pending = b''
+    while True:
+        try:
+            chunk = chunks.get(timeout=stall_timeout)
+        except queue.Empty:
+            raise GitHistoryError(f"git log made no progress for {stall_timeout}s")
+        if not chunk:
+            break
+        pending += chunk
+        *complete, pending = pending.split(b'\0')
+        for token in complete:
+            yield token.decode('utf-8', errors='replace')
+    if pending:
+        yield pending.decode('utf-8', errors='replace')
+
+
+def iter_history(repo_path, since=None, all_refs=True, stall_timeout=DEFAULT_STALL_TIMEOUT, exclude=()):
+    """
+    Stream the history as commit dicts (see CommitTable) in git log order,
+    leaving out commits reachable from the exclude SHAs.
+
+    Raises GitHistoryError when git fails or stalls.
+    """
+    cmd = build_log_command(repo_path, since, all_refs, exclude)
+    try:
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE if exclude else subprocess.DEVNULL,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        raise GitHistoryError(f"could not run git: {e}")
+
+    if exclude:
+        try:
+            process.stdin.write(''.join(f"^{sha}\n" for sha in exclude).encode('ascii'))
+            process.stdin.close()
+        except OSError:
+            pass  # git exited early; its status and stderr are reported below
+
+    # stderr is drained on its own thread so a chatty git cannot block on a full pipe
+    stderr_chunks = []
+    stderr_thread = threading.Thread(target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+    stderr_thread.start()
+
+    try:
+        yield from parse_records(_read_tokens(process, stall_timeout))
+        returncode = process.wait()
+    finally:
+        if process.poll() is None:
+            # The reader thread owns stdout until it sees EOF, so it is left to close it
+            process.kill()
+            process.wait()
+        else:
+            process.stdout.close()
+
+    stderr_thread.join(timeout=5)
+    stderr = b''.join(stderr_chunks).decode('utf-8', errors='replace').strip()
+    if returncode != 0:
+        # A repository without any commit is an empty history, not an error
+        if "does not have any commits" in stderr:
+            return
+        raise GitHistoryError(stderr or f"git log exited with {returncode}")
+
+
+class CommitTable:
+    """
+    Commits of one history walk, newest first.
+
+    Commits are ordered by commit time, newest first; commits with the same
+    time keep git log's order, which lists a commit before its parents. An
+    incrementally updated store (update_history) keeps the same order, so
+    commits.json and the code-maat log do not depend on how the store was
+    built up.
+
+    Each commit is a dict with hash, abbrev, author_name, author_email,
+    author_mailmap (.mailmap-resolved name), date (strict ISO 8601 with the
+    author's offset), subject, body and files ([added, deleted, path], counts
+    None for binary files).
+
+    The commits are either held in memory or, for a table created with
+    spool()/load(), read back from a JSON-lines file on every iteration.
+    """
+
+    def __init__(self, commits=None, path=None, count=None):
+        self.commits = commits if commits is not None or path else []
+        self.path = path
+        self._count = count
+
+    def __len__(self):
+        if self.commits is not None:
+            return len(self.commits)
+        if self._count is None:
+            self._count = sum(1 for _ in self)
+        return self._count
+
+    def __iter__(self):
+        if self.commits is not None:
+            return iter(self.commits)
+        return self._iter_file()
+
+    def _iter_file(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    @classmethod
+    def spool(cls, records, path):
+        """Write streamed records to path and return a table backed by that file"""
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for commit in records:
+                f.write(json.dumps(commit, ensure_ascii=False))
+                f.write('\n')
+                count += 1
+        return cls(path=path, count=count)
+
+    @classmethod
+    def load(cls, path):
+        """Table backed by a file written by spool()/save()"""
+        return cls(path=path)
+
+    def save(self, path):
+        """Save the table as JSON lines, one commit per line"""
+        return CommitTable.spool(iter(self), path).path
+
+    def commit_records(self):
+        """Records in the commits.json format"""
+        return [
+            {
+                "hash": c['hash'],
+                "author_name": c['author_name'],
+                "author_email": c['author_email'],
+                "date": c['date'],
+                "tz_offset_minutes": utc_offset_minutes(c['date']),
+                "message": c['subject']
+            }
+            for c in self
+        ]
+
+    def _codemaat_entries(self):
+        for c in self:
+            entry = f"--{c['abbrev']}--{c['date'][:10]}--{c['author_mailmap']}"
+            if c['files']:
+                # git ends a numstat block with a newline, giving a blank line before the next commit
+                entry += '\n' + ''.join(
+                    f"{'-' if added is None else added}\t{'-' if deleted is None else deleted}\t{path}\n"
+                    for added, deleted, path in c['files']
+                )
+            yield entry
+
+    def codemaat_log(self):
+        """The history in code-maat's git2 format, as produced by
+        git log --numstat --date=short --pretty=format:--%h--%ad--%aN"""
+        return '\n'.join(self._codemaat_entries())
+
+    def write_codemaat_log(self, path):
+        """Stream the code-maat log to path"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for i, entry in enumerate(self._codemaat_entries()):
+                if i:
+                    f.write('\n')
+                f.write(entry)
+        return path
+
+
+def _newest_first(commit):
+    return -commit.get('commit_time', 0)
+
+
+def spool_newest_first(records, path):
+    """
+    Spool records to path in store order (see CommitTable) and return the table.
+
+    git log output is almost always in order already and is then written
+    as it streams; otherwise the lines are rewritten in order, holding only
+    a (commit time, offset) pair per commit in memory.
+    """
+    temp_path = f"{path}.tmp"
+    index = []
+    in_order = True
+    with open(temp_path, 'wb') as f:
+        for commit in records:
+            key = _newest_first(commit)
+            if index and key < index[-1][0]:
+                in_order = False
+            offset = f.tell()
+            f.write(json.dumps(commit, ensure_ascii=False).encode('utf-8'))
+            f.write(b'\n')
+            index.append((key, offset))
+    if in_order:
+        os.replace(temp_path, path)
+        return CommitTable(path=path, count=len(index))
+
+    # Stable: commits with the same time keep the order git walked them in
+    index.sort(key=lambda entry: entry[0])
+    with open(temp_path, 'rb') as source, open(path, 'wb') as f:
+        for _, offset in index:
+            source.seek(offset)
+            f.write(source.readline())
+    os.remove(temp_path)
+    return CommitTable(path=path, count=len(index))
+
+
+def extract_history(repo_path, since=None, all_refs=True, path=None, stall_timeout=DEFAULT_STALL_TIMEOUT):
+    """
+    Walk the history once and return a CommitTable in store order, spooled
+    to path when given (constant memory) or held in memory otherwise.
+
+    Raises GitHistoryError when git fails or stalls.
+    """
+    records = iter_history(repo_path, since, all_refs, stall_timeout)
+    if path:
+        return spool_newest_first(records, path)
+    return CommitTable(sorted(records, key=_newest_first))
+
+
+def _git_lines(repo_path, args, stdin_text=None):
+    """Run a short git query; return its output lines or None on failure"""
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(repo_path)] + args,
+            input=stdin_text,
+            capture_output=True,
+            text=True,
+            timeout=120
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.split()
+
+
+def get_tips(repo_path, all_refs=True):
+    """SHAs of the revisions a walk starts from (every ref plus HEAD, or HEAD only)"""
+    tips = _git_lines(repo_path, ["rev-parse", "HEAD"] + (["--all"] if all_refs else []))
+    return sorted(set(tips)) if tips else None
+
+
+def history_was_rewritten(repo_path, old_tips, current_tips):
+    """
+    True when a commit reachable from the previous tips is no longer reachable
+    from the current ones (force-push, rebase, deleted branch) or a previous
+    tip no longer exists.
+    """
+    revisions = ''.join(f"{sha}\n" for sha in old_tips) + ''.join(f"^{sha}\n" for sha in current_tips)
+    lost = _git_lines(repo_path, ["rev-list", "-n", "1", "--stdin"], revisions)
+    return lost is None or bool(lost)
+
+
+def since_cutoff(repo_path, since):
+    """Unix time git uses for --since (approxidate parsing included), or None"""
+    if not since:
+        return None
+    output = _git_lines(repo_path, ["rev-parse", f"--since={since}"])
+    if output and output[0].startswith("--max-age="):
+        return int(output[0][len("--max-age="):])
+    return None
+
+
+def state_path_for(path):
+    """Sidecar file that records the tips a persisted commit store was built from"""
+    return os.path.splitext(str(path))[0] + '_state.json'
+
+
+def _load_state(path):
+    try:
+        with open(state_path_for(path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(path, state):
+    with open(state_path_for(path), 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+
+
+def update_history(repo_path, path, since=None, all_refs=True, stall_timeout=DEFAULT_STALL_TIMEOUT, force=False):
+    """
+    Bring the persisted commit store at path up to date and return
+    (CommitTable, stats).
+
+    Only commits that are not reachable from the tips recorded by the
+    previous update are extracted and merged into the store by commit time
+    (new commits first among equal times: they are never ancestors of the
+    stored ones), giving the order of a full extraction; records that
+    fell out of the since window are dropped. A rewritten history, a changed
+    window or a missing/outdated store falls back to a full extraction, so
+    the cost of an update scales with the number of new commits.
+
+    stats has mode ('full' or 'incremental'), new, aged_out and total.
+    """
+    current_tips = get_tips(repo_path, all_refs)
+    state = {} if force else _load_state(path)
+    old_tips = state.get('tips')
+
+    reason = None
+    if not current_tips:
+        reason = "no commits"
+    elif not old_tips or not os.path.exists(path):
+        reason = "no previous extraction"
+    elif state.get('store_version') != STORE_VERSION or state.get('since') != since or \
+            state.get('all_refs') != all_refs:
+        reason = "extraction options changed"
+    elif history_was_rewritten(repo_path, old_tips, current_tips):
+        reason = "history rewritten"
+
+    if reason:
+        table = extract_history(repo_path, since, all_refs, path, stall_timeout)
+        stats = {'mode': 'full', 'reason': reason, 'new': len(table), 'aged_out': 0, 'total': len(table)}
+    else:
+        previous = CommitTable.load(path)
+        new_commits = [] if old_tips == current_tips else \
+            sorted(iter_history(repo_path, since, all_refs, stall_timeout, exclude=old_tips), key=_newest_first)
+        cutoff = since_cutoff(repo_path, since)
+        aged_out = 0 if cutoff is None else sum(1 for c in previous if c.get('commit_time', 0) < cutoff)
+
+        if new_commits or aged_out:
+            # Written to a temporary file first: the old store is read while the new one is written
+            kept = (c for c in previous if cutoff is None or c.get('commit_time', 0) >= cutoff)
+            temp_path = f"{path}.tmp"
+            # A merged branch or a new ref can bring commits older than stored ones
+            count = len(CommitTable.spool(heapq.merge(new_commits, kept, key=_newest_first), temp_path))
+            os.replace(temp_path, path)
+            table = CommitTable(path=path, count=count)
+        else:
+            table = previous
+        stats = {'mode': 'incremental', 'new': len(new_commits), 'aged_out': aged_out, 'total': len(table)}
+
+    if current_tips:
+        _save_state(path, {
+            'store_version': STORE_VERSION,
+            'tips': current_tips,
+            'since': since,
+            'all_refs': all_refs
+        })
+    return table, stats
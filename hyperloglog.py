@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+HyperLogLog cardinality sketch.
+
+Estimates the number of distinct values (e.g. author emails) in a fixed
+2**precision bytes, and sketches of different sets merge by taking the
+register-wise maximum: the merged sketch estimates the size of the union.
+At the default precision of 12 (4 KiB) the standard error is about 1.6%;
+small sets are counted almost exactly (linear counting).
+
+Sketches are serialized as base64 of the zlib-compressed registers, which
+keeps the sketch of a small repository to a few dozen bytes.
+"""
+
+import base64
+import hashlib
+import math
+import zlib
+
+DEFAULT_PRECISION = 12
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    def __init__(self, precision=DEFAULT_PRECISION, registers=None):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(1 << precision)
+        if len(self.registers) != 1 << precision:
+            raise ValueError(f"Expected {1 << precision} registers, got {len(self.registers)}")
+
+    def add(self, value):
+        hashed = _hash64(value)
+        index = hashed >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        remaining = hashed & ((1 << remaining_bits) - 1)
+        # Position of the leftmost 1 bit of the remaining bits
+        rank = remaining_bits - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        """Add the values of another sketch of the same precision to this one"""
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge HyperLogLog sketches of precision {self.precision} and {other.precision}")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def estimate(self):
+        """Estimated number of distinct values added"""
+        m = len(self.registers)
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return m * math.log(m / zeros)
+        return raw
+
+    def to_string(self):
+        return base64.b64encode(zlib.compress(bytes(self.registers), 9)).decode('ascii')
+
+    @classmethod
+    def from_string(cls, text, precision=DEFAULT_PRECISION):
+        return cls(precision, zlib.decompress(base64.b64decode(text)))
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Persistent developer identity index.
+
+The same engineer commits under several names and emails across
+repositories ("Jane Doe <jane@corp.com>", "jdoe <jane.doe@users.noreply...>").
+AliasIndex resolves authors by email: a union-find over email keys joins
+the emails of each .mailmap entry, whose first name becomes the preferred
+name of the identity, and the emails of each per-repository author record
+(add_record: that repository's factors of the name cannot be split between
+its emails). Display names are not identities across repositories ("John
+Smith" or "dev" are shared by unrelated people), so names only resolve:
+- an author without a usable email through its name, when that name was
+  seen with exactly one email
+- with join_names, every name seen with several emails joins them, but
+  only in a copy used for resolution (joined_by_name)
+Names are compared case-insensitively with collapsed whitespace, emails
+case-insensitively.
+
+The index is derived from the .mailmap files and the stored per-repository
+records, and saved as JSON (developer_aliases.json next to the org-wide
+ranking state); OrgRanking rebuilds it on every update, so repositories
+that are dropped leave no aliases behind.
+"""
+
+import json
+import os
+import re
+
+ALIASES_FILE = 'developer_aliases.json'
+INDEX_VERSION = 2
+
+# Placeholder identities shared by unrelated people; never used to join aliases
+IGNORED_NAMES = {'', 'unknown', 'root', 'none', 'admin', 'administrator', 'user'}
+IGNORED_EMAILS = {'', 'none', 'none@none', 'unknown', 'noreply@github.com', 'root@localhost'}
+
+# "Proper Name <proper@email> Commit Name <commit@email>" and its shorter forms
+_MAILMAP_ENTRY = re.compile(r'\s*([^<]*?)\s*<([^>]*)>')
+
+
+def name_key(name):
+    name = ' '.join((name or '').split()).casefold()
+    return None if name in IGNORED_NAMES else f"name:{name}"
+
+
+def email_key(email):
+    email = (email or '').strip().casefold()
+    return None if email in IGNORED_EMAILS else f"email:{email}"
+
+
+def parse_mailmap(path):
+    """
+    Entries of a .mailmap file as (proper name, [names], [emails]) tuples.
+
+    The proper name is the first name of the line (None when the line only
+    maps emails).
+    """
+    entries = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.split('#', 1)[0]
+            pairs = _MAILMAP_ENTRY.findall(line)
+            if not pairs:
+                continue
+            names = [name for name, _ in pairs if name]
+            emails = [email for _, email in pairs if email]
+            entries.append((pairs[0][0] or None, names, emails))
+    return entries
+
+
+class AliasIndex:
+    """Union-find of email keys, the names seen with each email and the preferred (.mailmap) names"""
+
+    def __init__(self):
+        self.parent = {}
+        self.proper_names = {}  # root key -> preferred display name
+        self.name_emails = {}  # name key -> sorted email keys seen with it in commits
+
+    def find(self, key):
+        """Root key of the identity of key (key itself when unknown)"""
+        parent = self.parent
+        root = key
+        while parent.get(root, root) != root:
+            root = parent[root]
+        # Path compression
+        while key != root:
+            key, parent[key] = parent[key], root
+        return root
+
+    def union(self, *keys):
+        """Join the identities of keys (None keys are ignored); returns the root"""
+        keys = [key for key in keys if key]
+        if not keys:
+            return None
+        root = self.find(keys[0])
+        self.parent.setdefault(root, root)
+        for key in keys[1:]:
+            other = self.find(key)
+            if other == root:
+                continue
+            # Deterministic root, independent of the order aliases were seen in
+            if other < root:
+                root, other = other, root
+            self.parent[other] = root
+            self.parent.setdefault(root, root)
+            proper = self.proper_names.pop(other, None)
+            if proper and root not in self.proper_names:
+                self.proper_names[root] = proper
+        return root
+
+    def add_author(self, name, email):
+        """Record that name and email were used together in a commit (joins nothing)"""
+        key = name_key(name)
+        email = email_key(email)
+        if key is None or email is None:
+            return
+        emails = self.name_emails.setdefault(key, [])
+        if email not in emails:
+            emails.append(email)
+            emails.sort()
+
+    def add_record(self, name, emails):
+        """
+        Record a per-repository author record: its name and every email it committed with.
+
+        The emails are joined, since the record's factors belong to all of them.
+        """
+        for email in emails:
+            self.add_author(name, email)
+        return self.union(*[email_key(email) for email in emails])
+
+    def add_mailmap(self, path):
+        """Join the emails of each .mailmap entry; the first name becomes the preferred name"""
+        entries = parse_mailmap(path)
+        for proper_name, names, emails in entries:
+            root = self.union(*[email_key(email) for email in emails])
+            if root and proper_name:
+                self.proper_names[root] = proper_name
+        return len(entries)
+
+    def joined_by_name(self):
+        """
+        A copy in which all emails seen with the same name are joined.
+
+        Opt-in (join_names): a common display name merges unrelated people.
+        The copy is meant for resolution only and is not saved.
+        """
+        index = AliasIndex()
+        index.parent = {key: self.find(key) for key in self.parent}
+        index.proper_names = dict(self.proper_names)
+        index.name_emails = self.name_emails
+        for emails in self.name_emails.values():
+            if len(emails) > 1:
+                index.union(*emails)
+        return index
+
+    def resolve(self, name, email=None):
+        """
+        Identity (root key) of an author: its email, else the only email its
+        name was seen with, else its name; authors with only placeholder
+        keys stay distinct by name.
+        """
+        key = email_key(email)
+        if key is None:
+            key = name_key(name)
+            if key is None:
+                return f"author:{name}"
+            emails = self.name_emails.get(key, ())
+            if len(emails) == 1:
+                key = emails[0]
+        return self.find(key)
+
+    def proper_name(self, identity):
+        return self.proper_names.get(identity)
+
+    @classmethod
+    def load(cls, path):
+        """The index saved at path (an empty index when missing or outdated)"""
+        index = cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if data.get('version') != INDEX_VERSION:
+            return index
+        index.parent = data.get('parent', {})
+        index.proper_names = data.get('proper_names', {})
+        index.name_emails = data.get('name_emails', {})
+        return index
+
+    def save(self, path):
+        # Store every key with its root, so the next load needs no path walks
+        parent = {key: self.find(key) for key in list(self.parent)}
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'parent': parent, 'proper_names': self.proper_names,
+                       'name_emails': self.name_emails},
+                      f, separators=(',', ':'))
+        os.replace(temp_path, path)
+        return path
@@ -551,10 +551,74 @@ def condition_counter(tokens, reader):
         yield token
 
 
+DEFAULT_PROCESSORS = [
+    preprocessing,
+    comment_counter,
+    line_counter,
+    token_counter,
+    condition_counter,
+]
+
+
+def fused_processing(tokens, reader):
+    '''
+    preprocessing, comment_counter, line_counter, token_counter and
+    condition_counter in a single loop, for when no extension is chained
+    between them: every token passes one generator frame instead of five,
+    with the same effects on the context in the same order.
+    '''
+    skip_spaces = not hasattr(reader, "preprocess")
+    if not skip_spaces:
+        tokens = reader.preprocess(tokens)
+    context = reader.context
+    fileinfo = context.fileinfo
+    get_comment_from_token = reader.get_comment_from_token
+    conditions = reader.conditions
+    context.current_line = 1
+    newline = 1
+    for token in tokens:
+        if token == "\n":
+            context.current_line += 1
+            newline = 1
+            continue
+        if skip_spaces and token.isspace():
+            continue
+        comment = get_comment_from_token(token)
+        if comment is not None:
+            extra_lines = len(comment.splitlines()) - 1
+            if extra_lines > 0:
+                context.current_line += extra_lines
+                newline = 1
+            if comment.strip().startswith("#lizard forgive global"):
+                context.forgive_global = True
+            elif comment.strip().startswith("#lizard forgive"):
+                context.forgive = True
+            if "GENERATED CODE" in comment:
+                return
+            continue
+        count = token.count('\n')
+        context.current_line += count
+        # FileInfoBuilder.add_nloc and add_condition, inlined
+        nloc = count + newline
+        function = context.current_function
+        fileinfo.nloc += nloc
+        function.nloc += nloc
+        function.end_line = context.current_line
+        context.newline = nloc > 0
+        newline = 0
+        fileinfo.token_count += 1
+        function.token_count += 1
+        if token in conditions:
+            function.cyclomatic_complexity += 1
+        yield token
+
+
 class FileAnalyzer(object):  # pylint: disable=R0903
 
     def __init__(self, extensions):
         self.processors = extensions
+        # without extensions the default processors run as one loop
+        self.fused = list(extensions) == DEFAULT_PROCESSORS
 
     def __call__(self, filename):
         try:
@@ -577,8 +641,11 @@ class FileAnalyzer(object):  # pylint: disable=R0903
         reader = (get_reader_for(filename) or CLikeReader)(context)
         tokens = reader.generate_tokens(code)
         try:
-            for processor in self.processors:
-                tokens = processor(tokens, reader)
+            if self.fused:
+                tokens = fused_processing(tokens, reader)
+            else:
+                for processor in self.processors:
+                    tokens = processor(tokens, reader)
             for _ in reader(tokens, reader):
                 pass
         except RecursionError as e:
@@ -904,40 +971,113 @@ def md5_hash_file(full_path_name):
         return None
 
 
-def get_all_source_files(paths, exclude_patterns, lans):
-    '''
-    Function counts md5 hash for the given file and checks if it isn't a
-    duplicate using set of hashes for previous files.
+def git_blob_hash_file(full_path_name):
+    ''' return the git blob id of a file (what `git hash-object` prints) '''
+    try:
+        with open(full_path_name, 'rb') as source_file:
+            content = source_file.read()
+    except IOError:
+        return None
+    header = ('blob %d\0' % len(content)).encode('ascii')
+    return hashlib.sha1(header + content).hexdigest()
+
+
+def _git_ls_files(path, *args):
+    import subprocess
+    try:
+        with open(os.devnull, 'w') as devnull:
+            output = subprocess.check_output(
+                ['git', '-C', path, 'ls-files', '-z'] + list(args),
+                stderr=devnull)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return [entry for entry in
+            output.decode('utf-8', 'surrogateescape').split('\0') if entry]
+
 
-    If a .gitignore file is found in any of the given paths, it will be used
-    to filter out files that match the gitignore patterns.
+def git_listed_files(path):
+    '''
+    List the files of a git work tree directory as (pathname, blob id) pairs
+    using `git ls-files`, so .gitignore rules are applied by git itself.
+    Tracked files carry the blob id of the index; untracked files, symlinks
+    and files modified in the work tree carry None. Returns None when git
+    lists no files there (path outside a git work tree, ignored or empty)
+    or git is not installed.
+    '''
+    indexed = _git_ls_files(path, '-s')
+    if indexed is None:
+        return None
+    changes = _git_ls_files(path, '-t', '-m', '-o', '--exclude-standard') or []
+    if not indexed and not changes:
+        return None  # e.g. a directory ignored by the enclosing work tree
+    modified = set(entry[2:] for entry in changes if entry.startswith('C '))
+    listed = []
+    seen = set()
+    for entry in indexed:
+        # "<mode> <blob id> <stage>\t<name>", one line per stage when unmerged
+        info, _, name = entry.partition('\t')
+        mode, blob_id = info.split(' ')[:2]
+        if name in seen:
+            continue
+        seen.add(name)
+        pathname = os.path.join(path, name.replace('/', os.sep))
+        if name in modified:
+            if not os.path.lexists(pathname):  # deleted in the work tree
+                continue
+            blob_id = None
+        elif not mode.startswith('100'):
+            blob_id = None  # symlink, or submodule directory
+        listed.append((pathname, blob_id))
+    for entry in changes:
+        if entry.startswith('? '):
+            # nested repositories are listed as directories ("name/")
+            name = entry[2:].rstrip('/')
+            listed.append((os.path.join(path, name.replace('/', os.sep)), None))
+    return listed
+
+
+def get_all_source_files(paths, exclude_patterns, lans, blob_ids=None):
+    '''
+    Function lists the source files in the given paths, skipping files with
+    the same content as a file listed before.
+
+    With a blob_ids dict, the git index blob id of every listed file that
+    has one (tracked and unmodified) is stored there by pathname as the
+    file is yielded, so callers need not run `git ls-files` again.
+
+    Directories inside a git work tree are listed by `git ls-files`: git
+    applies the .gitignore rules, and tracked files are compared by their
+    blob ids without being read (untracked and modified files are hashed
+    in git's blob format). Other directories are walked and every file is
+    md5-hashed; if a .gitignore file is found in such a path, it will be
+    used to filter out files that match the gitignore patterns.
     '''
     hash_set = set()
     gitignore_spec = None
     base_path = None
 
-    def _load_gitignore():
+    def _load_gitignore(path):
         nonlocal gitignore_spec, base_path
+        gitignore_spec = base_path = None
+        gitignore_path = os.path.join(path, '.gitignore')
+        if not os.path.exists(gitignore_path):
+            return
         try:
             import pathspec
-            for path in paths:
-                gitignore_path = os.path.join(path, '.gitignore')
-                if os.path.exists(gitignore_path):
-                    gitignore_file = auto_read(gitignore_path)
-                    # Read lines and strip whitespace and empty lines
-                    patterns = [line.strip() for line in gitignore_file.splitlines()]
-                    patterns = [p for p in patterns if p and not p.startswith('#')]
-                    gitignore_spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns)
-                    base_path = path
-                    break
         except ImportError:
-            pass
+            return
+        gitignore_file = auto_read(gitignore_path)
+        # Read lines and strip whitespace and empty lines
+        patterns = [line.strip() for line in gitignore_file.splitlines()]
+        patterns = [p for p in patterns if p and not p.startswith('#')]
+        gitignore_spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns)
+        base_path = path
 
     def _support(reader):
         return not lans or set(lans).intersection(
             reader.language_names)
 
-    def _validate_file(pathname):
+    def _validate_file(pathname, blob_id, hash_file):
         if gitignore_spec is not None and base_path is not None:
             rel_path = os.path.relpath(pathname, base_path)
             # Normalize path separators for consistent matching
@@ -949,25 +1089,41 @@ def get_all_source_files(paths, exclude_patterns, lans):
                 get_reader_for(pathname) and
                 _support(get_reader_for(pathname)) and
                 all(not fnmatch(pathname, p) for p in exclude_patterns) and
-                _not_duplicate(pathname)))
+                _not_duplicate(pathname, blob_id, hash_file)))
 
-    def _not_duplicate(full_path_name):
-        fhash = md5_hash_file(full_path_name)
+    def _not_duplicate(full_path_name, blob_id, hash_file):
+        fhash = blob_id or hash_file(full_path_name)
         if not fhash or fhash not in hash_set:
             hash_set.add(fhash)
             return True
 
     def all_listed_files(paths):
+        nonlocal gitignore_spec, base_path
         for path in paths:
             if os.path.isfile(path):
-                yield path
-            else:
-                for root, _, files in os.walk(path, topdown=False):
-                    for filename in files:
-                        yield os.path.join(root, filename)
-
-    _load_gitignore()
-    return filter(_validate_file, all_listed_files(paths))
+                yield path, None, md5_hash_file
+                continue
+            listed = git_listed_files(path) if os.path.isdir(path) else None
+            if listed is not None:
+                for pathname, blob_id in listed:
+                    if os.path.isdir(pathname):
+                        # submodule or nested repository
+                        for item in all_listed_files([pathname]):
+                            yield item
+                    else:
+                        yield pathname, blob_id, git_blob_hash_file
+                continue
+            _load_gitignore(path)
+            for root, _, files in os.walk(path, topdown=False):
+                for filename in files:
+                    yield os.path.join(root, filename), None, md5_hash_file
+            gitignore_spec = base_path = None
+
+    for pathname, blob_id, hash_file in all_listed_files(paths):
+        if _validate_file(pathname, blob_id, hash_file):
+            if blob_id and blob_ids is not None:
+                blob_ids[pathname] = blob_id
+            yield pathname
 
 
 def parse_args(argv):
@@ -1054,13 +1210,7 @@ def get_extensions(extension_names):
                 ext)
         return existing
 
-    return expand_extensions([
-            preprocessing,
-            comment_counter,
-            line_counter,
-            token_counter,
-            condition_counter,
-        ])
+    return expand_extensions(list(DEFAULT_PROCESSORS))
 
 
 analyze_file = FileAnalyzer(get_extensions([]))  # pylint: disable=C0103
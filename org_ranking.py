@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Organization-wide developer ranking across every repository of a results directory.
+
+Each repository below the results root (results/<repo>/) is ranked on its
+own with DeveloperRankingCalculator, but only up to the raw factor values:
+commits, churn, hotspot/ownership/complexity/coupling/fragmentation scores,
+communication and the commit dates recency is computed from. These
+per-repository factor vectors are kept in org_ranking_state.json together
+with a fingerprint of the repository's input files, so a later run only
+reads the repositories that were added or re-analyzed; the others are
+merged from the stored vectors.
+
+Authors are merged across repositories through the AliasIndex
+(identity_index.py), rebuilt on every update from the .mailmap files and
+the emails each stored author record committed with; names only join
+emails under join_names. The merged vectors are then normalized and
+weighted across the whole organization exactly like a single repository.
+"""
+
+import contextlib
+import heapq
+import io
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+
+from analysis_manifest import file_signature, fingerprint
+from calculate_developer_ranking import DeveloperRankingCalculator, recency_weight
+from identity_index import ALIASES_FILE, AliasIndex
+
+ORG_STATE_FILE = 'org_ranking_state.json'
+STATE_VERSION = 2
+
+# Raw factor values summed across repositories (recency is recomputed from commit dates)
+SUMMED_FIELDS = (
+    'commits', 'lines_added', 'lines_deleted', 'hotspot_score', 'ownership_score', 'complexity_score',
+    'communication_score', 'fragmentation_score', 'coupling_score', 'hotspot_commits'
+)
+
+# Files per developer and repository kept for the report (counts are kept in full)
+TOP_FILES = 10
+
+# Per-repository inputs of the ranking ({repo} is the repository name)
+RANKING_INPUTS = (
+    'commits.json', 'commits_columns.zip', 'complexity_files.csv', 'complexity.json', '{repo}_hotspots.csv',
+    '{repo}_code-analysis_entity_ownership.csv', '{repo}_code-analysis_main_dev.csv',
+    '{repo}_code-analysis_communication.csv', '{repo}_code-analysis_fragmentation.csv',
+    '{repo}_code-analysis_soc.csv',
+)
+
+
+def find_repository_results(results_root):
+    """Repository results directories below results_root (those with commits or CodeAnalysis results)"""
+    repos = []
+    for entry in sorted(Path(results_root).iterdir()):
+        if entry.is_dir() and ((entry / 'commits.json').exists() or (entry / 'commits_columns.zip').exists() or
+                               (entry / f'{entry.name}_code-analysis_entity_ownership.csv').exists()):
+            repos.append(entry)
+    return repos
+
+
+def repository_vectors(repo_dir):
+    """
+    Raw factor vectors of one repository's developers, in the form stored in the org state.
+
+    Returns {author name: record}; a record's emails are all emails the name committed with.
+    """
+    calculator = DeveloperRankingCalculator(repo_dir)
+    # The per-repository progress lines would drown the org-wide output
+    with contextlib.redirect_stdout(io.StringIO()):
+        calculator.load_data()
+
+    emails = defaultdict(set)
+    for author, email in calculator.author_aliases:
+        if email:
+            emails[author].add(email)
+
+    developers = {}
+    for author, data in calculator.developers.items():
+        record = {field: data[field] for field in SUMMED_FIELDS}
+        record['email'] = data['email']
+        record['emails'] = sorted(emails.get(author, ()))
+        record['last_commit_date'] = data['last_commit_date'].isoformat() if data['last_commit_date'] else None
+        record['recent_commits'] = [date.isoformat() for date in calculator.recent_commits.get(author, ())]
+        record['older_commits'] = calculator.older_commits.get(author, 0)
+        record['hotspot_files_count'] = len(data['hotspot_files'])
+        record['hotspot_files'] = list(islice(data['hotspot_files'], TOP_FILES))
+        record['files_owned_count'] = len(data['files_owned'])
+        record['files_owned'] = [
+            [f['file'], f['ownership']]
+            for f in heapq.nlargest(TOP_FILES, data['files_owned'], key=lambda x: x['ownership'])
+        ]
+        record['partners'] = [[p['name'], p['shared_files'], p['strength']]
+                              for p in data['collaboration_partners'].values()]
+        developers[author] = record
+    return developers
+
+
+class OrgRanking:
+    """Incrementally maintained developer ranking over all repositories of a results root"""
+
+    def __init__(self, results_root, repos_dir=None, mailmaps=(), weights=None, join_names=False):
+        self.results_root = Path(results_root)
+        self.repos_dir = Path(repos_dir) if repos_dir else None
+        self.mailmaps = [Path(path) for path in mailmaps]
+        self.weights = weights
+        self.join_names = join_names
+        self.state_file = self.results_root / ORG_STATE_FILE
+        self.aliases_file = self.results_root / ALIASES_FILE
+        self.aliases = AliasIndex.load(self.aliases_file)
+        self.repos = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if state.get('version') != STATE_VERSION:
+            return {}
+        return state.get('repositories', {})
+
+    def save_state(self):
+        temp_path = f"{self.state_file}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STATE_VERSION, 'repositories': self.repos}, f, separators=(',', ':'))
+        os.replace(temp_path, self.state_file)
+        self.aliases.save(self.aliases_file)
+
+    def _mailmap(self, repo_name):
+        if self.repos_dir is None:
+            return None
+        path = self.repos_dir / repo_name / '.mailmap'
+        return path if path.exists() else None
+
+    def input_fingerprint(self, repo_dir):
+        repo = repo_dir.name
+        mailmap = self._mailmap(repo)
+        return fingerprint(
+            [(name.format(repo=repo), file_signature(repo_dir / name.format(repo=repo))) for name in RANKING_INPUTS],
+            file_signature(mailmap) if mailmap else None
+        )
+
+    def update(self):
+        """
+        Bring the stored factor vectors up to date with the results root.
+
+        Only new or changed repositories are read; repositories whose results
+        are gone are dropped. Returns (updated, reused) repository counts.
+        """
+        repo_dirs = find_repository_results(self.results_root)
+        updated = reused = 0
+        for repo_dir in repo_dirs:
+            repo = repo_dir.name
+            input_fingerprint = self.input_fingerprint(repo_dir)
+            entry = self.repos.get(repo)
+            if entry and entry.get('fingerprint') == input_fingerprint:
+                reused += 1
+                continue
+
+            developers = repository_vectors(repo_dir)
+            self.repos[repo] = {
+                'fingerprint': input_fingerprint,
+                'computed_at': datetime.now().isoformat(),
+                'developers': developers
+            }
+            updated += 1
+            print(f"  [OK] {repo}: {len(developers)} developers")
+
+        current = {repo_dir.name for repo_dir in repo_dirs}
+        for repo in [repo for repo in self.repos if repo not in current]:
+            del self.repos[repo]
+            print(f"  Dropped {repo} (results no longer present)")
+
+        self.aliases = self.build_aliases()
+        self.save_state()
+        return updated, reused
+
+    def build_aliases(self):
+        """The alias index of the stored repositories and their (and the given) .mailmap files"""
+        aliases = AliasIndex()
+        mailmaps = list(self.mailmaps) + [self._mailmap(repo) for repo in sorted(self.repos)]
+        for path in mailmaps:
+            if path:
+                aliases.add_mailmap(path)
+        for repo in sorted(self.repos):
+            for author, record in sorted(self.repos[repo]['developers'].items()):
+                aliases.add_record(author, record['emails'])
+        return aliases
+
+    def merge(self):
+        """
+        Developer records of the whole organization, one per resolved identity,
+        in the form DeveloperRankingCalculator ranks and reports.
+        """
+        now = datetime.now()
+        aliases = self.aliases.joined_by_name() if self.join_names else self.aliases
+        identities = {}
+        names = defaultdict(lambda: defaultdict(int))  # identity -> name -> commits
+        repo_identity = {}  # (repo, author) -> identity
+
+        for repo, entry in self.repos.items():
+            for author, record in entry['developers'].items():
+                # Every email of the record resolves alike (add_record joined them)
+                identity = aliases.resolve(author, (record['emails'] or [None])[0])
+                repo_identity[(repo, author)] = identity
+                names[identity][author] += record['commits']
+                merged = identities.get(identity)
+                if merged is None:
+                    merged = identities[identity] = dict(
+                        {field: 0 for field in SUMMED_FIELDS},
+                        recency_score=0.0, email=None, last_commit_date=None, repositories=[],
+                        hotspot_files={}, hotspot_files_count=0, files_owned=[], files_owned_count=0,
+                        collaboration_partners={}
+                    )
+                for field in SUMMED_FIELDS:
+                    merged[field] += record[field]
+                # Recency relative to today, also for vectors computed on an earlier day
+                merged['recency_score'] += record['older_commits'] * recency_weight(float('inf')) + sum(
+                    recency_weight((now - datetime.fromisoformat(date)).days) for date in record['recent_commits']
+                )
+                if record['last_commit_date']:
+                    last_commit = datetime.fromisoformat(record['last_commit_date'])
+                    if merged['last_commit_date'] is None or last_commit > merged['last_commit_date']:
+                        merged['last_commit_date'] = last_commit
+                if not merged['email'] and record['email']:
+                    merged['email'] = record['email']
+                merged['repositories'].append(repo)
+                merged['hotspot_files_count'] += record['hotspot_files_count']
+                merged['hotspot_files'].update((f"{repo}/{file}", None) for file in record['hotspot_files'])
+                merged['files_owned_count'] += record['files_owned_count']
+                merged['files_owned'].extend({'file': f"{repo}/{file}", 'ownership': ownership}
+                                             for file, ownership in record['files_owned'])
+
+        display_names = self._display_names(names, aliases)
+
+        # Partners resolve to identities too; an identity's shared files add up, the strongest link is kept
+        for repo, entry in self.repos.items():
+            developers = entry['developers']
+            for author, record in developers.items():
+                identity = repo_identity[(repo, author)]
+                partners = identities[identity]['collaboration_partners']
+                for peer, shared, strength in record['partners']:
+                    peer_identity = repo_identity.get((repo, peer)) or aliases.resolve(peer)
+                    if peer_identity == identity:
+                        continue
+                    partner = partners.get(peer_identity)
+                    if partner is None:
+                        partners[peer_identity] = {
+                            'name': display_names.get(peer_identity, peer),
+                            'shared_files': shared,
+                            'strength': strength
+                        }
+                    else:
+                        partner['shared_files'] += shared
+                        partner['strength'] = max(partner['strength'], strength)
+
+        return {display_names[identity]: merged for identity, merged in identities.items()}
+
+    def _display_names(self, names, aliases):
+        """identity -> unique display name: the .mailmap name, else the name with the most commits"""
+        display_names = {}
+        taken = set()
+        for identity, counts in names.items():
+            name = aliases.proper_name(identity) or max(counts, key=counts.get)
+            if name in taken:
+                name = f"{name} [{identity.split(':', 1)[1]}]"
+            taken.add(name)
+            display_names[identity] = name
+        return display_names
+
+    def calculator(self):
+        """A DeveloperRankingCalculator holding the merged organization-wide records"""
+        calculator = DeveloperRankingCalculator(self.results_root, self.weights)
+        calculator.repo_name = f"{self.results_root.name} ({len(self.repos)} repositories)"
+        calculator.developers.update(self.merge())
+        return calculator
+
+    def run_analysis(self):
+        """Update the per-repository vectors, then rank the organization"""
+        print(f"\n{'='*100}")
+        print(f"{'ORGANIZATION-WIDE DEVELOPER RANKING':^100}")
+        print(f"Results: {self.results_root}")
+        print(f"{'='*100}\n")
+
+        updated, reused = self.update()
+        print(f"[OK] {updated} repositories analyzed, {reused} unchanged (stored factor vectors reused)")
+
+        calculator = self.calculator()
+        calculator.normalize_scores()
+        calculator.calculate_weighted_scores()
+        print(f"[OK] Analysis complete! Evaluated {len(calculator.developers)} developers "
+              f"across {len(self.repos)} repositories\n")
+        return calculator
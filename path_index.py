@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Match file paths that different tools write differently.
+
+code-maat reports repository-relative paths (src/app/main.py) while lizard
+reports them the way it was invoked (./repositories/myrepo/src/app/main.py,
+absolute paths, backslashes on Windows). PathIndex stores the indexed paths
+in a trie of reversed path components, so a path resolves in O(path depth)
+whichever side carries the extra leading directories. A suffix shared by
+several indexed paths (src/util.py under two roots) is reported as
+ambiguous instead of resolving to whichever path happens to come first.
+
+Matching is by whole components (a.py does not match data.py) and, like the
+previous hotspot matching, case-insensitive by default.
+"""
+
+import sys
+from collections import namedtuple
+
+EXACT = 'exact'
+SUFFIX = 'suffix'
+AMBIGUOUS = 'ambiguous'
+MISSING = 'missing'
+
+# status: one of the constants above; key/value: the indexed path and its
+# value (None unless EXACT or SUFFIX); candidates: some of the indexed paths
+# an AMBIGUOUS path could be
+PathMatch = namedtuple('PathMatch', ['status', 'key', 'value', 'candidates'])
+
+_MISSING_MATCH = PathMatch(MISSING, None, None, ())
+
+
+def path_components(path, case_sensitive=False):
+    """Components of a path with '/' or '\\' separators, without empty and '.' parts"""
+    path = path.replace('\\', '/')
+    if not case_sensitive:
+        path = path.lower()
+    return [part for part in path.split('/') if part and part != '.']
+
+
+class _Node:
+    __slots__ = ('children', 'key', 'count', 'tail')
+
+    def __init__(self):
+        self.children = None
+        self.key = None      # indexed path ending exactly at this node
+        self.count = 0       # indexed paths ending at or below this node
+        # (remaining components, key) of the only path below this node; the
+        # chain of nodes is only created once a second path branches off it
+        self.tail = None
+
+
+class PathIndex:
+    """
+    Index of paths (with optional values) resolvable by component suffix.
+
+    lookup() returns a PathMatch:
+    - EXACT: same components as an indexed path
+    - SUFFIX: exactly one indexed path ends with the looked-up path, or
+      (failing that) the longest indexed path the looked-up path ends with
+    - AMBIGUOUS: several indexed paths end with the looked-up path
+    - MISSING: neither ends with the other for any indexed path
+    """
+
+    def __init__(self, items=(), case_sensitive=False):
+        self.case_sensitive = case_sensitive
+        self._root = _Node()
+        self._values = {}
+        if isinstance(items, dict):
+            items = items.items()
+        for item in items:
+            if isinstance(item, str):
+                self.add(item)
+            else:
+                self.add(*item)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, path):
+        return path in self._values
+
+    def _reversed_parts(self, path):
+        return tuple(sys.intern(part) for part in reversed(path_components(path, self.case_sensitive)))
+
+    def add(self, path, value=None):
+        """Index path; a path normalizing to one already indexed keeps the first"""
+        parts = self._reversed_parts(path)
+        if not parts or self._lookup_parts(parts, 0).status == EXACT:
+            return False
+
+        node = self._root
+        depth = 0
+        while True:
+            node.count += 1
+            if depth == len(parts):
+                node.key = path
+                break
+            if node.children is None and node.tail is None:
+                node.tail = (parts[depth:], path)
+                break
+            if node.tail is not None:
+                # A second path goes below this node: expand the tail by one level
+                rest, tail_key = node.tail
+                node.tail = None
+                child = _Node()
+                child.count = 1
+                if len(rest) == 1:
+                    child.key = tail_key
+                else:
+                    child.tail = (rest[1:], tail_key)
+                node.children = {rest[0]: child}
+            child = node.children.get(parts[depth])
+            if child is None:
+                child = node.children[parts[depth]] = _Node()
+            node = child
+            depth += 1
+        self._values[path] = value
+        return True
+
+    def lookup(self, path, max_candidates=5):
+        """Resolve path to an indexed path (see class docstring)"""
+        parts = self._reversed_parts(path)
+        if not parts:
+            return _MISSING_MATCH
+        return self._lookup_parts(parts, max_candidates)
+
+    def _lookup_parts(self, parts, max_candidates):
+        node = self._root
+        longest_suffix = None
+        for depth, part in enumerate(parts):
+            if node.tail is not None:
+                rest, tail_key = node.tail
+                remaining = parts[depth:]
+                if len(remaining) <= len(rest):
+                    if rest[:len(remaining)] == remaining:
+                        # The only path below ends with the looked-up path
+                        status = EXACT if len(remaining) == len(rest) else SUFFIX
+                        return PathMatch(status, tail_key, self._values[tail_key], ())
+                elif remaining[:len(rest)] == rest:
+                    longest_suffix = tail_key
+                break
+            child = node.children.get(part) if node.children else None
+            if child is None:
+                break
+            node = child
+            if node.key is not None and depth < len(parts) - 1:
+                # An indexed path that the looked-up path ends with
+                longest_suffix = node.key
+        else:
+            if node.key is not None:
+                return PathMatch(EXACT, node.key, self._values[node.key], ())
+            if node.count == 1:
+                key = self._keys_below(node, 1)[0]
+                return PathMatch(SUFFIX, key, self._values[key], ())
+            return PathMatch(AMBIGUOUS, None, None, tuple(self._keys_below(node, max_candidates)))
+
+        if longest_suffix is not None:
+            return PathMatch(SUFFIX, longest_suffix, self._values[longest_suffix], ())
+        return _MISSING_MATCH
+
+    def get(self, path, default=None):
+        """Value of the path an unambiguous lookup resolves to, else default"""
+        match = self.lookup(path, max_candidates=0)
+        return match.value if match.status in (EXACT, SUFFIX) else default
+
+    def _keys_below(self, node, limit):
+        keys = []
+        stack = [node]
+        while stack and len(keys) < limit:
+            node = stack.pop()
+            if node.key is not None:
+                keys.append(node.key)
+            if node.tail is not None:
+                keys.append(node.tail[1])
+            if node.children:
+                stack.extend(node.children.values())
+        return sorted(keys)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Dependency-graph scheduler for the per-repository analysis stages.
+
+Each analysis (commit collection, TechStack, Complexity, Trivy, CodeAnalysis,
+hotspots, ranking, ...) is a Stage with a list of stages it depends on.
+Independent stages run concurrently in a thread pool; a stage starts as soon
+as all of its dependencies have succeeded and the shared ResourceBudget has
+room for it. Per-stage wall times are recorded so the critical path of each
+repository can be reported.
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from io import StringIO
+
+
+class ResourceBudget:
+    """
+    Global CPU/memory budget shared by every stage of every repository.
+
+    Stages reserve a number of CPU slots and an estimated amount of memory
+    while they run. Requests larger than the whole budget are clamped so a
+    single heavy stage can still run on its own.
+    """
+
+    def __init__(self, cpu_slots, memory_mb=None):
+        self.cpu_slots = max(1, int(cpu_slots))
+        self.memory_mb = memory_mb
+        self._cpu_in_use = 0
+        self._memory_in_use = 0
+        self._condition = threading.Condition()
+
+    def _clamp(self, cpu, memory_mb):
+        cpu = min(max(0, cpu), self.cpu_slots)
+        memory_mb = max(0, memory_mb or 0)
+        if self.memory_mb is not None:
+            memory_mb = min(memory_mb, self.memory_mb)
+        return cpu, memory_mb
+
+    def _fits(self, cpu, memory_mb):
+        if self._cpu_in_use + cpu > self.cpu_slots:
+            return False
+        if self.memory_mb is not None and self._memory_in_use + memory_mb > self.memory_mb:
+            return False
+        return True
+
+    @contextmanager
+    def reserve(self, cpu=1, memory_mb=0):
+        """Block until the requested resources are free, hold them for the with-block"""
+        cpu, memory_mb = self._clamp(cpu, memory_mb)
+        with self._condition:
+            while not self._fits(cpu, memory_mb):
+                self._condition.wait()
+            self._cpu_in_use += cpu
+            self._memory_in_use += memory_mb
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._cpu_in_use -= cpu
+                self._memory_in_use -= memory_mb
+                self._condition.notify_all()
+
+
+class Reused:
+    """
+    Wrapper a stage returns when it reused a previous artifact instead of
+    recomputing it. The scheduler unwraps the value and records the stage
+    as 'reused'; dependents treat it like a successful run.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+
+SUCCESS_STATUSES = ('ok', 'reused')
+
+
+class Stage:
+    """
+    One node of the analysis graph.
+
+    func receives a dict mapping each dependency name to that stage's result
+    and returns the stage result. A result of None or False marks the stage
+    as failed, which skips every stage that depends on it.
+    """
+
+    def __init__(self, name, func, depends_on=(), cpu=1, memory_mb=0):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.cpu = cpu
+        self.memory_mb = memory_mb
+
+
+class StageScheduler:
+    """
+    Run a set of Stages respecting their dependencies and a ResourceBudget.
+
+    Stage output printed from worker threads is captured per stage (through
+    the capture callable, e.g. RepoLogRouter.capture) and written to the
+    caller's stdout when the stage finishes, so concurrent stages never
+    interleave their lines.
+    """
+
+    def __init__(self, stages, budget=None, capture=None, max_workers=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.order = [stage.name for stage in stages]
+        self.budget = budget
+        self.capture = capture
+        self.max_workers = max_workers or max(1, len(self.stages))
+        self.results = {}
+        self.timings = {}
+        self.total_seconds = None
+
+        for stage in stages:
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dependency}'")
+
+    def _execute(self, stage, inputs, run_start):
+        queued_at = time.time()
+        buffer = StringIO()
+        capture = self.capture(buffer) if self.capture else _no_capture()
+        with capture:
+            reservation = self.budget.reserve(stage.cpu, stage.memory_mb) if self.budget else _no_capture()
+            with reservation:
+                started_at = time.time()
+                try:
+                    result = stage.func(inputs)
+                    error = None
+                except Exception as e:
+                    result = None
+                    error = str(e)
+                    print(f"  Error in {stage.name} stage: {e}")
+                finished_at = time.time()
+
+        status = 'ok' if result not in (None, False) else 'failed'
+        if isinstance(result, Reused):
+            result, status = result.value, 'reused'
+
+        timing = {
+            'status': status,
+            'queued_seconds': round(started_at - queued_at, 3),
+            'start_offset_seconds': round(started_at - run_start, 3),
+            'end_offset_seconds': round(finished_at - run_start, 3),
+            'wall_seconds': round(finished_at - started_at, 3)
+        }
+        if error:
+            timing['error'] = error
+        return result, timing, buffer.getvalue()
+
+    def run(self):
+        """
+        Execute all stages and return {stage_name: result}.
+
+        Stages whose dependencies failed are recorded as 'skipped' and get
+        no entry in the results.
+        """
+        run_start = time.time()
+        pending = list(self.order)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # Submit every stage whose dependencies are all resolved
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name in list(pending):
+                        stage = self.stages[name]
+                        if any(dep in pending or dep in running.values() for dep in stage.depends_on):
+                            continue
+                        pending.remove(name)
+                        progressed = True
+
+                        if any(self.timings[dep]['status'] not in SUCCESS_STATUSES for dep in stage.depends_on):
+                            self.timings[name] = {'status': 'skipped', 'wall_seconds': 0.0}
+                            continue
+
+                        inputs = {dep: self.results[dep] for dep in stage.depends_on}
+                        future = executor.submit(self._execute, stage, inputs, run_start)
+                        running[future] = name
+
+                if not running:
+                    if pending:
+                        raise ValueError(f"Dependency cycle between stages: {', '.join(pending)}")
+                    continue
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    result, timing, output = future.result()
+                    if output:
+                        sys.stdout.write(output)
+                    self.timings[name] = timing
+                    if timing['status'] in SUCCESS_STATUSES:
+                        self.results[name] = result
+
+        self.total_seconds = round(time.time() - run_start, 3)
+        return self.results
+
+    def critical_path(self):
+        """
+        Return (stage_names, seconds) for the longest dependency chain,
+        weighting each stage by its measured wall time.
+        """
+        longest = {}
+
+        def path_to(name):
+            if name not in longest:
+                own = self.timings.get(name, {}).get('wall_seconds', 0.0)
+                best_chain, best_seconds = [], 0.0
+                for dependency in self.stages[name].depends_on:
+                    chain, seconds = path_to(dependency)
+                    if seconds > best_seconds:
+                        best_chain, best_seconds = chain, seconds
+                longest[name] = (best_chain + [name], best_seconds + own)
+            return longest[name]
+
+        chains = [path_to(name) for name in self.order]
+        if not chains:
+            return [], 0.0
+        chain, seconds = max(chains, key=lambda c: c[1])
+        return chain, round(seconds, 3)
+
+    def timing_report(self):
+        """Per-stage timings plus critical path, ready to be saved as JSON"""
+        chain, seconds = self.critical_path()
+        return {
+            'total_wall_seconds': self.total_seconds,
+            'stages': {
+                name: dict(self.timings.get(name, {'status': 'not_run'}),
+                           depends_on=list(self.stages[name].depends_on))
+                for name in self.order
+            },
+            'critical_path': chain,
+            'critical_path_seconds': seconds
+        }
+
+
+@contextmanager
+def _no_capture():
+    yield
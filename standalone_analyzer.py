@@ -13,6 +13,7 @@ Usage:
 import argparse
 import json
 import logging
+import multiprocessing
 import os
 import shutil
 import subprocess
@@ -22,13 +23,17 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 import re
-import csv
-from io import StringIO
+
+import complexity_analysis
+from git_history import CommitTable, GitHistoryError, update_history
 
 # Version information
 VERSION = "1.0.0"
 BUILD_DATE = "2025-10-29"
 
+# Processes analyzing source files in the code quality analysis
+DEFAULT_LIZARD_WORKERS = min(4, os.cpu_count() or 1)
+
 # Configure logging
 def setup_logging(log_file: Optional[Path] = None):
     """Configure logging to console and optionally to file."""
@@ -80,99 +85,31 @@ class GitLogExtractor:
         # Create output directory
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
-    def extract_repository_history(self) -> Optional[Path]:
-        """Extract git log for repository history analysis."""
+    def extract_commit_table(self) -> Optional[CommitTable]:
+        """Walk the git history once; every history analysis is derived from this table."""
         try:
-            self.logger.info(f"📊 Extracting repository history log...")
-            
-            output_file = self.output_dir / "repository_history.log"
-            
-            cmd = [
-                "git", "-C", str(self.repo_path),
-                "log", "--stat", "--numstat",
-                "--pretty=format:===COMMIT===%n%h|%an|%ae|%ad|%tz",
-                "--date=format:%Y-%m-%d %H:%M:%S %z"
-            ]
+            self.logger.info(f"📊 Extracting git history...")
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                result = subprocess.run(
-                    cmd, 
-                    stdout=f, 
-                    stderr=subprocess.PIPE, 
-                    text=True, 
-                    timeout=600
-                )
-            
-            if result.returncode != 0:
-                self.logger.error(f"Git command failed: {result.stderr}")
-                return None
+            # Only commits added since the previous extraction are read from git
+            output_file = self.output_dir / "commit_table.jsonl"
+            history, stats = update_history(self.repo_path, output_file)
             
-            self.logger.info(f"✅ Repository history log extracted: {output_file}")
-            return output_file
+            if stats['mode'] == 'incremental':
+                self.logger.info(f"   {stats['new']} new commits since the previous extraction")
+            self.logger.info(f"✅ Git history extracted ({len(history)} commits): {output_file}")
+            return history
             
-        except Exception as e:
-            self.logger.error(f"❌ Failed to extract repository history: {e}")
+        except (GitHistoryError, OSError) as e:
+            self.logger.error(f"❌ Failed to extract git history: {e}")
             return None
     
-    def extract_commit_analysis(self) -> Optional[Path]:
-        """Extract git log with commit messages for classification analysis."""
-        try:
-            self.logger.info(f"📝 Extracting commit messages...")
-            
-            output_file = self.output_dir / "commit_analysis.log"
-            
-            cmd = [
-                "git", "-C", str(self.repo_path),
-                "log", "--stat", "--numstat",
-                "--pretty=format:===COMMIT_START===%n%h|%an|%ae|%ad%n===MESSAGE_START===%n%B%n===MESSAGE_END===",
-                "--date=format:%Y-%m-%d %H:%M:%S %z"
-            ]
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                result = subprocess.run(
-                    cmd, 
-                    stdout=f, 
-                    stderr=subprocess.PIPE, 
-                    text=True, 
-                    timeout=600
-                )
-            
-            if result.returncode != 0:
-                self.logger.error(f"Git command failed: {result.stderr}")
-                return None
-            
-            self.logger.info(f"✅ Commit analysis log extracted: {output_file}")
-            return output_file
-            
-        except Exception as e:
-            self.logger.error(f"❌ Failed to extract commit analysis: {e}")
-            return None
-    
-    def extract_code_maat(self) -> Optional[Path]:
-        """Extract git log for CodeMaat evolution analysis."""
+    def extract_code_maat(self, history: CommitTable) -> Optional[Path]:
+        """Write the git log for CodeMaat evolution analysis, derived from the commit table."""
         try:
             self.logger.info(f"📊 Extracting evolution analysis log...")
             
             output_file = self.output_dir / "ext_cm.log"
-            
-            cmd = [
-                "git", "-C", str(self.repo_path),
-                "log", "--all", "--numstat", "--date=short",
-                "--pretty=format:--%h--%ad--%aN", "--no-renames"
-            ]
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                result = subprocess.run(
-                    cmd, 
-                    stdout=f, 
-                    stderr=subprocess.PIPE, 
-                    text=True, 
-                    timeout=600
-                )
-            
-            if result.returncode != 0:
-                self.logger.error(f"Git command failed: {result.stderr}")
-                return None
+            history.write_codemaat_log(output_file)
             
             self.logger.info(f"✅ Evolution analysis log extracted: {output_file}")
             return output_file
@@ -183,10 +120,10 @@ class GitLogExtractor:
 
 
 class RepositoryHistoryAnalyzer:
-    """Analyze git repository history from extracted logs."""
+    """Analyze git repository history from the extracted commit table."""
     
-    def __init__(self, log_file: Path, repo_name: str):
-        self.log_file = log_file
+    def __init__(self, history: CommitTable, repo_name: str):
+        self.history = history
         self.repo_name = repo_name
         self.detailed_commits = []
         self.logger = logging.getLogger("standalone-analyzer")
@@ -196,8 +133,8 @@ class RepositoryHistoryAnalyzer:
         try:
             self.logger.info(f"🔍 Analyzing repository history...")
             
-            # Parse git log
-            self.detailed_commits = self._parse_git_log()
+            # Build per-commit records
+            self.detailed_commits = self._build_detailed_commits()
             
             if not self.detailed_commits:
                 return {"error": "No commits found", "success": False}
@@ -228,79 +165,35 @@ class RepositoryHistoryAnalyzer:
                 "repository_name": self.repo_name
             }
     
-    def _parse_git_log(self) -> List[Dict[str, Any]]:
-        """Parse extracted git log file."""
-        try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                git_output = f.read()
+    def _build_detailed_commits(self) -> List[Dict[str, Any]]:
+        """Build per-commit records from the commit table."""
+        commits = []
+        for commit in self.history:
+            # Strict ISO date: local time of the author plus offset, e.g. 2025-01-31T14:05:00+05:30
+            date = commit["date"]
+            commit_data = {
+                "Commit": commit["abbrev"],
+                "Author": commit["author_name"],
+                "Author_Email": commit["author_email"],
+                "DateTime": date[:19].replace("T", " "),
+                "Timezone": "+0000" if date.endswith("Z") else date[19:].replace(":", ""),
+                "Insertions": 0,
+                "Deletions": 0
+            }
             
-            commits = []
-            commit_data = {}
             current_files = {}
-            
-            lines = git_output.split('\n')
-            i = 0
-            
-            while i < len(lines):
-                line = lines[i].strip()
-                
-                if line.startswith("===COMMIT==="):
-                    i += 1
+            for insertions, deletions, filename in commit["files"]:
+                # Binary files have no line counts
+                if insertions is None or deletions is None:
                     continue
-                elif re.match(r"^[0-9a-f]+\|", line):
-                    # Save previous commit
-                    if commit_data:
-                        self._finalize_commit_data(commit_data, current_files)
-                        commits.append(commit_data)
-                    
-                    # Parse new commit
-                    parts = line.split("|")
-                    if len(parts) >= 4:
-                        datetime_tz = parts[3] if len(parts) > 3 else ""
-                        datetime_parts = datetime_tz.rsplit(" ", 1)
-                        if len(datetime_parts) == 2:
-                            datetime_part = datetime_parts[0]
-                            timezone_part = datetime_parts[1]
-                        else:
-                            datetime_part = datetime_tz
-                            timezone_part = ""
-                        
-                        commit_data = {
-                            "Commit": parts[0],
-                            "Author": parts[1],
-                            "Author_Email": parts[2],
-                            "DateTime": datetime_part,
-                            "Timezone": timezone_part,
-                            "Insertions": 0,
-                            "Deletions": 0
-                        }
-                        current_files = {}
-                elif "\t" in line and re.match(r"^\d+\s+\d+\s+.+$", line):
-                    # Parse file changes
-                    parts = line.split('\t')
-                    if len(parts) >= 3:
-                        try:
-                            insertions = int(parts[0]) if parts[0] != '-' else 0
-                            deletions = int(parts[1]) if parts[1] != '-' else 0
-                            filename = parts[2]
-                            current_files[filename] = insertions + deletions
-                            commit_data["Insertions"] += insertions
-                            commit_data["Deletions"] += deletions
-                        except ValueError:
-                            continue
-                
-                i += 1
-            
-            # Save last commit
-            if commit_data:
-                self._finalize_commit_data(commit_data, current_files)
-                commits.append(commit_data)
-            
-            return commits
+                current_files[filename] = insertions + deletions
+                commit_data["Insertions"] += insertions
+                commit_data["Deletions"] += deletions
             
-        except Exception as e:
-            self.logger.error(f"Failed to parse git log: {e}")
-            return []
+            self._finalize_commit_data(commit_data, current_files)
+            commits.append(commit_data)
+        
+        return commits
     
     def _finalize_commit_data(self, commit_data: Dict[str, Any], current_files: Dict[str, int]):
         """Finalize commit data with file information."""
@@ -453,8 +346,8 @@ class RepositoryHistoryAnalyzer:
 class CommitClassificationAnalyzer:
     """Classify commits based on patterns and messages."""
     
-    def __init__(self, log_file: Path, repo_name: str):
-        self.log_file = log_file
+    def __init__(self, history: CommitTable, repo_name: str):
+        self.history = history
         self.repo_name = repo_name
         self.logger = logging.getLogger("standalone-analyzer")
     
@@ -493,36 +386,15 @@ class CommitClassificationAnalyzer:
             }
     
     def _parse_commit_messages(self) -> List[Dict[str, Any]]:
-        """Parse commit messages from log file."""
-        try:
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            commits = []
-            parts = content.split('===COMMIT_START===')
-            
-            for part in parts[1:]:  # Skip first empty part
-                if '===MESSAGE_START===' in part and '===MESSAGE_END===' in part:
-                    lines = part.split('\n')
-                    header = lines[0] if lines else ""
-                    
-                    message_start = part.find('===MESSAGE_START===') + len('===MESSAGE_START===')
-                    message_end = part.find('===MESSAGE_END===')
-                    message = part[message_start:message_end].strip()
-                    
-                    if '|' in header:
-                        parts_header = header.split('|')
-                        commits.append({
-                            "hash": parts_header[0],
-                            "author": parts_header[1] if len(parts_header) > 1 else "",
-                            "message": message
-                        })
-            
-            return commits
-            
-        except Exception as e:
-            self.logger.error(f"Failed to parse commit messages: {e}")
-            return []
+        """Collect commit messages from the commit table."""
+        return [
+            {
+                "hash": commit["abbrev"],
+                "author": commit["author_name"],
+                "message": commit["body"]
+            }
+            for commit in self.history
+        ]
     
     def _classify_commits(self, commits: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Classify commits based on message patterns."""
@@ -701,56 +573,49 @@ class TechStackAnalyzer:
 
 
 class CodeQualityAnalyzer:
-    """Analyze code quality using Lizard tool."""
+    """Analyze code quality using the Lizard API in-process."""
     
-    def __init__(self, repo_path: Path):
+    def __init__(self, repo_path: Path, workers: int = DEFAULT_LIZARD_WORKERS):
         self.repo_path = repo_path
+        self.workers = max(1, workers)
         self.logger = logging.getLogger("standalone-analyzer")
     
     def analyze(self) -> Dict[str, Any]:
         """Run Lizard analysis on repository."""
         try:
-            self.logger.info(f"🦎 Running code quality analysis...")
+            self.logger.info(f"🦎 Running code quality analysis ({self.workers} workers)...")
             
             # Check if Lizard is available
-            if not shutil.which("lizard"):
+            if complexity_analysis.lizard is None:
                 return {
                     "error": "Lizard tool not found. Please install: pip install lizard",
                     "success": False
                 }
             
-            # Run Lizard
-            cmd = ["lizard", "--csv", str(self.repo_path)]
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300
+            # Aggregated while files are analyzed; only the 20 most complex functions are kept
+            aggregator = complexity_analysis.analyze_paths(
+                [self.repo_path], workers=self.workers, exclude_patterns=[], top_n=20
             )
             
-            if result.returncode != 0:
-                return {
-                    "error": f"Lizard failed: {result.stderr}",
-                    "success": False
-                }
-            
-            # Parse CSV output
-            functions = self._parse_lizard_csv(result.stdout)
-            summary = self._calculate_summary(functions)
-            
             self.logger.info(f"✅ Code quality analysis completed")
             return {
                 "repository_name": self.repo_path.name,
                 "tool": "code-quality-analyzer",
                 "analysis_timestamp": datetime.now().isoformat(),
                 "success": True,
-                "summary": summary,
-                "high_complexity_functions": sorted(
-                    [f for f in functions if f["cyclomatic_complexity"] > 10],
-                    key=lambda x: x["cyclomatic_complexity"],
-                    reverse=True
-                )[:20]
+                "summary": self._summary(aggregator),
+                "high_complexity_functions": [
+                    {
+                        "nloc": f["nloc"],
+                        "cyclomatic_complexity": f["cyclomatic_complexity"],
+                        "token_count": f["token_count"],
+                        "parameter_count": f["parameter_count"],
+                        "file": f["file"],
+                        "function_name": f["name"]
+                    }
+                    for f in aggregator.top_functions()
+                    if f["cyclomatic_complexity"] > 10
+                ]
             }
             
         except Exception as e:
@@ -760,48 +625,21 @@ class CodeQualityAnalyzer:
                 "success": False
             }
     
-    def _parse_lizard_csv(self, csv_output: str) -> List[Dict[str, Any]]:
-        """Parse Lizard CSV output."""
-        functions = []
-        csv_reader = csv.reader(StringIO(csv_output))
-        
-        for row in csv_reader:
-            if len(row) >= 10:
-                try:
-                    functions.append({
-                        "nloc": int(row[0]),
-                        "cyclomatic_complexity": int(row[1]),
-                        "token_count": int(row[2]),
-                        "parameter_count": int(row[3]),
-                        "file": row[6],
-                        "function_name": row[7]
-                    })
-                except (ValueError, IndexError):
-                    continue
-        
-        return functions
-    
-    def _calculate_summary(self, functions: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Calculate summary statistics."""
-        if not functions:
+    def _summary(self, aggregator) -> Dict[str, Any]:
+        """Summary statistics."""
+        summary = aggregator.summary()
+        if not aggregator.total_functions:
             return {
                 "total_functions": 0,
                 "average_complexity": 0,
                 "max_complexity": 0
             }
         
-        ccns = [f["cyclomatic_complexity"] for f in functions]
-        
         return {
-            "total_functions": len(functions),
-            "average_complexity": round(sum(ccns) / len(ccns), 2),
-            "max_complexity": max(ccns),
-            "complexity_distribution": {
-                "low": len([f for f in functions if f["cyclomatic_complexity"] <= 5]),
-                "medium": len([f for f in functions if 5 < f["cyclomatic_complexity"] <= 10]),
-                "high": len([f for f in functions if 10 < f["cyclomatic_complexity"] <= 20]),
-                "very_high": len([f for f in functions if f["cyclomatic_complexity"] > 20])
-            }
+            "total_functions": summary["total_functions"],
+            "average_complexity": summary["average_complexity"],
+            "max_complexity": summary["max_complexity"],
+            "complexity_distribution": summary["complexity_distribution"]
         }
 
 
@@ -941,10 +779,12 @@ class VulnerabilityAnalyzer:
 class StandaloneAnalyzer:
     """Main standalone analyzer orchestrator."""
     
-    def __init__(self, repo_path: Path, output_dir: Path, tools: Optional[List[str]] = None):
+    def __init__(self, repo_path: Path, output_dir: Path, tools: Optional[List[str]] = None,
+                 lizard_workers: int = DEFAULT_LIZARD_WORKERS):
         self.repo_path = repo_path
         self.output_dir = output_dir
         self.tools = tools or ["history", "commits", "techstack", "quality", "vulnerabilities"]
+        self.lizard_workers = lizard_workers
         self.logger = setup_logging(output_dir / "analyzer.log")
         
         # Banner
@@ -992,27 +832,24 @@ class StandaloneAnalyzer:
                 progress.start_step("Extracting git logs")
                 extractor = GitLogExtractor(self.repo_path, extractions_dir)
                 
-                if "history" in self.tools:
-                    history_log = extractor.extract_repository_history()
-                    if history_log:
-                        progress.complete_step("Git log extraction", True)
-                    else:
-                        progress.complete_step("Git log extraction", False)
-                        return False
-                
-                if "commits" in self.tools:
-                    commits_log = extractor.extract_commit_analysis()
+                # One history walk feeds both the history and the classification analyses
+                history = extractor.extract_commit_table()
+                if history is None:
+                    progress.complete_step("Git log extraction", False)
+                    return False
+                progress.complete_step("Git log extraction", True)
+                extractor.extract_code_maat(history)
             
             # Run analyses
             if "history" in self.tools:
                 progress.start_step("Repository history analysis")
-                analyzer = RepositoryHistoryAnalyzer(history_log, self.repo_path.name)
+                analyzer = RepositoryHistoryAnalyzer(history, self.repo_path.name)
                 results["repository_history"] = analyzer.analyze()
                 progress.complete_step("Repository history analysis", results["repository_history"].get("success", False))
             
             if "commits" in self.tools:
                 progress.start_step("Commit classification analysis")
-                analyzer = CommitClassificationAnalyzer(commits_log, self.repo_path.name)
+                analyzer = CommitClassificationAnalyzer(history, self.repo_path.name)
                 results["commit_classification"] = analyzer.analyze()
                 progress.complete_step("Commit classification analysis", results["commit_classification"].get("success", False))
             
@@ -1024,7 +861,7 @@ class StandaloneAnalyzer:
             
             if "quality" in self.tools:
                 progress.start_step("Code quality analysis")
-                analyzer = CodeQualityAnalyzer(self.repo_path)
+                analyzer = CodeQualityAnalyzer(self.repo_path, self.lizard_workers)
                 results["code_quality"] = analyzer.analyze()
                 progress.complete_step("Code quality analysis", results["code_quality"].get("success", False))
             
@@ -1126,6 +963,13 @@ Examples:
         help="Comma-separated list of tools to run: history,commits,techstack,quality,vulnerabilities (default: all)"
     )
     
+    parser.add_argument(
+        "--lizard-workers",
+        type=int,
+        default=DEFAULT_LIZARD_WORKERS,
+        help=f"Processes analyzing source files in the quality analysis (default: {DEFAULT_LIZARD_WORKERS})"
+    )
+    
     parser.add_argument(
         "--version",
         action="version",
@@ -1149,12 +993,14 @@ Examples:
         tools = None  # Use default (all)
     
     # Run analyzer
-    analyzer = StandaloneAnalyzer(args.repo, output_dir, tools)
+    analyzer = StandaloneAnalyzer(args.repo, output_dir, tools, args.lizard_workers)
     success = analyzer.run()
     
     sys.exit(0 if success else 1)
 
 
 if __name__ == "__main__":
+    # Lets the lizard worker processes start from the frozen (PyInstaller) executable
+    multiprocessing.freeze_support()
     main()
 
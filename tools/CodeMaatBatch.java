@@ -0,0 +1,149 @@
+import clojure.java.api.Clojure;
+import clojure.lang.AFn;
+import clojure.lang.IFn;
+import clojure.lang.Namespace;
+import clojure.lang.RT;
+import clojure.lang.Symbol;
+import clojure.lang.Var;
+
+import java.io.Writer;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.util.HashMap;
+import java.util.Map;
+
+/**
+ * Runs several code-maat analyses inside one JVM.
+ *
+ * Usage (Java 11+ runs the source file directly, no compilation step):
+ *   java -cp cm.jar CodeMaatBatch.java LOG OUTPUT_DIR FILE_PREFIX ANALYSIS...
+ *
+ * Each analysis is written to OUTPUT_DIR/FILE_PREFIX + analysis ('-' replaced
+ * by '_') + ".csv", exactly as `java -jar cm.jar -l LOG -c git2 -a ANALYSIS`
+ * would print it. One status line per analysis goes to stdout:
+ *   OK <analysis> <milliseconds>
+ *   FAIL <analysis> <message>
+ *
+ * The git2 log parser is memoized (when code-maat exposes it as
+ * code-maat.parsers.git2/parse-log) so the log is parsed once for all
+ * analyses instead of once per JVM.
+ */
+public class CodeMaatBatch {
+
+    public static void main(String[] args) throws Exception {
+        if (args.length < 4) {
+            System.err.println("usage: java -cp cm.jar CodeMaatBatch.java LOG OUTPUT_DIR FILE_PREFIX ANALYSIS...");
+            System.exit(2);
+        }
+        String logFile = args[0];
+        Path outputDir = Paths.get(args[1]);
+        String filePrefix = args[2];
+
+        IFn require = Clojure.var("clojure.core", "require");
+        require.invoke(Clojure.read("code-maat.app.app"));
+        IFn run = Clojure.var("code-maat.app.app", "run");
+        memoizeParser(require);
+
+        int failures = 0;
+        for (int i = 3; i < args.length; i++) {
+            String analysis = args[i];
+            Path csv = outputDir.resolve(filePrefix + analysis.replace('-', '_') + ".csv");
+            long start = System.nanoTime();
+            try (Writer out = Files.newBufferedWriter(csv, StandardCharsets.UTF_8)) {
+                // code-maat prints its result to *out*
+                Var.pushThreadBindings(RT.map(RT.OUT, out));
+                try {
+                    run.invoke(logFile, options(require, logFile, analysis));
+                    out.flush();
+                } finally {
+                    Var.popThreadBindings();
+                }
+                // Some code-maat versions print their error message instead of throwing
+                String header = firstLine(csv);
+                if (header == null || !header.contains(",")) {
+                    throw new IllegalStateException(header == null ? "no output" : header);
+                }
+                System.out.println("OK " + analysis + " " + (System.nanoTime() - start) / 1_000_000);
+            } catch (Throwable e) {
+                failures++;
+                Files.deleteIfExists(csv);
+                System.out.println("FAIL " + analysis + " " + String.valueOf(e.getMessage()).replace('\n', ' '));
+            }
+            System.out.flush();
+        }
+        // Exit explicitly: code-maat may leave agent threads running
+        System.exit(failures == 0 ? 0 : 1);
+    }
+
+    /**
+     * Options map for one analysis, with code-maat's own command line
+     * defaults when its option spec is available.
+     */
+    private static Object options(IFn require, String logFile, String analysis) {
+        try {
+            require.invoke(Clojure.read("code-maat.cmd-line"));
+            require.invoke(Clojure.read("clojure.tools.cli"));
+            Var spec = findVar("code-maat.cmd-line", "cli-options");
+            if (spec != null) {
+                IFn parseOpts = Clojure.var("clojure.tools.cli", "parse-opts");
+                Object argv = RT.vector("-l", logFile, "-c", "git2", "-a", analysis);
+                Object parsed = parseOpts.invoke(argv, spec.deref());
+                Object options = RT.get(parsed, Clojure.read(":options"));
+                // An option spec parse-opts rejects would drop the defaults: use the fallback instead
+                if (RT.get(parsed, Clojure.read(":errors")) == null && options != null) {
+                    return options;
+                }
+            }
+        } catch (Throwable ignored) {
+            // Fall back to the documented defaults below
+        }
+        return Clojure.read("{:log \"" + logFile.replace("\\", "\\\\").replace("\"", "\\\"") + "\""
+                + " :version-control \"git2\" :analysis \"" + analysis + "\""
+                + " :min-revs 5 :min-shared-revs 5 :min-coupling 30 :max-coupling 100"
+                + " :max-changeset-size 30}");
+    }
+
+    /**
+     * Cache the parsed log by (input, options) so every analysis reuses the
+     * first parse. code-maat.app.app/run passes the log file name as input;
+     * any other input (a reader) is parsed uncached, and a jar built with
+     * direct linking bypasses the var, so every analysis parses the log
+     * itself, which is slower but still correct.
+     */
+    private static void memoizeParser(IFn require) {
+        try {
+            require.invoke(Clojure.read("code-maat.parsers.git2"));
+            Var parseLog = findVar("code-maat.parsers.git2", "parse-log");
+            if (parseLog == null) {
+                return;
+            }
+            final IFn original = (IFn) parseLog.getRawRoot();
+            final Map<Object, Object> cache = new HashMap<>();
+            parseLog.bindRoot(new AFn() {
+                @Override
+                public Object invoke(Object input, Object options) {
+                    // Only file names are stable keys; a reader is consumed by the first parse
+                    if (!(input instanceof String)) {
+                        return original.invoke(input, options);
+                    }
+                    return cache.computeIfAbsent(RT.vector(input, options), key -> original.invoke(input, options));
+                }
+            });
+        } catch (Throwable ignored) {
+            // Older/newer code-maat layouts: every analysis parses the log itself
+        }
+    }
+
+    private static String firstLine(Path file) throws java.io.IOException {
+        try (java.io.BufferedReader reader = Files.newBufferedReader(file, StandardCharsets.UTF_8)) {
+            return reader.readLine();
+        }
+    }
+
+    private static Var findVar(String namespace, String name) {
+        Namespace ns = Namespace.find(Symbol.intern(namespace));
+        return ns == null ? null : ns.findInternedVar(Symbol.intern(name));
+    }
+}